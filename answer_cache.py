@@ -0,0 +1,112 @@
+import re
+import time
+import sqlite3
+import threading
+from cache import TTLCache
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Words that do not change what is being asked
+FILLER_WORDS = {
+    "pixel", "hey", "hallo", "hi", "ok", "okay", "äh", "ähm", "hm", "hmm", "also", "bitte",
+    "mal", "denn", "doch", "eigentlich", "eben", "halt", "ja", "nun", "sag", "mir", "kannst", "du",
+    "weißt", "erzähl", "erkläre", "erklär",
+}
+
+# Answers to these change over time and are never cached
+TIME_SENSITIVE_RE = re.compile(
+    r'\b(?:heute|morgen|gestern|jetzt|gerade|aktuell\w*|neueste\w*|neuste\w*|letzte\w*|nächste\w*|'
+    r'uhr|uhrzeit|datum|wochentag|wetter|news|nachrichten|preis\w*|kurs\w*|börse|'
+    r'spielstand|ergebnis\w*|live|dieses jahr|diese woche|diesen monat|noch)\b'
+)
+
+
+def normalize_question(text):
+    """Cache key: lower case, no punctuation, wake word and filler words removed"""
+    words = PUNCTUATION_RE.sub(" ", text.lower()).split()
+    return " ".join(w for w in words if w not in FILLER_WORDS)
+
+
+class AnswerCache:
+    """
+    Cache for LLM answers in front of the chat completion.
+    Keys are normalized questions; time-sensitive questions are never
+    cached. Entries live in a TTL/LRU memory cache and, with store_path,
+    also in SQLite (at most maxsize rows, oldest dropped first) so they
+    survive restarts.
+    """
+    def __init__(self, maxsize=512, ttl=86400, store_path=None):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()  # guards the counters and the SQLite connection
+        self.db = None
+        if store_path:
+            self.db = sqlite3.connect(store_path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, answer TEXT, latency REAL, expires REAL)")
+            self.db.execute("DELETE FROM answers WHERE expires < ?", (time.time(),))
+            self.db.commit()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.saved_seconds = 0.0
+
+    def key(self, text):
+        """Normalized key, or None if the question must not be cached"""
+        key = normalize_question(text)
+        if not key or TIME_SENSITIVE_RE.search(key):
+            with self.lock:
+                self.skipped += 1
+            return None
+        return key
+
+    def get(self, key):
+        """Cached answer or None; a hit counts the latency it saves"""
+        entry = self.memory.get(key)
+        if entry is None and self.db:
+            entry = self._load(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            answer, latency = entry
+            self.hits += 1
+            self.saved_seconds += latency
+        return answer
+
+    def put(self, key, answer, latency):
+        """Store an answer together with the time it took to get it"""
+        self.memory.put(key, (answer, latency))
+        if self.db:
+            with self.lock:
+                self.db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)",
+                                (key, answer, latency, time.time() + self.ttl))
+                # Same TTL for every row: the earliest expiry is the oldest answer
+                self.db.execute("DELETE FROM answers WHERE key NOT IN "
+                                "(SELECT key FROM answers ORDER BY expires DESC LIMIT ?)", (self.maxsize,))
+                self.db.commit()
+
+    def _load(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT answer, latency, expires FROM answers WHERE key = ?", (key,)).fetchone()
+        if row is None or row[2] < time.time():
+            return None
+        entry = (row[0], row[1])
+        self.memory.put(key, entry, ttl=row[2] - time.time())
+        return entry
+
+    def stats(self):
+        with self.lock:
+            hits, misses, skipped, saved = self.hits, self.misses, self.skipped, self.saved_seconds
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "skipped": skipped,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "saved_ms": round(saved * 1000),
+            "entries": len(self.memory),
+        }
@@ -1,123 +1,171 @@
 import os
 import re
-import requests
-from urllib.parse import quote
+import time
+import threading
 import server # Web Interface
-from groq import Groq
+import groq_client
+from tracing import tracer
 from skills.timer import TimerManager
-from skills.camera import CameraManager
-from config import OPENWEATHER_API_KEY, DEFAULT_CITY, WETTER_KEYWORDS
+from skills.weather import WeatherService
+from skills.search import WebSearch
+from router import IntentRouter, default_rules
+from answer_cache import AnswerCache
+from config import (OPENWEATHER_API_KEY, DEFAULT_CITY, WETTER_KEYWORDS, GROQ_CHAT_TIMEOUT, TIMER_STORE,
+                    TIMER_SNOOZE_MINUTES, OPENWEATHER_URL, WEATHER_TTL, WEATHER_TIMEOUT, WEATHER_REFRESH_AHEAD,
+                    SEARCH_URL, SEARCH_BUDGET, SEARCH_TTL, SEARCH_CACHE_SIZE,
+                    CAMERA_SOURCES, CAMERA_MODE, CAMERA_CPU_BUDGET, CAMERA_MOTION_THRESHOLD,
+                    CAMERA_HISTORY_SECONDS, CAMERA_HISTORY_SIZE,
+                    ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_STORE)
 from datetime import datetime
 
+SYSTEM_PROMPT = "Du bist Pixel, ein hilfreicher KI-Assistent. Antworte kurz und prägnant auf Deutsch."
+
+# Sentence end: . ! ? or newline followed by whitespace, but not after a digit ("1. Mai")
+# or a common abbreviation ("z.B.", "ca.")
+SENTENCE_END_RE = re.compile(r'(?<!\d)(?<!\bz\.B)(?<!\bca)(?<!\bbzw)(?<!\bDr)(?<!\bNr)(?<!\busw)[.!?]+(?=\s)|\n+')
+
+def iter_sentences(tokens, min_length=12):
+    """Group streamed tokens into complete sentences as soon as they end"""
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        while True:
+            match = None
+            for m in SENTENCE_END_RE.finditer(buffer):
+                if m.end() >= min_length:
+                    match = m
+                    break
+            if not match:
+                break
+            sentence = buffer[:match.end()].strip()
+            buffer = buffer[match.end():]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
+
 class Assistant:
     def __init__(self, tts=None):
-        self.timer_manager = TimerManager(tts) if tts else None
-        self.camera_manager = CameraManager(tts) if tts else None
-
-    def process_query(self, text):
-        """Determine intent and get response"""
-        text_lower = text.lower()
-        
-        if self.timer_manager:
-            # Timer / Wecker / Countdown
-            # Matches: "Stelle einen Timer/Wecker auf 5 Minuten"
-            timer_trigger = any(x in text_lower for x in ["timer", "wecker", "countdown"])
-            timer_match = re.search(r'(\d+)\s+(minute|minuten|sekunde|sekunden|stunde|stunden)', text_lower)
-            
-            if timer_trigger and timer_match:
-                amount = timer_match.group(1)
-                unit = timer_match.group(2)
-                return self.timer_manager.set_timer(amount, unit)
-            
-            # Stopwatch / Stoppuhr
-            if "stoppuhr" in text_lower or "stopwatch" in text_lower:
-                if any(x in text_lower for x in ["start", "los", "go"]):
-                    return self.timer_manager.start_stopwatch()
-                elif any(x in text_lower for x in ["stop", "stopp", "ende", "halt", "aus"]):
-                    return self.timer_manager.stop_stopwatch()
-        
-        # Check for Time Intent
-        time_keywords = ["spät", "uhr", "zeit", "clock", "time", "datum", "welcher tag"]
-        if any(x in text_lower for x in time_keywords) and not any(x in text_lower for x in ["timer", "wecker", "countdown", "stoppuhr"]):
-            return self.get_time()
-        
-        # Check for Web Search Intent
-        search_trigger = any(x in text_lower for x in ["suche", "suche nach", "finde", "googlen", "search for", "search", "im internet", "wer ist", "was ist"])
-        if search_trigger and not any(x in text_lower for x in ["wetter", "uhr", "zeit", "kamera", "benachrichtigung"]):
-            # Remove trigger words and search
-            query = text_lower
-            for trigger in ["suche nach", "suche", "finde", "googlen", "search for", "search", "im internet", "wer ist", "was ist"]:
-                query = query.replace(trigger, "").strip()
-            if query:
-                return self.web_search(query)
-        
-        # Check for Notification Intent
-        # "Sende Benachrichtigung an Handy: Hallo Welt"
-        if "benachrichtigung" in text_lower or "send notification" in text_lower:
-            parts = text.split(":", 1)
-            msg = "Test"
-            target = "Mobile" 
-            
-            if len(parts) > 1:
-                msg = parts[1].strip()
-            
-            if "pc" in text_lower: target = "PC"
-            
-            count = server.send_notification(target, msg)
-            if count > 0:
-                return f"Benachrichtigung an {target} gesendet."
-            else:
-                return f"Kein {target} verbunden."
-
-        # Check for weather
-        for keyword in WETTER_KEYWORDS:
-            if keyword in text_lower:
-                return self.get_weather(text)
-        
-        # Check for Camera Intent
+        self.tts = tts
+        self.timer_manager = TimerManager(tts, store_path=TIMER_STORE, snooze_minutes=TIMER_SNOOZE_MINUTES) if tts else None
+        # The camera skill pulls in OpenCV and YOLO, so it is only built on first use
+        self.camera_enabled = tts is not None
+        self._camera_manager = None
+        self._camera_lock = threading.Lock()
+
+        self.weather = None
+        if OPENWEATHER_API_KEY:
+            self.weather = WeatherService(OPENWEATHER_API_KEY, DEFAULT_CITY, OPENWEATHER_URL,
+                                          ttl=WEATHER_TTL, timeout=WEATHER_TIMEOUT,
+                                          refresh_ahead=WEATHER_REFRESH_AHEAD)
+
+        self.search = WebSearch(SEARCH_URL, budget=SEARCH_BUDGET, ttl=SEARCH_TTL, cache_size=SEARCH_CACHE_SIZE)
+        self.answers = AnswerCache(maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL, store_path=ANSWER_CACHE_STORE or None)
+
+        # Routing table is compiled once; skills without a manager are left out
+        skills = set()
+        if self.timer_manager: skills.add("timer")
+        if self.camera_enabled: skills.add("camera")
+        self.router = IntentRouter(default_rules(WETTER_KEYWORDS), skills=skills)
+
+    @property
+    def camera_manager(self):
+        if self._camera_manager is None and self.camera_enabled:
+            with self._camera_lock:
+                if self._camera_manager is None:
+                    from skills.camera import CameraManager
+                    self._camera_manager = CameraManager(self.tts, sources=CAMERA_SOURCES, mode=CAMERA_MODE,
+                                                         cpu_budget=CAMERA_CPU_BUDGET,
+                                                         motion_threshold=CAMERA_MOTION_THRESHOLD,
+                                                         history=CAMERA_HISTORY_SECONDS,
+                                                         history_size=CAMERA_HISTORY_SIZE)
+        return self._camera_manager
+
+    def camera_frame(self):
+        """Latest camera frame for the live view; never starts or loads the camera"""
+        camera = self._camera_manager
+        return camera.live_frame() if camera and camera.is_running else None
+
+    def warm_up_connections(self):
+        """Open (or refresh) the pooled connections to weather and search"""
+        if self.weather:
+            self.weather.warm_up()
+        self.search.warm_up()
+
+    def warm_up_camera(self):
+        """YOLO weights plus one dummy inference (only if the camera skill is enabled)"""
         if self.camera_manager:
-            if any(x in text_lower for x in ["starte kamera", "kamera starten", "öffne kamera", "camera start", "kamera an"]):
-                return self.camera_manager.start_camera()
-            elif any(x in text_lower for x in ["stoppe kamera", "kamera stoppen", "schließe kamera", "camera stop", "kamera aus"]):
-                return self.camera_manager.stop_camera()
-            elif any(x in text_lower for x in ["was siehst du", "erkennen", "identifizieren", "was ist das", "siehe", "detect", "identify"]):
-                return self.camera_manager.describe_scene()
-        
+            self.camera_manager.warm_up()
+
+    def process_query(self, text, stream=False):
+        """
+        Determine intent and get response.
+        With stream=True an LLM answer is returned as a generator of sentences.
+        """
+        with tracer.span("route"):
+            intent = self.router.classify(text)
+
+        if intent.name != "ai":
+            with tracer.span("skill"):
+                response = self.run_skill(intent)
+            if response is not None:
+                return response
+
         # Default to AI
+        if stream:
+            return self.stream_ai_response(text)
         return self.get_ai_response(text)
 
-    def get_weather(self, text):
-        if not OPENWEATHER_API_KEY:
-            return "Ich habe keinen OpenWeather API-Schlüssel gefunden."
+    def run_skill(self, intent):
+        """Execute a non-AI intent; None if no skill handles it"""
+        slots = intent.slots
 
-        # Simplistic city extraction (better with NER, but regex is okay for now)
-        city = DEFAULT_CITY
-        # Try to find city in text (very basic check)
-        words = text.split()
-        if "in" in words:
-            try:
-                city_idx = words.index("in") + 1
-                if city_idx < len(words):
-                    city = words[city_idx].strip("?.!,")
-            except:
-                pass
+        if intent.name == "timer":
+            return self.timer_manager.set_timer(slots["amount"], slots["unit"])
+        if intent.name == "alarm":
+            return self.timer_manager.set_alarm(slots["hour"], slots["minute"])
+        if intent.name == "timer_cancel":
+            return self.timer_manager.cancel_timers()
+        if intent.name == "alarm_cancel":
+            return self.timer_manager.cancel_alarms()
+        if intent.name == "timer_list":
+            return self.timer_manager.list_timers()
+        if intent.name == "snooze":
+            return self.timer_manager.snooze(slots["minutes"])
+        if intent.name == "stopwatch_start":
+            return self.timer_manager.start_stopwatch()
+        if intent.name == "stopwatch_stop":
+            return self.timer_manager.stop_stopwatch()
+        if intent.name == "time":
+            return self.get_time()
+        if intent.name == "search":
+            return self.web_search(slots["query"])
+        if intent.name == "notification":
+            return self.send_notification(slots["target"], slots["message"])
+        if intent.name == "weather":
+            return self.get_weather(slots["city"])
+        if intent.name == "camera_start":
+            return self.camera_manager.start_camera()
+        if intent.name == "camera_stop":
+            return self.camera_manager.stop_camera()
+        if intent.name == "camera_describe":
+            return self.camera_manager.describe_scene(slots["room"])
+        if intent.name == "camera_count":
+            return self.camera_manager.count_objects(slots["object"], slots["seconds"], slots["room"])
 
-        try:
-            url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric&lang=de"
-            response = requests.get(url)
-            data = response.json()
-            
-            if response.status_code != 200:
-                print(f"Weather Error: {data}")
-                return f"Ich konnte das Wetter für {city} nicht abrufen."
+        return None
 
-            temp = round(data['main']['temp'])
-            desc = data['weather'][0]['description']
-            return f"Das Wetter in {city}: {desc} bei {temp} Grad Celsius."
+    def send_notification(self, target, msg):
+        count = server.send_notification(target, msg)
+        if count > 0:
+            return f"Benachrichtigung an {target} gesendet."
+        else:
+            return f"Kein {target} verbunden."
 
-        except Exception as e:
-            print(f"Weather Exception: {e}")
-            return "Es gab einen Fehler beim Abrufen des Wetters."
+    def get_weather(self, city=None):
+        if not self.weather:
+            return "Ich habe keinen OpenWeather API-Schlüssel gefunden."
+        return self.weather.report(city or DEFAULT_CITY)
 
     def get_time(self):
         """Return current time"""
@@ -130,58 +178,73 @@ class Assistant:
 
     def web_search(self, query):
         """Perform web search using DuckDuckGo"""
+        return self.search.answer(query)
+
+    def get_ai_response(self, text):
+        if not os.getenv("GROQ_API_KEY"):
+            return "Ich habe keinen Groq API-Schlüssel gefunden. Bitte setze GROQ_API_KEY in der .env Datei."
+
+        key = self.answers.key(text)
+        cached = self.answers.get(key) if key else None
+        if cached is not None:
+            return cached
+
         try:
-            # Using DuckDuckGo Lite for easier parsing
-            url = f"https://duckduckgo.com/lite/?q={quote(query)}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code != 200:
-                return "Die Suche konnte nicht durchgeführt werden."
-            
-            content = response.text
+            start = time.time()
+            client = groq_client.get_client()
             
-            # Find results in DuckDuckGo Lite
-            # Links are usually in <a class="result-link" href="...">...</a>
-            import re as re_module
-            pattern = r'<a[^>]*class="result-link"[^>]*>([^<]*)</a>'
-            matches = re_module.findall(pattern, content)
+            with tracer.span("llm"):
+                chat_completion = client.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": text}
+                    ],
+                    model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+                    timeout=GROQ_CHAT_TIMEOUT,
+                )
             
-            results = []
-            for i, title in enumerate(matches[:3]):
-                title = title.strip()
-                if title:
-                    results.append(f"- {title}")
-            
-            if results:
-                summary = f"Ich habe im Internet nach '{query}' gesucht. Hier sind einige Ergebnisse:\n" + "\n".join(results)
-                return summary
-            else:
-                return f"Ich habe keine direkten Ergebnisse für '{query}' gefunden."
-                
+            answer = chat_completion.choices[0].message.content
+            if key:
+                self.answers.put(key, answer, time.time() - start)
+            return answer
+
         except Exception as e:
-            print(f"Web Search Exception: {e}")
-            return "Es gab einen Fehler bei der Websuche."
+            print(f"AI Exception: {e}")
+            return "Es gab einen Fehler bei der Verbindung zu Groq. Überprüfe deinen API-Schlüssel."
 
-    def get_ai_response(self, text):
+    def stream_ai_response(self, text):
+        """Stream the completion and yield it sentence by sentence"""
         if not os.getenv("GROQ_API_KEY"):
-            return "Ich habe keinen Groq API-Schlüssel gefunden. Bitte setze GROQ_API_KEY in der .env Datei."
+            yield "Ich habe keinen Groq API-Schlüssel gefunden. Bitte setze GROQ_API_KEY in der .env Datei."
+            return
+
+        key = self.answers.key(text)
+        cached = self.answers.get(key) if key else None
+        if cached is not None:
+            yield from iter_sentences([cached])
+            return
 
         try:
-            client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-            
-            chat_completion = client.chat.completions.create(
+            start = time.time()
+            stream = groq_client.get_client().chat.completions.create(
                 messages=[
-                    {"role": "system", "content": "Du bist Pixel, ein hilfreicher KI-Assistent. Antworte kurz und prägnant auf Deutsch."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": text}
                 ],
                 model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+                timeout=GROQ_CHAT_TIMEOUT,
+                stream=True,
             )
-            
-            return chat_completion.choices[0].message.content
+            tokens = (chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+            sentences = []
+            for sentence in iter_sentences(tokens):
+                sentences.append(sentence)
+                yield sentence
+            tracer.record("llm", start, time.time())
+            # Only complete answers are cached
+            if key and sentences:
+                self.answers.put(key, " ".join(sentences), time.time() - start)
 
         except Exception as e:
             print(f"AI Exception: {e}")
-            return "Es gab einen Fehler bei der Verbindung zu Groq. Überprüfe deinen API-Schlüssel."
+            yield "Es gab einen Fehler bei der Verbindung zu Groq. Überprüfe deinen API-Schlüssel."
@@ -0,0 +1,574 @@
+"""
+Offline end-to-end benchmark.
+
+Runs Assistant.process_query, the full voice path
+(audio -> pipeline -> main.on_data -> skill/LLM -> TTS), concurrent
+web sessions (Socket.IO text -> worker pool -> reply) and speculation on
+interim browser transcripts against local
+stand-ins for Groq (chat + transcription), OpenWeather and DuckDuckGo Lite,
+with edge_tts and playback stubbed. Every fake answers after a
+log-normal delay around a configurable median.
+
+    python bench.py --runs 3 --out bench.json
+    python bench.py --groq 0.5 --stt 0.6 --cold
+    python bench.py --sessions 1,10,100 --session-queries 10
+    python bench.py --boot       # first turns after boot, with and without warm-up
+"""
+import os
+import sys
+import json
+import time
+import math
+import queue
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import numpy as np
+
+from fixture_server import FixtureHandler, start_server
+
+# Realistic German queries with the intent they should hit (checked by check_corpus)
+CORPUS = [
+    ("Wie spät ist es?", "time"),
+    ("Welcher Tag ist heute?", "time"),
+    ("Stelle einen Timer auf 10 Minuten", "timer"),
+    ("Timer auf 30 Sekunden", "timer"),
+    ("Wecke mich um 7:30", "alarm"),
+    ("Welche Timer laufen?", "timer_list"),
+    ("Lösche alle Timer", "timer_cancel"),
+    ("Starte die Stoppuhr", "stopwatch_start"),
+    ("Stoppe die Stoppuhr", "stopwatch_stop"),
+    ("Wie ist das Wetter?", "weather"),
+    ("Wie ist das Wetter in Hamburg?", "weather"),
+    ("Brauche ich heute einen Regenschirm in München?", "weather"),
+    ("Suche nach der Hauptstadt von Australien", "search"),
+    ("Was ist ein Quantencomputer?", "search"),
+    ("Wer ist der Bundeskanzler?", "search"),
+    ("Sende eine Benachrichtigung an das Handy: Essen ist fertig", "notification"),
+    ("Wer hat die Relativitätstheorie entwickelt?", "ai"),
+    ("Erzähl mir einen Witz über Programmierer", "ai"),
+    ("Wie viele Einwohner hat Deutschland ungefähr?", "ai"),
+    ("Warum ist der Himmel blau?", "ai"),
+    ("Gib mir ein Rezept für Pfannkuchen", "ai"),
+    ("Übersetze Guten Abend ins Englische", "ai"),
+    ("Wie lange kocht man ein weiches Ei?", "ai"),
+]
+
+# First turn of each kind after boot, for the warm-up comparison
+BOOT_TURNS = [
+    ("ack", "Pixel"),
+    ("time", "Pixel, wie spät ist es?"),
+    ("ai", "Pixel, wer hat die Relativitätstheorie entwickelt?"),
+    ("weather", "Pixel, wie ist das Wetter in Hamburg?"),
+    ("search", "Pixel, suche nach der Hauptstadt von Australien"),
+]
+
+# Side-effect free intents used for the web session load
+WEB_INTENTS = ("ai", "weather", "search", "time")
+
+ANSWER = ("Das ist eine gute Frage. Die kurze Antwort lautet: es kommt darauf an. "
+          "Im Allgemeinen gilt die einfachste Erklärung. Frag mich gern genauer nach.")
+
+SEARCH_PAGE = ("<html><body><table>" + "".join(
+    f'<tr><td><a rel="nofollow" href="https://example.com/{i}" class="result-link">Ergebnis {i}</a></td></tr>'
+    for i in range(10)) + "</table></body></html>").encode("utf-8")
+
+
+class Latency:
+    """Log-normal delay around a median (spread is the sigma of the log)"""
+    def __init__(self, median, spread=0.3, rng=None):
+        self.median = median
+        self.spread = spread
+        self.rng = rng or random.Random(0)
+
+    def sample(self):
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(self.rng.gauss(0, self.spread))
+
+    def wait(self):
+        time.sleep(self.sample())
+
+
+class FakeServices:
+    """One local HTTP server answering like Groq, OpenWeather and DuckDuckGo Lite"""
+    def __init__(self, latencies, token_interval=0.01):
+        self.latencies = latencies          # service -> Latency
+        self.token_interval = token_interval
+        self.transcripts = queue.Queue()    # texts the fake Whisper returns, in order
+        self.requests = {name: 0 for name in ("chat", "stt", "weather", "search", "models")}
+        self.server = None
+
+    def start(self):
+        services = self
+
+        class Handler(FixtureHandler):
+            def do_HEAD(self):
+                # Connection warm-up
+                self.send_body(200, "text/plain", b"")
+
+            def do_GET(self):
+                if self.path.endswith("/models"):
+                    services._count("models")
+                    self.send_body(200, "application/json", json.dumps({"object": "list", "data": []}).encode("utf-8"))
+                elif self.path.startswith("/weather"):
+                    services._count("weather")
+                    city = self.path.split("q=", 1)[-1].split("&", 1)[0]
+                    self.send_body(200, "application/json", json.dumps({
+                        "name": city, "main": {"temp": 14.3}, "weather": [{"description": "leichter Regen"}]
+                    }).encode("utf-8"))
+                elif self.path.startswith("/lite"):
+                    services._count("search")
+                    self.send_body(200, "text/html; charset=utf-8", SEARCH_PAGE)
+                else:
+                    self.send_body(404, "text/plain", b"not found")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.endswith("/audio/transcriptions"):
+                    services._count("stt")
+                    try:
+                        text = services.transcripts.get_nowait()
+                    except queue.Empty:
+                        text = ""
+                    # response_format="text", as stt.py asks for
+                    self.send_body(200, "text/plain; charset=utf-8", text.encode("utf-8"))
+                elif self.path.endswith("/chat/completions"):
+                    services._count("chat")
+                    if json.loads(body).get("stream"):
+                        self._stream_chat()
+                    else:
+                        self.send_body(200, "application/json", json.dumps(services._completion()).encode("utf-8"))
+                else:
+                    self.send_body(404, "text/plain", b"not found")
+
+            def _stream_chat(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for word in ANSWER.split(" "):
+                    chunk = {"id": "bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": "bench", "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                    self._chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    time.sleep(services.token_interval)
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+            def _chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        self.server, url = start_server(Handler)
+        return url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+
+    def _count(self, service):
+        self.requests[service] += 1
+        self.latencies.get(service, self.latencies["chat"]).wait()
+
+    @staticmethod
+    def _completion():
+        return {"id": "bench", "object": "chat.completion", "created": int(time.time()), "model": "bench",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 20, "completion_tokens": 40, "total_tokens": 60}}
+
+
+def configure_environment(base_url, directory, cold):
+    """Point every external service at the fakes; must run before config is imported"""
+    os.environ.update({
+        "GROQ_API_KEY": "bench",
+        "GROQ_BASE_URL": base_url,
+        "GROQ_WARMUP": "0",
+        "OPENWEATHER_API_KEY": "bench",
+        "OPENWEATHER_URL": f"{base_url}/weather",
+        "WEATHER_REFRESH_AHEAD": "0",
+        "SEARCH_URL": f"{base_url}/lite/",
+        "TTS_CACHE_DIR": os.path.join(directory, "tts_cache"),
+        "TIMER_STORE": os.path.join(directory, "timers.json"),
+        "WAKEWORD_ENABLED": "0",
+        "ANSWER_CACHE_STORE": "",
+        "WEB_SPEAK_RESPONSES": "0",
+    })
+    if cold:
+        # Every query pays the full round trip
+        os.environ.update({"WEATHER_TTL": "0", "SEARCH_TTL": "0", "ANSWER_CACHE_TTL": "0", "TTS_CACHE_MAX_CHARS": "0"})
+
+
+def summarize(seconds, wall=None):
+    from pipeline import percentile
+    return {
+        "count": len(seconds),
+        "p50_ms": round(percentile(seconds, 50) * 1000, 1),
+        "p99_ms": round(percentile(seconds, 99) * 1000, 1),
+        "mean_ms": round(sum(seconds) / len(seconds) * 1000, 1) if seconds else 0.0,
+        "throughput_qps": round(len(seconds) / (wall if wall else sum(seconds)), 2) if seconds else 0.0,
+    }
+
+
+def phrase_audio(seconds=1.2, rate=16000):
+    """Speech-like microphone phrase (passes the VAD), as speech_recognition AudioData"""
+    import speech_recognition as sr
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    phase = 2 * np.pi * np.cumsum(130 * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))) / rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8)) * (0.35 + 0.65 * np.abs(np.sin(2 * np.pi * 2 * t)))
+    quiet = lambda s: rng.normal(0, 40, int(rate * s))
+    samples = np.concatenate([quiet(0.3), 4000 * voiced, quiet(0.3)])
+    return sr.AudioData(np.clip(samples, -32768, 32767).astype("<i2").tobytes(), rate, 2)
+
+
+def stub_tts(tts, synthesis, playback):
+    """edge_tts and the speaker replaced by delays"""
+    async def generate(text):
+        import asyncio
+        await asyncio.sleep(synthesis.sample())
+        return b"ID3" + text.encode("utf-8")
+
+    tts._generate_audio = generate
+    tts._play_audio = lambda audio: time.sleep(playback)
+
+
+def check_corpus(router):
+    """(query, expected, routed) for every corpus line the router sends elsewhere"""
+    routed = [(query, expected, router.classify(query).name) for query, expected in CORPUS]
+    return [line for line in routed if line[1] != line[2]]
+
+
+def bench_assistant(assistant, runs, concurrency):
+    """process_query per intent, sequential, then the whole corpus from several threads"""
+    per_intent = {}
+    for _ in range(runs):
+        for query, intent in CORPUS:
+            start = time.perf_counter()
+            assistant.process_query(query)
+            per_intent.setdefault(intent, []).append(time.perf_counter() - start)
+
+    work = queue.Queue()
+    for _ in range(runs):
+        for query, _ in CORPUS:
+            work.put(query)
+
+    def worker():
+        while True:
+            try:
+                query = work.get_nowait()
+            except queue.Empty:
+                return
+            assistant.process_query(query)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    return {
+        "intents": {intent: summarize(samples) for intent, samples in sorted(per_intent.items())},
+        "concurrent": {"threads": concurrency, "queries": runs * len(CORPUS),
+                       "throughput_qps": round(runs * len(CORPUS) / wall, 2)},
+    }
+
+
+def bench_end_to_end(main, services, runs, timeout=30.0):
+    """Microphone phrase -> pipeline -> on_data -> skill/LLM -> TTS, one turn at a time"""
+    from tracing import tracer
+    audio = phrase_audio()
+    first_audio, turn_time, failed = {}, {}, 0
+
+    # A turn is done once the speech stage handed over its last sentence and the TTS is idle
+    spoken = set()
+    speak = main.pipeline.speak
+    def speak_and_mark(turn):
+        speak(turn)
+        spoken.add(turn.id)
+    main.pipeline.speak = speak_and_mark
+    tts = main.tts
+    tts_idle = lambda: tts.current is None and not tts.pending and not tts.ready and tts.rendering is None
+
+    for _ in range(runs):
+        for query, intent in CORPUS:
+            services.transcripts.put(f"Pixel, {query}")
+            turn = main.pipeline.submit_audio(audio)
+
+            deadline = time.time() + timeout
+            while time.time() < deadline and not (turn.id in spoken and tts_idle()):
+                time.sleep(0.002)
+            spans = tracer.trace(turn.id)
+            audio_spans = [s for s in spans if s[0] == "first_audio"]
+            if not audio_spans:
+                failed += 1
+                continue
+            first_audio.setdefault(intent, []).append(audio_spans[0][2] - audio_spans[0][1])
+            turn_time.setdefault(intent, []).append(max(end for _, _, end in spans) - turn.created)
+
+    main.pipeline.speak = speak
+    return {
+        "first_audio": {intent: summarize(s) for intent, s in sorted(first_audio.items())},
+        "turn": {intent: summarize(s) for intent, s in sorted(turn_time.items())},
+        "failed_turns": failed,
+    }
+
+
+def bench_web_sessions(main, counts=(1, 10, 100), per_session=5):
+    """Browser sessions asking at the same time: queries per second and latency per session count"""
+    import server
+    server.set_input_handler(main.on_web_input)  # as main.main() does
+    queries = [q for q, intent in CORPUS if intent in WEB_INTENTS]
+    results = {}
+    for count in counts:
+        clients = [server.socketio.test_client(server.app) for _ in range(count)]
+        latencies, failed = [], 0
+        lock = threading.Lock()
+
+        def session(index, client):
+            nonlocal failed
+            client.get_received()
+            for k in range(per_session):
+                query = queries[(index + k) % len(queries)]
+                start = time.perf_counter()
+                # The test client runs the handler in this thread: returns once the reply was emitted
+                client.emit("audio_input", {"text": f"Pixel, {query}"})
+                elapsed = time.perf_counter() - start
+                answered = any(e["name"] == "response" for e in client.get_received())
+                with lock:
+                    if answered:
+                        latencies.append(elapsed)
+                    else:
+                        failed += 1
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=session, args=(i, c)) for i, c in enumerate(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+        for client in clients:
+            client.disconnect()
+
+        results[str(count)] = dict(summarize(latencies, wall), failed=failed)
+    return results
+
+
+def bench_speculation(main, scale=1.0, word_gap=0.15, final_delay=0.7, pause_every=4):
+    """
+    Browser speech with interim transcripts: end of speech -> reply, with and
+    without speculation. A word arrives every word_gap, the browser finalizes
+    final_delay after the last one. Every pause_every-th speaker pauses
+    mid-sentence long enough to start a speculation that turns out wrong.
+    """
+    import server
+    server.set_input_handler(main.on_web_input, partial=main.on_web_partial, closed=main.speculator.discard)
+    speculator = main.speculator
+    speculator.stable *= scale
+    queries = [q for q, intent in CORPUS if intent in WEB_INTENTS]
+    client = server.socketio.test_client(server.app)
+
+    results = {}
+    for enabled in (False, True):
+        speculator.enabled = enabled
+        before = speculator.stats()
+        # Same starting point for both runs
+        main.assistant.answers.memory.clear()
+        main.assistant.search.cache.clear()
+        if main.assistant.weather:
+            main.assistant.weather.cache.clear()
+
+        latencies = []
+        for i, query in enumerate(queries):
+            words = f"Pixel, {query}".split()
+            pause_at = len(words) // 2 if i % pause_every == pause_every - 1 else None
+            client.get_received()
+            for n in range(1, len(words) + 1):
+                client.emit("audio_partial", {"text": " ".join(words[:n])})
+                if n == pause_at:
+                    time.sleep(speculator.stable * 3)
+                elif n < len(words):
+                    time.sleep(word_gap * scale)
+            end_of_speech = time.perf_counter()
+            time.sleep(final_delay * scale)
+            client.emit("audio_input", {"text": " ".join(words)})
+            if any(e["name"] == "response" for e in client.get_received()):
+                latencies.append(time.perf_counter() - end_of_speech)
+
+        after = speculator.stats()
+        results["on" if enabled else "off"] = dict(summarize(latencies), failed=len(queries) - len(latencies))
+        if enabled:
+            counts = {k: after[k] - before[k] for k in ("partials", "speculated", "committed", "wasted", "cancelled")}
+            counts["waste_rate"] = round(counts["wasted"] / counts["speculated"], 3) if counts["speculated"] else 0.0
+            results["speculation"] = counts
+
+    client.disconnect()
+    results["saved_ms_p50"] = round(results["off"]["p50_ms"] - results["on"]["p50_ms"], 1)
+    return results
+
+
+def first_turns(main, services, timeout=30.0):
+    """Capture end -> first sound, for the first turn of each kind in BOOT_TURNS"""
+    from tracing import tracer
+    audio = phrase_audio()
+    results = {}
+    for name, text in BOOT_TURNS:
+        services.transcripts.put(text)
+        turn = main.pipeline.submit_audio(audio)
+        deadline = time.time() + timeout
+        spans = []
+        while time.time() < deadline:
+            spans = [s for s in tracer.trace(turn.id) if s[0] == "first_audio"]
+            if spans and not main.pipeline.busy() and not main.tts.busy():
+                break
+            time.sleep(0.002)
+        results[name] = round((spans[0][2] - spans[0][1]) * 1000, 1) if spans else None
+    return results
+
+
+def boot_child(latencies, warm, budget=30.0):
+    """One fresh process: boot, optionally wait for the warm-up, then the first turns"""
+    services = FakeServices(latencies)
+    base_url = services.start()
+    directory = tempfile.mkdtemp(prefix="pixel_boot_")
+    configure_environment(base_url, directory, cold=False)
+    os.environ.update({"GROQ_WARMUP": "1", "WARMUP_BUDGET": str(budget), "WARMUP_KEEPALIVE": "0"})
+
+    start = time.perf_counter()
+    import main
+    from stt import SpeechToText
+    stub_tts(main.tts, latencies["tts"], 0.0)
+    main.stt = SpeechToText(on_audio=main.pipeline.submit_audio)
+    results = {"boot_ms": round((time.perf_counter() - start) * 1000, 1), "warm_up": {}}
+
+    if warm:
+        # The user says "Pixel" only after the warm-up is done
+        warm_up = main.start_warm_up()
+        warm_up.done.wait(budget)
+        results["warm_up"] = {name: {"ms": round(s * 1000, 1), "status": status} for name, s, status in warm_up.results}
+
+    results["first_turn_ms"] = first_turns(main, services)
+    results["requests"] = dict(services.requests)
+    services.stop()
+    shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def boot_report(child_args):
+    """Run boot_child without and with warm-up in fresh processes and compare the first turns"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, flag in (("cold", "0"), ("warm", "1")):
+            out = os.path.join(tmp, f"{label}.json")
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--boot-child", flag, "--out", out] + child_args,
+                           check=True, stdout=subprocess.DEVNULL)
+            with open(out, encoding="utf-8") as f:
+                results[label] = json.load(f)
+
+    lines = ["Boot report: time to first audio of the first turn after boot",
+             f"  {'turn':<10} {'cold':>10} {'warm':>10} {'saved':>10}"]
+    for name, _ in BOOT_TURNS:
+        cold, warm = results["cold"]["first_turn_ms"][name], results["warm"]["first_turn_ms"][name]
+        saved = f"{cold - warm:8.1f} ms" if cold is not None and warm is not None else "       -"
+        lines.append(f"  {name:<10} {cold or 0:7.1f} ms {warm or 0:7.1f} ms {saved}")
+    warm_total = sum(t["ms"] for t in results["warm"]["warm_up"].values())
+    lines.append(f"  warm-up took {warm_total:.0f} ms in the background")
+    results["report"] = "\n".join(lines)
+    return results
+
+
+def run(latencies, runs=3, concurrency=4, cold=False, playback=0.0, token_interval=0.01,
+        sessions=(1, 10, 100), session_queries=5, speech_scale=1.0):
+    services = FakeServices(latencies, token_interval=token_interval)
+    base_url = services.start()
+    directory = tempfile.mkdtemp(prefix="pixel_bench_")
+    configure_environment(base_url, directory, cold)
+
+    # Imported only now, so config picks up the fake endpoints
+    import main
+    from stt import SpeechToText
+    from tracing import tracer
+    stub_tts(main.tts, latencies["tts"], playback)
+    main.stt = SpeechToText(on_audio=main.pipeline.submit_audio)
+
+    # Per-intent numbers are keyed by the corpus label, so it has to match the router
+    misrouted = check_corpus(main.assistant.router)
+    if misrouted:
+        raise SystemExit("Corpus lines routed to the wrong intent:\n" +
+                         "\n".join(f"  {q!r}: expected {e}, got {r}" for q, e, r in misrouted))
+
+    started = time.time()
+    results = {
+        "config": {
+            "runs": runs,
+            "cold": cold,
+            "corpus_size": len(CORPUS),
+            "latency_median_ms": {name: round(l.median * 1000) for name, l in latencies.items()},
+            "latency_spread": next(iter(latencies.values())).spread,
+        },
+        "assistant": bench_assistant(main.assistant, runs, concurrency),
+        "end_to_end": bench_end_to_end(main, services, runs),
+    }
+    results["stages"] = tracer.snapshot()
+    results["requests"] = dict(services.requests)
+    if sessions:
+        results["web_sessions"] = bench_web_sessions(main, sessions, session_queries)
+        results["web_requests"] = {name: n - results["requests"][name] for name, n in services.requests.items()}
+    results["speculation"] = bench_speculation(main, speech_scale)
+    results["duration_s"] = round(time.time() - started, 1)
+    services.stop()
+    shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Pixel benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="passes over the corpus")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--groq", type=float, default=0.35, help="median chat latency (s)")
+    parser.add_argument("--stt", type=float, default=0.4, help="median transcription latency (s)")
+    parser.add_argument("--weather", type=float, default=0.12, help="median OpenWeather latency (s)")
+    parser.add_argument("--search", type=float, default=0.3, help="median DuckDuckGo latency (s)")
+    parser.add_argument("--tts", type=float, default=0.25, help="median edge_tts synthesis time (s)")
+    parser.add_argument("--spread", type=float, help="sigma of the log-normal delays (default 0.3, 0 with --boot)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every median (e.g. 0.05 for a smoke run)")
+    parser.add_argument("--cold", action="store_true", help="disable all caches")
+    parser.add_argument("--sessions", default="1,10,100", help="concurrent web session counts (empty to skip)")
+    parser.add_argument("--session-queries", type=int, default=5, help="queries per web session")
+    parser.add_argument("--boot", action="store_true", help="compare first turns after boot with and without warm-up")
+    parser.add_argument("--boot-child", choices=("0", "1"), help=argparse.SUPPRESS)
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    spread = 0.3 if args.spread is None else args.spread
+    latencies = {name: Latency(getattr(args, name) * args.scale, spread, rng)
+                 for name in ("groq", "stt", "weather", "search", "tts")}
+    latencies["chat"] = latencies.pop("groq")
+    if args.boot:
+        # Latency settings are passed on to both child processes; fixed delays
+        # unless asked otherwise, so the difference between the runs is the warm-up alone
+        child_args = [f"--{name}={getattr(args, name)}" for name in ("groq", "stt", "weather", "search", "tts", "scale")]
+        child_args.append(f"--spread={args.spread or 0.0}")
+        results = boot_report(child_args)
+        print(results["report"])
+    elif args.boot_child:
+        results = boot_child(latencies, warm=args.boot_child == "1")
+    else:
+        sessions = [int(n) for n in args.sessions.split(",") if n.strip()]
+        results = run(latencies, runs=args.runs, concurrency=args.concurrency, cold=args.cold,
+                      sessions=sessions, session_queries=args.session_queries, speech_scale=args.scale)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Benchmark results written to {args.out}")
+    else:
+        print(text)
@@ -24,3 +24,90 @@ WETTER_KEYWORDS = [
     'regnet', 'scheint', 'sonne', 'wolken', 'gewitter', 'nebel', 'frost',
     'hitze', 'luftfeuchtigkeit', 'wetterbericht', 'prognose'
 ]
+
+# Groq Connection Pool (shared by STT and LLM)
+GROQ_POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", "4"))
+GROQ_KEEPALIVE = float(os.getenv("GROQ_KEEPALIVE", "120"))  # seconds an idle connection is kept open
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_CHAT_TIMEOUT = float(os.getenv("GROQ_CHAT_TIMEOUT", "15"))
+GROQ_STT_TIMEOUT = float(os.getenv("GROQ_STT_TIMEOUT", "15"))
+GROQ_WARMUP = os.getenv("GROQ_WARMUP", "1") == "1"  # open a connection at boot
+
+# Stream LLM answers sentence by sentence into TTS
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "1") == "1"
+
+# Speech Cache (rendered TTS audio, survives restarts)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".tts_cache")
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "50"))
+TTS_CACHE_MAX_CHARS = int(os.getenv("TTS_CACHE_MAX_CHARS", "120"))  # longer texts are not cached
+
+# Speech Queue
+TTS_QUEUE_SIZE = int(os.getenv("TTS_QUEUE_SIZE", "32"))
+TTS_MAX_DELAY = float(os.getenv("TTS_MAX_DELAY", "60"))  # seconds an answer may wait before it is dropped
+
+# Timers (pending timers are kept here across restarts)
+TIMER_STORE = os.getenv("TIMER_STORE", "timers.json")
+TIMER_SNOOZE_MINUTES = int(os.getenv("TIMER_SNOOZE_MINUTES", "5"))
+
+# Weather
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+WEATHER_TTL = float(os.getenv("WEATHER_TTL", "600"))  # OpenWeather updates every ~10 min
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", "3"))
+WEATHER_REFRESH_AHEAD = os.getenv("WEATHER_REFRESH_AHEAD", "1") == "1"  # keep DEFAULT_CITY always cached
+
+# Web Search (DuckDuckGo Lite)
+SEARCH_URL = os.getenv("SEARCH_URL", "https://duckduckgo.com/lite/")
+SEARCH_BUDGET = float(os.getenv("SEARCH_BUDGET", "4"))  # seconds, partial results after that
+SEARCH_TTL = float(os.getenv("SEARCH_TTL", "3600"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+
+# Camera / Object Detection
+# One or more sources: "0" or "kueche=0,wohnzimmer=1,flur=rtsp://..." (index, file or URL)
+CAMERA_SOURCES = os.getenv("CAMERA_SOURCES", "0")
+CAMERA_MODE = os.getenv("CAMERA_MODE", "motion")  # continuous, motion or on_demand
+CAMERA_CPU_BUDGET = float(os.getenv("CAMERA_CPU_BUDGET", "0.25"))  # share of one core for inference
+CAMERA_MOTION_THRESHOLD = float(os.getenv("CAMERA_MOTION_THRESHOLD", "0.01"))  # fraction of changed pixels
+CAMERA_HISTORY_SECONDS = float(os.getenv("CAMERA_HISTORY_SECONDS", "300"))  # detections kept for "wie viele ... gesehen"
+CAMERA_HISTORY_SIZE = int(os.getenv("CAMERA_HISTORY_SIZE", "16384"))  # ring buffer rows per camera
+
+# Warm-up after boot: audio stack, backend connections, fixed phrases, YOLO.
+# Runs in the background and pauses while Pixel is busy with a turn.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_BUDGET = float(os.getenv("WARMUP_BUDGET", "30"))  # seconds; tasks that don't fit are skipped
+WARMUP_KEEPALIVE = float(os.getenv("WARMUP_KEEPALIVE", "100"))  # seconds between connection refreshes, 0 = off
+WARMUP_CAMERA = os.getenv("WARMUP_CAMERA", "1") == "1"  # load YOLO and run a dummy inference (camera skill only)
+
+# Voice Activity Detection (before audio is uploaded for transcription)
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_END_SILENCE = float(os.getenv("VAD_END_SILENCE", "0.5"))  # seconds of silence that end a phrase
+VAD_MIN_VOICED_MS = int(os.getenv("VAD_MIN_VOICED_MS", "200"))  # less voiced speech -> dropped
+
+# Local Wake Word Gate (only audio after "Pixel" is sent to Whisper)
+# Record templates with: python wakeword.py enroll
+WAKEWORD_ENABLED = os.getenv("WAKEWORD_ENABLED", "1") == "1"
+WAKEWORD_DIR = os.getenv("WAKEWORD_DIR", "wakeword")
+WAKEWORD_THRESHOLD = float(os.getenv("WAKEWORD_THRESHOLD", "18"))  # lower = stricter, check with 'wakeword.py eval'
+WAKEWORD_FOLLOWUP = float(os.getenv("WAKEWORD_FOLLOWUP", "8"))  # seconds after "Pixel" that everything is transcribed
+
+# Transcription Upload (phrases are resampled to 16 kHz mono first)
+STT_UPLOAD_FORMAT = os.getenv("STT_UPLOAD_FORMAT", "flac")  # wav, flac or opus (opus needs ffmpeg)
+STT_OPUS_BITRATE = os.getenv("STT_OPUS_BITRATE", "24k")
+
+# Voice Pipeline (capture -> stt -> skill -> speech)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))  # per stage; full queues drop the oldest phrase
+PIPELINE_SKILL_WORKERS = int(os.getenv("PIPELINE_SKILL_WORKERS", "2"))
+TURN_DEADLINE = float(os.getenv("TURN_DEADLINE", "20"))  # seconds from capture; later turns are dropped
+
+# LLM Answer Cache (time-sensitive questions are never cached)
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "86400"))  # seconds
+ANSWER_CACHE_STORE = os.getenv("ANSWER_CACHE_STORE", "")  # e.g. answers.sqlite to keep answers across restarts
+
+# Web Interface
+STATUS_MIN_INTERVAL = float(os.getenv("STATUS_MIN_INTERVAL", "0.1"))  # seconds between status broadcasts
+LIVE_VIEW_MAX_FPS = float(os.getenv("LIVE_VIEW_MAX_FPS", "10"))  # camera live view in the browser
+WEB_ASYNC_MODE = os.getenv("WEB_ASYNC_MODE", "")  # eventlet, gevent or threading; empty picks the first installed
+WEB_SESSION_WORKERS = int(os.getenv("WEB_SESSION_WORKERS", "8"))  # browser queries answered at the same time
+WEB_SPEAK_RESPONSES = os.getenv("WEB_SPEAK_RESPONSES", "1") == "1"  # also speak web answers locally
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "1") == "1"  # start answering on interim browser transcripts
+SPECULATION_STABLE_MS = int(os.getenv("SPECULATION_STABLE_MS", "300"))  # interim text unchanged this long -> start
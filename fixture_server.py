@@ -0,0 +1,42 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Base for local look-alikes of the external APIs (tests and bench.py).
+    Keep-alive like the real services; subclasses get their own
+    connection and request counters.
+    """
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    requests_served = 0
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def count(self):
+        type(self).requests_served += 1
+
+    def send_body(self, status, content_type, payload):
+        """Complete response with Content-Length; a client that gave up is ignored"""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (timeout)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handler, path=""):
+    """Serve handler on a free local port; returns (server, base url + path)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{path}"
@@ -0,0 +1,39 @@
+import os
+import threading
+import time
+from config import GROQ_POOL_SIZE, GROQ_KEEPALIVE, GROQ_CONNECT_TIMEOUT, GROQ_CHAT_TIMEOUT
+
+# One client per process: keeps TLS connections alive between turns
+_client = None
+_lock = threading.Lock()
+
+def get_client():
+    """Return the shared Groq client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                # Imported here so startup doesn't pay for the SDK
+                import httpx
+                from groq import Groq
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=GROQ_POOL_SIZE,
+                        max_keepalive_connections=GROQ_POOL_SIZE,
+                        keepalive_expiry=GROQ_KEEPALIVE,
+                    ),
+                    timeout=httpx.Timeout(GROQ_CHAT_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+                )
+                _client = Groq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client)
+    return _client
+
+def warm_up():
+    """Open a pooled connection so the first turn skips the TLS handshake"""
+    if not os.getenv("GROQ_API_KEY"):
+        return
+    try:
+        start = time.time()
+        get_client().models.list(timeout=GROQ_CONNECT_TIMEOUT * 2)
+        print(f"Groq connection ready ({int((time.time() - start) * 1000)} ms)")
+    except Exception as e:
+        print(f"Groq warm-up failed: {e}")
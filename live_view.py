@@ -0,0 +1,201 @@
+import time
+import threading
+from collections import OrderedDict
+
+# (scale, JPEG quality), best first
+PROFILES = ((1.0, 80), (0.75, 70), (0.5, 60), (0.33, 50))
+
+# Viewer count at which each profile starts
+VIEWER_STEPS = (1, 3, 6, 16)
+
+
+class Viewer:
+    """One browser watching the stream (Socket.IO sid or MJPEG connection)"""
+    def __init__(self, key):
+        self.key = key
+        self.last_seq = 0
+        self.waiting = False     # Socket.IO: asked for the next frame
+        self.sent_at = 0.0
+        self.sent_bytes = 0
+        self.bandwidth = None    # bytes/s, moving average
+        self.frames = 0
+        self.dropped = 0         # frames that were newer than its last one but never sent
+
+    def delivered(self, seq, size):
+        if self.last_seq and seq > self.last_seq + 1:
+            self.dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        self.sent_at = time.time()
+        self.sent_bytes = size
+        self.frames += 1
+
+    def acknowledged(self):
+        """The viewer is done with the last frame: estimate its bandwidth"""
+        elapsed = time.time() - self.sent_at
+        if self.sent_bytes and elapsed > 0:
+            sample = self.sent_bytes / elapsed
+            self.bandwidth = sample if self.bandwidth is None else 0.7 * self.bandwidth + 0.3 * sample
+
+
+class LiveView:
+    """
+    Shared live camera stream. While anyone watches, a capture thread
+    JPEG-encodes each new camera frame once into a latest-frame buffer;
+    every viewer gets that same buffer. Viewers pull: a Socket.IO client
+    asks for the next frame after it has received the last one, and an
+    MJPEG response only writes when the client has read the previous
+    frame. Slow viewers therefore skip frames instead of queueing them.
+    Resolution and quality drop as viewers are added or their bandwidth
+    falls below what the stream needs.
+    """
+    def __init__(self, frame_source=None, send=None, max_fps=10, sleep=time.sleep):
+        self.frame_source = frame_source  # () -> BGR frame or None
+        self.send = send                  # (viewer key, bytes) for Socket.IO viewers
+        self.max_fps = max_fps
+        self.sleep = sleep                # socketio.sleep under eventlet
+
+        self.lock = threading.Lock()
+        self.viewers = OrderedDict()
+        self.thread = None
+
+        # Latest-frame buffer
+        self.seq = 0
+        self.jpeg = None
+        self.level = 0
+        self.last_frame = None
+
+        # Counters
+        self.encodes = 0
+        self.encode_seconds = 0.0
+        self.frames_sent = 0
+
+    # --- Viewers ---
+
+    def add_viewer(self, key):
+        with self.lock:
+            viewer = self.viewers.get(key) or Viewer(key)
+            self.viewers[key] = viewer
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+                self.thread.start()
+        return viewer
+
+    def remove_viewer(self, key):
+        with self.lock:
+            self.viewers.pop(key, None)
+
+    def request_frame(self, key):
+        """Socket.IO viewer is ready for the next frame"""
+        with self.lock:
+            viewer = self.viewers.get(key)
+            if viewer is None:
+                return
+            viewer.acknowledged()
+            viewer.waiting = True
+            ready = self.jpeg is not None and self.seq > viewer.last_seq
+        if ready:
+            self._deliver(viewer)
+
+    def mjpeg(self, key):
+        """Generator for a multipart/x-mixed-replace response"""
+        viewer = self.add_viewer(key)
+        try:
+            while key in self.viewers:
+                if self.jpeg is None or self.seq <= viewer.last_seq:
+                    self.sleep(0.5 / self.max_fps)
+                    continue
+                seq, jpeg = self.seq, self.jpeg
+                viewer.delivered(seq, len(jpeg))
+                self.frames_sent += 1
+                # Resumes once the server could write it: the client's pace
+                yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " +
+                       str(len(jpeg)).encode("ascii") + b"\r\n\r\n" + jpeg + b"\r\n")
+                viewer.acknowledged()
+        finally:
+            self.remove_viewer(key)
+
+    # --- Capture and encoding ---
+
+    def _capture_loop(self):
+        interval = 1.0 / self.max_fps
+        while True:
+            with self.lock:
+                if not self.viewers:
+                    self.thread = None
+                    return
+            start = time.time()
+            frame = self.frame_source() if self.frame_source else None
+            if frame is not None and frame is not self.last_frame:
+                self.last_frame = frame
+                self._publish(frame)
+            time.sleep(max(0.0, interval - (time.time() - start)))
+
+    def _publish(self, frame):
+        """Encode once, then hand the buffer to every waiting Socket.IO viewer"""
+        self.level = self._choose_level()
+        start = time.time()
+        jpeg = self._encode(frame, *PROFILES[self.level])
+        self.encode_seconds += time.time() - start
+        self.encodes += 1
+        if jpeg is None:
+            return
+
+        with self.lock:
+            self.seq += 1
+            self.jpeg = jpeg
+            waiting = [v for v in self.viewers.values() if v.waiting]
+        for viewer in waiting:
+            self._deliver(viewer)
+
+    def _deliver(self, viewer):
+        with self.lock:
+            if not viewer.waiting:
+                return
+            viewer.waiting = False
+            seq, jpeg = self.seq, self.jpeg
+            viewer.delivered(seq, len(jpeg))
+        self.frames_sent += 1
+        if self.send:
+            self.send(viewer.key, jpeg)
+
+    @staticmethod
+    def _encode(frame, scale, quality):
+        import cv2
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buffer.tobytes() if ok else None
+
+    def _choose_level(self):
+        with self.lock:
+            count = len(self.viewers)
+            rates = sorted(v.bandwidth for v in self.viewers.values() if v.bandwidth)
+        level = max(i for i, step in enumerate(VIEWER_STEPS) if count >= step) if count else 0
+        if not rates or not self.jpeg:
+            return level
+
+        # Step down while the median viewer could not keep up with max_fps
+        median = rates[len(rates) // 2]
+        current_scale = PROFILES[self.level][0]
+        while level < len(PROFILES) - 1:
+            scale = PROFILES[level][0]
+            needed = len(self.jpeg) * (scale / current_scale) ** 2 * self.max_fps
+            if needed <= median:
+                break
+            level += 1
+        return level
+
+    def stats(self):
+        with self.lock:
+            viewers = list(self.viewers.values())
+        scale, quality = PROFILES[self.level]
+        return {
+            "viewers": len(viewers),
+            "encodes": self.encodes,
+            "encode_ms_avg": round(self.encode_seconds / self.encodes * 1000, 2) if self.encodes else 0.0,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": sum(v.dropped for v in viewers),
+            "scale": scale,
+            "quality": quality,
+            "frame_kb": round(len(self.jpeg) / 1024, 1) if self.jpeg else 0.0,
+        }
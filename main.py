@@ -1,11 +1,23 @@
 # import assemblyai as aai # Removed
-from stt import SpeechToText
-from tts import TextToSpeech
-from assistant import Assistant
+import startup
+with startup.phase("import stt"):
+    from stt import SpeechToText
+with startup.phase("import tts"):
+    from tts import TextToSpeech
+with startup.phase("import assistant"):
+    from assistant import Assistant
 import time
 import threading
 import colorama
 import server # Web Interface
+import groq_client
+from pipeline import Pipeline
+from speculation import Speculator
+from sessions import sessions, split_wake_word
+from warmup import WarmUp
+from skills.timer import ALARM_TEXT, TIMER_TEXT
+from config import (GROQ_WARMUP, STREAM_RESPONSES, PIPELINE_QUEUE_SIZE, PIPELINE_SKILL_WORKERS, TURN_DEADLINE,
+                    WEB_SPEAK_RESPONSES, SPECULATION_ENABLED, SPECULATION_STABLE_MS, WARMUP_ENABLED, WARMUP_BUDGET, WARMUP_KEEPALIVE, WARMUP_CAMERA)
 from colorama import Fore, Style
 
 colorama.init()
@@ -13,15 +25,18 @@ colorama.init()
 print(f"{Fore.CYAN}Pixel AI Assistant (Python) is starting...{Style.RESET_ALL}")
 print(f"{Fore.CYAN}Say 'Pixel' to wake me up.{Style.RESET_ALL}")
 
-tts = TextToSpeech()
-assistant = Assistant(tts=tts)
+with startup.phase("init tts"):
+    tts = TextToSpeech()
+with startup.phase("init assistant"):
+    assistant = Assistant(tts=tts)
 
-# Wake word state
-is_active = False
+stt = None
+
+# Acknowledgement after a bare "Pixel"
+ACK_TEXT = "Ja?"
 
 def on_data(transcript):
-    global is_active
-    
+    """Wake word handling for a transcribed turn (runs on the pipeline's STT worker)"""
     if not transcript.text:
         return
 
@@ -31,74 +46,149 @@ def on_data(transcript):
         print(f"{Fore.GREEN}User: {text}{Style.RESET_ALL}")
     except:
         print(f"User: {text}")
-    
-    # Check for Wake Word "Pixel"
-    if "pixel" in text.lower() or is_active:
-        is_active = True 
-        
-        # Remove "Pixel" from start if present
-        query = text
-        lower_text = query.lower()
-        if "pixel" in lower_text:
-            # Simple split to get content after pixel
-            parts = lower_text.split("pixel", 1)
-            if len(parts) > 1 and parts[1].strip():
-                # We need to preserve case, so match index
-                idx = query.lower().index("pixel")
-                query = query[idx+5:].strip()
-            elif lower_text.strip() == "pixel":
-                query = ""
-
-        # If there's a query after "Pixel", process it
-        if query:
-            try:
-                print(f"{Fore.YELLOW}Processing: {query}{Style.RESET_ALL}")
-            except:
-                pass
-                
-            response = assistant.process_query(query)
-            try:
-                print(f"{Fore.CYAN}Pixel: {response}{Style.RESET_ALL}")
-            except:
-                print(f"Pixel: {response}")
-                
-            tts.speak(response)
-            is_active = False 
-        else:
-            # Just woke up
-            print(f"{Fore.CYAN}Listening for command...{Style.RESET_ALL}")
-            server.emit_status("listening", "Listening...")
-            tts.speak("Ja?")
-
-    # Debug: log ignored input
-    elif not is_active and text:
+
+    # Wake state is kept per source (local microphone or browser session)
+    session = sessions.open(transcript.source)
+    if split_wake_word(text)[0]:
+        # Barge-in: the user wants to talk, cut off whatever Pixel is saying
+        # and drop older turns of this source that are still waiting or running
+        pipeline.cancel(keep=transcript)
+        tts.interrupt()
+
+    query = session.hear(text)
+    if query is None:
         # Gray out the text to show it was heard but not processed
         print(f"{Style.DIM}Ignored: {text} (Say 'Pixel' to wake){Style.RESET_ALL}")
+    elif query:
+        try:
+            print(f"{Fore.YELLOW}Processing: {query}{Style.RESET_ALL}")
+        except:
+            pass
+
+        # Skill and speech run on their own workers, the next phrase can already be transcribed
+        pipeline.answer(transcript, query)
+    else:
+        # Just woke up
+        print(f"{Fore.CYAN}Listening for command...{Style.RESET_ALL}")
+        server.emit_status("listening", "Listening...")
+        tts.speak(ACK_TEXT)
+
+def on_web_input(text, sid):
+    """
+    Text from one browser session (runs on the web worker pool, so
+    sessions are answered concurrently). Returns the reply for that
+    session, or None if the phrase was ignored.
+    """
+    print(f"[Web {sid[:6]}] User: {text}")
+    session = sessions.get(sid)
+    if session is None:
+        return None  # the browser disconnected while the phrase was queued
+    query = session.hear(text)
+    if not query:
+        speculator.discard(sid)
+        return None if query is None else ACK_TEXT
+
+    # Already answered from the interim transcript, or answer now
+    response = speculator.final(sid, query)
+    if response is None:
+        response = assistant.process_query(query)
+    print(f"[Web {sid[:6]}] Pixel: {response}")
+    if WEB_SPEAK_RESPONSES and response:
+        tts.speak(response)
+    return response
+
+def on_web_partial(text, sid):
+    """Interim text from a browser: speculate only if it will be a question for Pixel"""
+    session = sessions.get(sid)
+    if session is None:
+        return
+    woke, query = split_wake_word(text)
+    if woke or session.active:
+        speculator.partial(sid, query)
+
+def respond(query):
+    return assistant.process_query(query, stream=STREAM_RESPONSES)
+
+def speak(turn):
+    if isinstance(turn.response, str):
+        print_response(turn.response)
+        tts.speak(turn.response, t0=turn.t0)
+    else:
+        # LLM answer arrives sentence by sentence
+        tts.speak_stream(echo_sentences(turn.response), t0=turn.t0)
+
+def transcribe(audio):
+    return stt.transcribe(audio)
+
+def print_response(response):
+    try:
+        print(f"{Fore.CYAN}Pixel: {response}{Style.RESET_ALL}")
+    except:
+        print(f"Pixel: {response}")
+
+def echo_sentences(sentences):
+    for sentence in sentences:
+        print_response(sentence)
+        yield sentence
+
+def start_warm_up():
+    """Warm everything the first turn would otherwise wait for, in the background"""
+    warm = WarmUp(budget=WARMUP_BUDGET, busy=lambda: pipeline.busy() or tts.busy(), keepalive=WARMUP_KEEPALIVE)
+    warm.add("routing", assistant.router.warm_up)
+    warm.add("audio", tts.preload)
+    if GROQ_WARMUP:
+        warm.add("groq", groq_client.warm_up, repeat=True)
+    warm.add("connections", assistant.warm_up_connections, repeat=True)
+    warm.add("phrases", lambda: tts.prerender([ACK_TEXT, ALARM_TEXT, TIMER_TEXT]))
+    if WARMUP_CAMERA and assistant.camera_enabled:
+        warm.add("camera", assistant.warm_up_camera)
+    return warm.start()
 
 def start_web_server():
     server.start_server()
 
+# capture -> stt -> skill -> speech, each stage on its own worker(s)
+pipeline = Pipeline(transcribe, on_data, respond, speak, queue_size=PIPELINE_QUEUE_SIZE,
+                    skill_workers=PIPELINE_SKILL_WORKERS, deadline=TURN_DEADLINE)
+
+# Web questions are answered from interim transcripts when they settle early
+speculator = Speculator(assistant.router.classify, assistant.process_query, server.workers.submit,
+                        stable=SPECULATION_STABLE_MS / 1000, enabled=SPECULATION_ENABLED)
+
 def main():
-    # Setup Web Input Handler
-    server.set_input_handler(on_data)
+    global stt
+
+    # Setup Web Input Handler (already transcribed text, one session per browser)
+    server.set_input_handler(on_web_input, partial=on_web_partial, closed=speculator.discard)
+    server.set_frame_source(assistant.camera_frame)
 
     # Start Web Interface in Background
-    web_thread = threading.Thread(target=start_web_server, daemon=True)
-    web_thread.start()
+    with startup.phase("start web"):
+        web_thread = threading.Thread(target=start_web_server, daemon=True)
+        web_thread.start()
     
-    stt = SpeechToText(on_data)
+    with startup.phase("init stt"):
+        stt = SpeechToText(on_audio=pipeline.submit_audio)
     
     print(f"{Fore.GREEN}[OK] System Online. Listening for 'Pixel'...{Style.RESET_ALL}")
+    startup.report()
     tts.speak("Pixel ist bereit.")
-    
+
     try:
         stt.start_stream()
+
+        # Listener is running; warm models, connections and phrases behind it
+        if WARMUP_ENABLED:
+            start_warm_up()
         # Keep main thread alive
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
         print(f"\n{Fore.RED}Scaling down...{Style.RESET_ALL}")
         stt.stop_stream()
+        print(f"Pipeline stats: {pipeline.stats()}")
+        print(f"Answer cache: {assistant.answers.stats()}")
+        print(f"Speculation: {speculator.stats()}")
 
 if __name__ == "__main__":
     main()
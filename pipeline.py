@@ -0,0 +1,209 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from tracing import tracer
+
+
+def percentile(values, p):
+    """p-th percentile of a small sample (nearest rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class Turn:
+    """One user utterance on its way through the pipeline"""
+    _ids = itertools.count(1)
+
+    def __init__(self, audio=None, source="mic", deadline=20.0):
+        self.id = next(self._ids)  # increases with capture order
+        self.audio = audio
+        self.text = None          # transcript (set by the STT stage)
+        self.source = source
+        self.created = time.time()
+        self.deadline = self.created + deadline
+        self.query = None
+        self.response = None
+        self.t0 = None            # start of answering, for the time-to-first-audio metric
+        self.enqueued = self.created
+
+    def expired(self):
+        return time.time() > self.deadline
+
+
+class Stage:
+    """A bounded queue served by a fixed number of worker threads"""
+    def __init__(self, name, handler, pipeline, workers=1, maxsize=4):
+        self.name = name
+        self.handler = handler
+        self.pipeline = pipeline
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.lock = threading.Lock()
+
+        # Counters (guarded by lock: a stage can have several workers)
+        self.processed = 0
+        self.dropped = 0     # rejected because the queue was full
+        self.cancelled = 0   # superseded by a newer wake word
+        self.expired = 0     # past the turn deadline
+        self.errors = 0
+        self.active = 0      # turns in the handler right now
+        self.wait_ms = deque(maxlen=200)
+        self.service_ms = deque(maxlen=200)
+
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True).start()
+
+    def offer(self, turn):
+        """Enqueue without blocking; under backpressure the oldest queued turn is dropped"""
+        turn.enqueued = time.time()
+        while True:
+            try:
+                self.queue.put_nowait(turn)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    with self.lock:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def put(self, turn):
+        """Enqueue, waiting for space at most until the turn's deadline"""
+        turn.enqueued = time.time()
+        try:
+            self.queue.put(turn, timeout=max(0.0, turn.deadline - time.time()))
+            return True
+        except queue.Full:
+            with self.lock:
+                self.expired += 1
+            print(f"Pipeline: turn {turn.id} dropped, {self.name} stage is full")
+            return False
+
+    def _work(self):
+        while True:
+            turn = self.queue.get()
+            start = time.time()
+            self.wait_ms.append((start - turn.enqueued) * 1000)
+
+            if not self.pipeline.is_current(turn):
+                with self.lock:
+                    self.cancelled += 1
+                continue
+            if turn.expired():
+                with self.lock:
+                    self.expired += 1
+                print(f"Pipeline: turn {turn.id} missed its deadline before {self.name}")
+                continue
+
+            with self.lock:
+                self.active += 1
+            try:
+                with tracer.turn(turn.id):
+                    self.handler(turn)
+            except Exception as e:
+                with self.lock:
+                    self.errors += 1
+                print(f"Pipeline {self.name} error: {e}")
+            finally:
+                # Always undone, or busy() would stay True and hold off the warm-up for good
+                with self.lock:
+                    self.active -= 1
+                    self.processed += 1
+            self.service_ms.append((time.time() - start) * 1000)
+
+    def stats(self):
+        with self.lock:
+            counts = {"processed": self.processed, "queued": self.queue.qsize(), "dropped": self.dropped,
+                      "cancelled": self.cancelled, "expired": self.expired, "errors": self.errors}
+        return dict(counts,
+                    wait_ms_p50=round(percentile(self.wait_ms, 50)),
+                    wait_ms_p95=round(percentile(self.wait_ms, 95)),
+                    service_ms_p50=round(percentile(self.service_ms, 50)),
+                    service_ms_p95=round(percentile(self.service_ms, 95)))
+
+
+class Pipeline:
+    """
+    Voice loop as independent stages:
+    capture -> stt -> skill -> speech.
+    The capture thread only enqueues audio, so it never waits on Groq,
+    skills or playback. A new wake word cancels every older turn of
+    the same source (session).
+
+    transcribe(audio) -> text or None
+    on_transcript(turn) decides (wake word) whether to call answer(turn, query)
+    respond(query) -> str or a generator of sentences
+    speak(turn) plays turn.response
+    """
+    def __init__(self, transcribe, on_transcript, respond, speak, queue_size=4, skill_workers=2, deadline=20.0):
+        self.transcribe = transcribe
+        self.on_transcript = on_transcript
+        self.respond = respond
+        self.speak = speak
+        self.deadline = deadline
+        self.cutoffs = {}  # source -> turns captured before this id are cancelled
+
+        self.stt = Stage("stt", self._stt, self, workers=1, maxsize=queue_size)
+        self.skill = Stage("skill", self._skill, self, workers=skill_workers, maxsize=queue_size)
+        self.speech = Stage("speech", self._speech, self, workers=1, maxsize=queue_size)
+        self.stages = (self.stt, self.skill, self.speech)
+
+    # --- Entry points ---
+
+    def submit_audio(self, audio, source="mic"):
+        """Called from the capture thread; never blocks"""
+        turn = Turn(audio=audio, source=source, deadline=self.deadline)
+        tracer.begin_turn(turn.id, turn.created)
+        if hasattr(audio, "frame_data"):
+            seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            tracer.record("capture", turn.created - seconds, turn.created, turn.id)
+        self.stt.offer(turn)
+        return turn
+
+    def answer(self, turn, query):
+        """Hand a recognized query to the skill stage"""
+        turn.query = query
+        self.skill.put(turn)
+
+    def cancel(self, keep=None, source="mic"):
+        """
+        Cancel every turn of keep's source captured before keep (new wake
+        word), or all turns of source so far. Speech captured after keep
+        is still processed.
+        """
+        if keep is not None:
+            self.cutoffs[keep.source] = keep.id
+        else:
+            self.cutoffs[source] = next(Turn._ids)
+
+    def is_current(self, turn):
+        return turn.id >= self.cutoffs.get(turn.source, 0)
+
+    # --- Stages ---
+
+    def _stt(self, turn):
+        with tracer.span("stt"):
+            turn.text = self.transcribe(turn.audio)
+        turn.audio = None
+        if turn.text:
+            self.on_transcript(turn)
+
+    def _skill(self, turn):
+        turn.t0 = time.time()
+        turn.response = self.respond(turn.query)
+        if turn.response and self.is_current(turn):
+            self.speech.put(turn)
+
+    def _speech(self, turn):
+        self.speak(turn)
+
+    def busy(self):
+        """A turn is queued or being handled in any stage"""
+        return any(stage.active or not stage.queue.empty() for stage in self.stages)
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,240 @@
+import re
+
+# Matches: "5 Minuten", "30 sekunden", "1 stunde"
+DURATION_RE = re.compile(r'(\d+)\s+(minute|minuten|sekunde|sekunden|stunde|stunden)')
+
+# Matches: "um 7 Uhr", "auf 6:30", "um 7 uhr 15"
+CLOCK_TIME_RE = re.compile(r'\b(?:um|auf|für)\s+(\d{1,2})(?:[:.](\d{2})|\s+uhr(?:\s+(\d{1,2}))?)')
+
+# Matches: "in der Küche", "im Wohnzimmer", "in den Flur" (the article is skipped)
+ROOM_RE = re.compile(r'\b(?:im|in|vom|von)\s+(?:(?:der|dem|den|die|das)\s+)?(\w+)')
+
+# Matches: "wie viele Personen", "wieviele Tassen"
+COUNT_RE = re.compile(r'\bwie\s?viele\s+(\w+)')
+
+SEARCH_TRIGGERS = ["suche nach", "suche", "finde", "googlen", "search for", "search", "im internet", "wer ist", "was ist"]
+
+
+class Intent:
+    """Result of routing a transcript: intent name plus extracted slots"""
+    def __init__(self, name, slots=None):
+        self.name = name
+        self.slots = slots or {}
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, {self.slots!r})"
+
+
+class Rule:
+    """
+    One routing rule.
+    groups:   list of keyword lists, every group needs at least one hit (AND of ORs)
+    exclude:  keywords that veto the rule ("time but not timer")
+    priority: lower wins when several rules match
+    skill:    rule is only compiled in if that skill is enabled
+    slots:    callable(text, text_lower) -> dict, or None to fall through
+    """
+    def __init__(self, name, groups, priority, exclude=(), skill=None, slots=None):
+        self.name = name
+        self.groups = [list(g) for g in groups]
+        self.priority = priority
+        self.exclude = list(exclude)
+        self.skill = skill
+        self.slots = slots
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton: finds every keyword in one pass over the text"""
+    def __init__(self, keywords):
+        # keywords: dict keyword -> iterable of labels
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [frozenset()]
+
+        for keyword, labels in keywords.items():
+            state = 0
+            for ch in keyword:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(frozenset())
+                state = nxt
+            self.out[state] = self.out[state] | frozenset(labels)
+
+        # Breadth-first pass to build failure links and merge outputs along them
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] | self.out[self.fail[nxt]]
+
+    def scan(self, text):
+        """Return the set of labels of all keywords occurring in text"""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class IntentRouter:
+    """Classifies a transcript in a single pass over all trigger lists"""
+    def __init__(self, rules, skills=None):
+        if skills is not None:
+            rules = [r for r in rules if r.skill is None or r.skill in skills]
+        self.rules = sorted(rules, key=lambda r: r.priority)
+
+        # Every (rule, group) pair gets a label, exclusions use group -1
+        keywords = {}
+        for idx, rule in enumerate(self.rules):
+            for g, group in enumerate(rule.groups):
+                for kw in group:
+                    keywords.setdefault(kw, set()).add((idx, g))
+            for kw in rule.exclude:
+                keywords.setdefault(kw, set()).add((idx, -1))
+        self.automaton = KeywordAutomaton(keywords)
+
+    def warm_up(self):
+        """Route one phrase per rule, so every slot extractor has run once"""
+        for rule in self.rules:
+            self.classify(" ".join(group[0] for group in rule.groups) + " 5 minuten um 7 uhr in der küche: test")
+        return len(self.rules)
+
+    def classify(self, text):
+        """Return the winning Intent for text ('ai' if nothing matches)"""
+        text_lower = text.lower()
+        hits = self.automaton.scan(text_lower)
+
+        # Only rules that had at least one hit are candidates
+        candidates = sorted({idx for idx, g in hits if g >= 0})
+        for idx in candidates:
+            rule = self.rules[idx]
+            if (idx, -1) in hits:
+                continue
+            if not all((idx, g) in hits for g in range(len(rule.groups))):
+                continue
+            slots = rule.slots(text, text_lower) if rule.slots else {}
+            if slots is None:
+                continue
+            return Intent(rule.name, slots)
+
+        return Intent("ai", {"text": text})
+
+
+# --- Slot extractors ---
+
+def _timer_slots(text, text_lower):
+    match = DURATION_RE.search(text_lower)
+    if not match:
+        return None
+    return {"amount": match.group(1), "unit": match.group(2)}
+
+def _alarm_slots(text, text_lower):
+    match = CLOCK_TIME_RE.search(text_lower)
+    if not match:
+        return None
+    hour = int(match.group(1))
+    minute = int(match.group(2) or match.group(3) or 0)
+    if hour > 23 or minute > 59:
+        return None
+    return {"hour": hour, "minute": minute}
+
+def _snooze_slots(text, text_lower):
+    match = DURATION_RE.search(text_lower)
+    minutes = match.group(1) if match and "minute" in match.group(2) else None
+    return {"minutes": minutes}
+
+def _room_slots(text, text_lower):
+    # "Was siehst du in der Küche?" -> room "küche"
+    match = ROOM_RE.search(text_lower)
+    return {"room": match.group(1) if match else None}
+
+def _count_slots(text, text_lower):
+    # "Wie viele Personen hast du in der letzten Minute gesehen?" -> object "personen", 60 s
+    match = COUNT_RE.search(text_lower)
+    if not match:
+        return None
+    seconds = None
+    duration = DURATION_RE.search(text_lower)
+    if duration:
+        seconds = int(duration.group(1)) * {"sek": 1, "min": 60, "stu": 3600}[duration.group(2)[:3]]
+    elif "letzten minute" in text_lower:
+        seconds = 60
+    elif "letzten stunde" in text_lower:
+        seconds = 3600
+    elif "gesehen" in text_lower:
+        seconds = 300
+    # "in der letzten Minute" is not a room, a later "in der Küche" may be
+    rooms = [m.group(1) for m in ROOM_RE.finditer(text_lower) if m.group(1) not in ("letzten", "letzte")]
+    return {"object": match.group(1), "seconds": seconds, "room": rooms[0] if rooms else None}
+
+def _search_slots(text, text_lower):
+    query = text_lower
+    for trigger in SEARCH_TRIGGERS:
+        query = query.replace(trigger, "").strip()
+    if not query:
+        return None
+    return {"query": query}
+
+def _notification_slots(text, text_lower):
+    # "Sende Benachrichtigung an Handy: Hallo Welt"
+    parts = text.split(":", 1)
+    msg = parts[1].strip() if len(parts) > 1 else "Test"
+    target = "PC" if "pc" in text_lower else "Mobile"
+    return {"target": target, "message": msg}
+
+def _weather_slots(text, text_lower):
+    # Simplistic city extraction: the word after "in"
+    city = None
+    words = text.split()
+    if "in" in words:
+        city_idx = words.index("in") + 1
+        if city_idx < len(words):
+            city = words[city_idx].strip("?.!,") or None
+    return {"city": city}
+
+
+CANCEL_KEYWORDS = ["abbrechen", "lösche", "stopp", "stoppe", "beende", "cancel", "ausschalten"]
+
+# Whole words only: a bare "weck" would also match "Zweck"
+WAKE_UP_KEYWORDS = ["wecke mich", "weck mich", "wecke uns", "weck uns", "wecker", "aufweck"]
+
+
+def default_rules(weather_keywords):
+    """Built-in intents, in the same precedence the old keyword cascade used"""
+    return [
+        Rule("snooze", [["schlummer", "snooze"]], 5, skill="timer", slots=_snooze_slots),
+        Rule("alarm_cancel", [["wecker", "alarm"], CANCEL_KEYWORDS], 6, skill="timer"),
+        Rule("timer_cancel", [["timer", "countdown"], CANCEL_KEYWORDS], 6, exclude=["wecker", "alarm"], skill="timer"),
+        Rule("timer_list", [["timer", "wecker", "countdown"], ["welche", "wie lange", "wie viel zeit", "liste"]], 7, skill="timer"),
+        Rule("timer", [["timer", "wecker", "countdown"]], 10, skill="timer", slots=_timer_slots),
+        Rule("alarm", [WAKE_UP_KEYWORDS + ["alarm"]], 12, skill="timer", slots=_alarm_slots),
+        Rule("stopwatch_start", [["stoppuhr", "stopwatch"], ["start", "los", "go"]], 20, skill="timer"),
+        Rule("stopwatch_stop", [["stoppuhr", "stopwatch"], ["stop", "stopp", "ende", "halt", "aus"]], 21, skill="timer"),
+        Rule("time", [["spät", "uhr", "zeit", "clock", "time", "datum", "welcher tag"]], 30,
+             exclude=["timer", "countdown", "stoppuhr"] + WAKE_UP_KEYWORDS),
+        Rule("search", [SEARCH_TRIGGERS], 40,
+             exclude=["wetter", "uhr", "zeit", "kamera", "benachrichtigung"], slots=_search_slots),
+        Rule("notification", [["benachrichtigung", "send notification"]], 50, slots=_notification_slots),
+        Rule("weather", [weather_keywords], 60, slots=_weather_slots),
+        Rule("camera_start", [["starte kamera", "kamera starten", "öffne kamera", "camera start", "kamera an"]], 70, skill="camera"),
+        Rule("camera_stop", [["stoppe kamera", "kamera stoppen", "schließe kamera", "camera stop", "kamera aus"]], 71, skill="camera"),
+        Rule("camera_count", [["wie viele", "wieviele"], ["gesehen", "siehst", "im bild", "kamera", "letzten minute", "letzten stunde"]], 69,
+             skill="camera", slots=_count_slots),
+        Rule("camera_describe", [["was siehst du", "erkennen", "identifizieren", "was ist das", "siehe", "detect", "identify"]], 72, skill="camera", slots=_room_slots),
+    ]
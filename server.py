@@ -1,60 +1,309 @@
-from flask import Flask, render_template, request
-from flask_socketio import SocketIO, emit
+import itertools
+from flask import Flask, Response, render_template, request
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tracing import tracer
+from live_view import LiveView
+from sessions import sessions
+from config import STATUS_MIN_INTERVAL, LIVE_VIEW_MAX_FPS, WEB_ASYNC_MODE, WEB_SESSION_WORKERS
 
 # Disable Flask logging
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
 app = Flask(__name__)
-socketio = SocketIO(app, cors_allowed_origins="*")
+# eventlet or gevent when installed (see requirements.txt), Werkzeug threads otherwise
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=WEB_ASYNC_MODE or None)
+
+
+class ThreadSafeEmitter:
+    """
+    Emits from plain OS threads (timers, TTS, pipeline, skills, camera
+    capture). Under eventlet/gevent the process is not monkey-patched
+    (pyaudio, YOLO and the worker pool need real threads), so only the
+    server thread may write to the sockets: emits from other threads are
+    queued and sent by a background task on the server's event loop.
+    """
+    def __init__(self, socketio, poll=0.005):
+        self.socketio = socketio
+        self.poll = poll
+        self.queue = queue.SimpleQueue()
+        self.thread_id = None  # server thread, set by start()
+
+    def start(self):
+        """Call on the server thread before it starts serving"""
+        if self.thread_id is None and self.socketio.async_mode != 'threading':
+            self.thread_id = threading.get_ident()
+            self.socketio.start_background_task(self._drain)
+
+    def emit(self, event, *args, **kwargs):
+        if self.thread_id is None or threading.get_ident() == self.thread_id:
+            self.socketio.emit(event, *args, **kwargs)
+        else:
+            self.queue.put((event, args, kwargs))
+
+    def _drain(self):
+        while True:
+            try:
+                event, args, kwargs = self.queue.get_nowait()
+            except queue.Empty:
+                self.socketio.sleep(self.poll)
+                continue
+            try:
+                self.socketio.emit(event, *args, **kwargs)
+            except Exception as e:
+                print(f"Socket Error: {e}")
+
+
+emitter = ThreadSafeEmitter(socketio)
+
+# Every client joins its device room and these topic rooms on connect;
+# "metrics" (live trace spans) is opt-in
+DEFAULT_TOPICS = ("status", "notifications")
+
+
+def device_room(device):
+    return f"device:{device}"
+
+def topic_room(topic):
+    return f"topic:{topic}"
+
+
+class ClientRegistry:
+    """Thread-safe sid -> client info, with device and topic counts for room emits"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}  # sid -> {"device", "ua", "topics"}
+
+    def add(self, sid, device, user_agent):
+        with self.lock:
+            self.clients[sid] = {"device": device, "ua": user_agent, "topics": set(DEFAULT_TOPICS)}
+
+    def remove(self, sid):
+        with self.lock:
+            return self.clients.pop(sid, None)
+
+    def subscribe(self, sid, topic):
+        with self.lock:
+            if sid in self.clients:
+                self.clients[sid]["topics"].add(topic)
+
+    def unsubscribe(self, sid, topic):
+        with self.lock:
+            if sid in self.clients:
+                self.clients[sid]["topics"].discard(topic)
+
+    def count(self, device=None, topic=None):
+        """Connected clients, optionally only of one device type and/or topic"""
+        with self.lock:
+            return sum(1 for info in self.clients.values()
+                       if (device is None or info["device"] == device)
+                       and (topic is None or topic in info["topics"]))
+
+    def __len__(self):
+        with self.lock:
+            return len(self.clients)
+
+
+class StatusCoalescer:
+    """
+    Rate-limits status broadcasts: at most one emit per interval, carrying
+    the latest state. Intermediate states within an interval are dropped
+    and an unchanged state is not sent again.
+    """
+    def __init__(self, send, interval=0.1):
+        self.send = send
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.latest = None
+        self.last_sent = None
+        self.last_time = 0.0
+        self.scheduled = False
+
+        # Counters
+        self.submitted = 0
+        self.emitted = 0
+
+    def submit(self, state, text=""):
+        with self.lock:
+            self.submitted += 1
+            self.latest = {"state": state, "text": text}
+            if self.scheduled:
+                return
+            wait = self.last_time + self.interval - time.time()
+            if wait > 0:
+                self.scheduled = True
+                timer = threading.Timer(wait, self.flush)
+                timer.daemon = True
+                timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.scheduled = False
+            payload, self.latest = self.latest, None
+            if payload is None or payload == self.last_sent:
+                return
+            self.last_sent = payload
+            self.last_time = time.time()
+            self.emitted += 1
+        self.send(payload)
+
+    def stats(self):
+        return {"submitted": self.submitted, "emitted": self.emitted}
+
 
 # Clients store
-clients = {}
+clients = ClientRegistry()
+
+# Camera live view, shared by all viewers (frame source set by main)
+live_view = LiveView(send=lambda sid, jpeg: emitter.emit('live_frame', jpeg, to=sid),
+                     max_fps=LIVE_VIEW_MAX_FPS, sleep=socketio.sleep)
+mjpeg_ids = itertools.count(1)
+
+def set_frame_source(source):
+    """source() returns the latest camera frame or None"""
+    live_view.frame_source = source
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/metrics')
+def metrics():
+    """Per-stage latency histograms in Prometheus text format"""
+    return Response(tracer.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/live.mjpg')
+def live_mjpeg():
+    """Camera live view as MJPEG (works in a plain <img> tag)"""
+    return Response(live_view.mjpeg(f"mjpeg-{next(mjpeg_ids)}"),
+                    mimetype="multipart/x-mixed-replace; boundary=frame")
+
+@socketio.on('live_view_start')
+def handle_live_view_start(data=None):
+    live_view.add_viewer(request.sid)
+    live_view.request_frame(request.sid)
+
+@socketio.on('live_view_next')
+def handle_live_view_next(data=None):
+    # The client got the last frame; the next one is sent as soon as there is a newer one
+    live_view.request_frame(request.sid)
+
+@socketio.on('live_view_stop')
+def handle_live_view_stop(data=None):
+    live_view.remove_viewer(request.sid)
+
+def push_span(span):
+    emitter.emit('trace', span, room=topic_room('metrics'))
+
+@socketio.on('subscribe_metrics')
+def handle_subscribe_metrics(data=None):
+    join_room(topic_room('metrics'))
+    clients.subscribe(request.sid, 'metrics')
+    tracer.listener = push_span
+    emit('metrics', tracer.snapshot())
+
+@socketio.on('unsubscribe_metrics')
+def handle_unsubscribe_metrics(data=None):
+    leave_room(topic_room('metrics'))
+    clients.unsubscribe(request.sid, 'metrics')
+    _update_metrics_listener()
+
+def _update_metrics_listener():
+    if not clients.count(topic='metrics'):
+        # Nobody is watching: spans are only aggregated, not pushed
+        tracer.listener = None
+
 @socketio.on('connect')
 def handle_connect():
     client_id = request.sid
-    user_agent = request.headers.get('User-Agent')
+    user_agent = request.headers.get('User-Agent', '')
     
     device_type = "PC"
     if "Mobile" in user_agent or "Android" in user_agent or "iPhone" in user_agent:
         device_type = "Mobile"
         
-    clients[client_id] = {"device": device_type, "ua": user_agent}
+    clients.add(client_id, device_type, user_agent)
+    sessions.open(client_id)
+    join_room(device_room(device_type))
+    for topic in DEFAULT_TOPICS:
+        join_room(topic_room(topic))
     print(f"[Web] New Client Connected: {device_type} ({client_id})")
     emit('status', {'state': 'connected', 'message': 'Connected to Pixel Core'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    if request.sid in clients:
-        del clients[request.sid]
+    # Socket.IO leaves all rooms of the sid by itself
+    clients.remove(request.sid)
+    sessions.remove(request.sid)
+    if closed_callback:
+        closed_callback(request.sid)
+    live_view.remove_viewer(request.sid)
+    _update_metrics_listener()
 
 def start_server():
     """Starts the Flask-SocketIO server"""
-    print("Starting Web Interface on 0.0.0.0:5000")
-    socketio.run(app, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
+    print(f"Starting Web Interface on 0.0.0.0:5000 ({socketio.async_mode})")
+    emitter.start()
+    if socketio.async_mode == 'threading':
+        # Neither eventlet nor gevent installed: Werkzeug development server
+        socketio.run(app, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
+    else:
+        socketio.run(app, host='0.0.0.0', port=5000)
+
+def _send_status(payload):
+    try:
+        emitter.emit('pixel_state', payload, room=topic_room('status'))
+    except Exception as e:
+        print(f"Socket Error: {e}")
+
+status = StatusCoalescer(_send_status, STATUS_MIN_INTERVAL)
 
 def emit_status(state, text=""):
     """
-    Emits a status update to all connected clients.
+    Emits a status update to all clients in the status room, coalesced
+    to at most one update per STATUS_MIN_INTERVAL.
     States: 'listening', 'processing', 'speaking', 'idle'
     """
     try:
-        socketio.emit('pixel_state', {'state': state, 'text': text})
+        status.submit(state, text)
     except Exception as e:
         print(f"Socket Error: {e}")
 
-# Callback for input handling (Text or Audio)
+# Callback for input handling: (text, sid) -> reply for that session or None
 input_callback = None
+# Callback for interim transcripts: (text, sid), must not block
+partial_callback = None
+# Called with the sid when a browser session ends
+closed_callback = None
 
-def set_input_handler(callback):
-    global input_callback
+# Web queries run here, so one slow answer never holds up the other sessions
+workers = ThreadPoolExecutor(max_workers=WEB_SESSION_WORKERS, thread_name_prefix="web")
+
+def set_input_handler(callback, partial=None, closed=None):
+    global input_callback, partial_callback, closed_callback
     input_callback = callback
+    partial_callback = partial
+    closed_callback = closed
+
+def run_in_pool(fn, *args):
+    """
+    Runs a blocking call on the worker pool. The handler waits with
+    socketio.sleep, so under eventlet/gevent the other sessions keep
+    being served meanwhile (the pool threads are real OS threads).
+    """
+    future = workers.submit(fn, *args)
+    delay = 0.001
+    while not future.done():
+        socketio.sleep(delay)
+        delay = min(delay * 2, 0.02)
+    return future.result()
 
 @socketio.on('audio_input')
 def handle_audio_input(data):
@@ -65,16 +314,32 @@ def handle_audio_input(data):
     text = data.get('text')
     if text and input_callback:
         print(f"[Web] Received Voice Command: {text}")
-        input_callback(text)
+        try:
+            response = run_in_pool(input_callback, text, request.sid)
+        except Exception as e:
+            print(f"[Web] Error: {e}")
+            response = "Es gab einen Fehler bei der Verarbeitung."
+        if response:
+            # Only to the session that asked
+            emit('response', {'text': response})
+
+@socketio.on('audio_partial')
+def handle_audio_partial(data):
+    """Interim hypothesis while the user is still speaking (may change, no reply)"""
+    text = data.get('text')
+    if text and partial_callback:
+        partial_callback(text, request.sid)
 
 def send_notification(target_device, message):
     """
     Sends a notification event to specific devices.
     target_device: 'Mobile', 'PC', or 'All'
     """
-    count = 0
-    for sid, info in clients.items():
-        if target_device == "All" or info['device'] == target_device:
-            socketio.emit('notification', {'message': message}, room=sid)
-            count += 1
+    if target_device == "All":
+        room, count = topic_room('notifications'), clients.count(topic='notifications')
+    else:
+        room, count = device_room(target_device), clients.count(device=target_device)
+    if count:
+        # One emit per room, Socket.IO fans it out
+        emitter.emit('notification', {'message': message}, room=room)
     return count
@@ -0,0 +1,71 @@
+import time
+import threading
+
+WAKE_WORD = "pixel"
+
+
+def split_wake_word(text):
+    """(heard the wake word, text after it); without the wake word the whole text"""
+    idx = text.lower().find(WAKE_WORD)
+    if idx < 0:
+        return False, text.strip()
+    return True, text[idx + len(WAKE_WORD):].lstrip(" ,.!?").strip()
+
+
+class Session:
+    """Conversation state of one input: the local microphone or one browser (Socket.IO sid)"""
+    def __init__(self, key):
+        self.key = key
+        self.active = False    # woke up, the next phrase is the command
+        self.created = time.time()
+        self.last_seen = self.created
+        self.queries = 0
+
+    def hear(self, text):
+        """
+        Wake word handling for one phrase.
+        Returns the query to answer, "" if the session just woke up,
+        or None if the phrase is ignored (not awake).
+        """
+        self.last_seen = time.time()
+        woke, query = split_wake_word(text)
+        if not woke and not self.active:
+            return None
+        if query:
+            self.active = False
+            self.queries += 1
+        else:
+            self.active = True
+        return query
+
+
+class SessionStore:
+    """Thread-safe key -> Session; browsers are opened on connect, the microphone on first use"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+    def open(self, key):
+        """The session for key, created if there is none"""
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None:
+                session = self.sessions[key] = Session(key)
+            return session
+
+    def get(self, key):
+        """The session for key, or None (never brings back a removed session)"""
+        with self.lock:
+            return self.sessions.get(key)
+
+    def remove(self, key):
+        with self.lock:
+            return self.sessions.pop(key, None)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.sessions)
+
+
+# Process-wide sessions ("mic" for the local microphone, sids for browsers)
+sessions = SessionStore()
@@ -2,46 +2,205 @@ import cv2
 import threading
 import time
 import base64
-from io import BytesIO
-from PIL import Image
+import importlib.util
+from skills.detections import DetectionStore
 
-try:
-    from ultralytics import YOLO
-    YOLO_AVAILABLE = True
-except ImportError:
-    YOLO_AVAILABLE = False
+# ultralytics (and torch behind it) is only imported once the camera starts
+YOLO_AVAILABLE = importlib.util.find_spec("ultralytics") is not None
+
+# Detections below this confidence are not stored
+MIN_CONFIDENCE = 0.5
+
+# German (singular, plural, gender) for common YOLO classes
+TRANSLATIONS = {
+    "person": ("Person", "Personen", "f"),
+    "cell phone": ("Handy", "Handys", "n"),
+    "cup": ("Tasse", "Tassen", "f"),
+    "bottle": ("Flasche", "Flaschen", "f"),
+    "laptop": ("Laptop", "Laptops", "m"),
+    "keyboard": ("Tastatur", "Tastaturen", "f"),
+    "mouse": ("Maus", "Mäuse", "f"),
+    "book": ("Buch", "Bücher", "n"),
+    "chair": ("Stuhl", "Stühle", "m"),
+    "tv": ("Fernseher", "Fernseher", "m"),
+    "dog": ("Hund", "Hunde", "m"),
+    "cat": ("Katze", "Katzen", "f"),
+    "car": ("Auto", "Autos", "n"),
+}
+
+# Indefinite article in the accusative ("Ich sehe einen Hund")
+ARTICLES = {"m": "einen", "f": "eine", "n": "ein"}
+
+# Other words people use for a class
+ALIASES = {"menschen": "person", "mensch": "person", "leute": "person", "handies": "cell phone", "telefone": "cell phone"}
+
+
+def class_name(word):
+    """YOLO class name for a German (or English) word, singular or plural; None if unknown"""
+    word = word.lower().strip()
+    if word in ALIASES:
+        return ALIASES[word]
+    for name, (singular, plural, _) in TRANSLATIONS.items():
+        if word in (name, singular.lower(), plural.lower()):
+            return name
+    return None
+
+
+def german_count(name, count):
+    """'eine Person'-style phrase: 'einen Stuhl', 'ein Buch', '2 Personen'"""
+    singular, plural, gender = TRANSLATIONS.get(name, (name, f"{name}-Objekte", "n"))
+    return f"{ARTICLES[gender]} {singular}" if count == 1 else f"{count} {plural}"
+
+
+def room_key(name):
+    """Comparable room name: 'Küche', 'kueche' and 'KUECHE' all become 'kueche'"""
+    name = name.lower().strip()
+    for umlaut, spelled in (("ä", "ae"), ("ö", "oe"), ("ü", "ue"), ("ß", "ss")):
+        name = name.replace(umlaut, spelled)
+    return name
+
+
+def parse_sources(spec):
+    """
+    Parse a source list like "0" or "kueche=0,wohnzimmer=rtsp://...,flur=flur.mp4".
+    Device indices become ints, everything else stays a path/URL.
+    """
+    sources = []
+    for i, part in enumerate(p.strip() for p in spec.split(",") if p.strip()):
+        name, _, src = part.partition("=") if "=" in part.split("://")[0] else ("", "", part)
+        name = name.strip() or (f"Kamera {i + 1}" if i else "Kamera")
+        src = src.strip()
+        sources.append((name, int(src) if src.isdigit() else src))
+    return sources
+
+
+class CameraSource:
+    """One capture device/stream and its own detection history"""
+    def __init__(self, name, source, history=300.0, history_size=16384):
+        self.name = name
+        self.source = source
+        self.cap = None
+        self.frame = None
+        self.ref_small = None  # thumbnail of the frame YOLO last ran on (motion mode)
+        self.detections = DetectionStore(window=history, capacity=history_size)
+        self.last_inference = 0
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.source)
+        return self.cap.isOpened()
+
+    def read(self):
+        if not self.cap:
+            return False, None
+        ret, frame = self.cap.read()
+        if not ret and isinstance(self.source, str):
+            # Video files: loop from the start
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
 
 
 class CameraManager:
-    def __init__(self, tts=None):
+    """
+    Camera + YOLO object detection over one or more sources.
+    Frames from all sources that need inference in a tick go into one
+    batched model call.
+    Modes: "continuous" runs inference on every frame it gets to,
+    "motion" skips inference while the scene has not changed since the
+    last inferred frame, and "on_demand" only runs inference when
+    describe_scene() is asked (frames are then only decoded while the
+    live view is watching).
+    In the first two modes the inference rate adapts so that detection
+    uses at most cpu_budget of the wall time.
+    """
+    def __init__(self, tts=None, sources="0", mode="motion", cpu_budget=0.25, motion_threshold=0.01, static_refresh=10.0,
+                 history=300.0, history_size=16384):
         self.tts = tts
-        self.cap = None
+        self.sources = [CameraSource(name, src, history, history_size) for name, src in parse_sources(sources)]
         self.is_running = False
         self.model = None
         self.detection_thread = None
-        self.latest_objects = []
-        self.frame = None
-        
-        if YOLO_AVAILABLE:
+        self.lock = threading.Lock()  # guards caps and model
+
+        self.mode = mode
+        self.cpu_budget = cpu_budget
+        self.motion_threshold = motion_threshold  # fraction of changed pixels
+        self.static_refresh = static_refresh      # re-check a static scene every N seconds
+        self.live_until = 0.0                     # on_demand: decode frames for the live view until then
+
+        # Counters
+        self.frames_read = 0
+        self.frames_inferred = 0
+        self.frames_skipped = 0
+        self.batches = 0
+        self.model_tried = False
+
+    def load_model(self):
+        """Load YOLO weights (once)"""
+        with self.lock:
+            if self.model is not None or self.model_tried:
+                return self.model
+            self.model_tried = True
+            if not YOLO_AVAILABLE:
+                print("YOLO not available. Install with: pip install ultralytics")
+                return None
             try:
+                from ultralytics import YOLO
                 self.model = YOLO('yolov8n.pt')
                 print("YOLO model loaded successfully")
             except Exception as e:
                 print(f"YOLO model loading failed: {e}")
                 self.model = None
-        else:
-            print("YOLO not available. Install with: pip install ultralytics")
+            return self.model
+
+    def warm_up(self, size=640):
+        """Load YOLO and run one dummy inference, so the first real one is fast"""
+        model = self.load_model()
+        if model is None:
+            return False
+        import numpy as np
+        with self.lock:
+            model(np.zeros((size, size, 3), dtype=np.uint8), verbose=False)
+        return True
+
+    @property
+    def frame(self):
+        """Latest frame of the first source"""
+        return self.sources[0].frame if self.sources else None
+
+    def live_frame(self):
+        """Latest frame for the live view; in on_demand mode keeps frames decoding for a second"""
+        self.live_until = time.time() + 1.0
+        return self.frame
+
+    @property
+    def latest_objects(self):
+        return [obj for src in self.sources for obj in self._labels(src)]
+
+    def _labels(self, src):
+        """Newest frame of a source as 'person (87%)' strings"""
+        names = self.model.names if self.model else {}
+        return [f"{names.get(int(row['cls']), row['cls'])} ({int(row['conf'] * 100)}%)"
+                for row in src.detections.latest()]
 
     def start_camera(self):
-        """Open camera connection"""
+        """Open camera connection(s)"""
         if self.is_running:
             return "Kamera läuft bereits."
-        
+
         try:
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
+            self.load_model()
+            failed = [src.name for src in self.sources if not src.open()]
+            if len(failed) == len(self.sources):
                 return "Kamera konnte nicht geöffnet werden."
-            
+            if failed:
+                print(f"Camera sources not available: {', '.join(failed)}")
+
             self.is_running = True
             self.detection_thread = threading.Thread(target=self._detection_loop, daemon=True)
             self.detection_thread.start()
@@ -51,94 +210,218 @@ class CameraManager:
             return f"Kamerafehler: {e}"
 
     def stop_camera(self):
-        """Close camera connection"""
+        """Close camera connection(s)"""
         self.is_running = False
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        with self.lock:
+            for src in self.sources:
+                src.release()
+        if self.frames_read:
+            print(f"Camera stats: {self.stats()}")
         return "Kamera gestoppt."
 
     def _detection_loop(self):
         """Background loop for object detection"""
+        frame_interval = 0.1
         while self.is_running:
-            if self.cap and self.model:
-                ret, frame = self.cap.read()
-                if ret:
-                    self.frame = frame.copy()
-                    try:
-                        results = self.model(frame, verbose=False)
-                        self.latest_objects = []
-                        for result in results:
-                            for box in result.boxes:
-                                cls = int(box.cls[0])
-                                conf = float(box.conf[0])
-                                name = self.model.names[cls]
-                                if conf > 0.5:
-                                    self.latest_objects.append(f"{name} ({int(conf*100)}%)")
-                    except Exception as e:
-                        print(f"Detection error: {e}")
-            time.sleep(0.1)
-
-    def get_detected_objects(self):
-        """Return list of detected objects"""
+            if not self.model:
+                time.sleep(frame_interval)
+                continue
+
+            if self.mode == "on_demand":
+                # Keep capture buffers fresh; decode only while the live view shows frames
+                live = time.time() < self.live_until
+                with self.lock:
+                    for src in self.sources:
+                        if not src.cap:
+                            continue
+                        if live:
+                            ret, frame = src.read()
+                            if ret:
+                                src.frame = frame
+                        else:
+                            src.cap.grab()
+                time.sleep(frame_interval)
+                continue
+
+            batch = []
+            for src in self.sources:
+                with self.lock:
+                    ret, frame = src.read()
+                if not ret:
+                    continue
+                self.frames_read += 1
+                src.frame = frame  # read() returns a fresh array, no copy needed
+
+                if self.mode == "motion":
+                    small = self._thumbnail(frame)
+                    if not self._has_motion(src, small) and time.time() - src.last_inference < self.static_refresh:
+                        self.frames_skipped += 1
+                        continue
+                    # Later frames are compared with what YOLO saw, so slow changes add up
+                    src.ref_small = small
+                batch.append((src, frame))
+
+            if not batch:
+                time.sleep(frame_interval)
+                continue
+
+            elapsed = self._infer(batch)
+
+            # Adaptive rate: inference may use at most cpu_budget of the time
+            time.sleep(max(frame_interval, elapsed * (1 - self.cpu_budget) / self.cpu_budget))
+
+    @staticmethod
+    def _thumbnail(frame):
+        """Tiny grayscale copy for the motion check"""
+        return cv2.cvtColor(cv2.resize(frame, (64, 48), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+    def _has_motion(self, src, small):
+        """Cheap difference check against the last inferred frame's thumbnail"""
+        if src.ref_small is None:
+            return True
+        changed = cv2.countNonZero(cv2.threshold(cv2.absdiff(small, src.ref_small), 25, 255, cv2.THRESH_BINARY)[1])
+        return changed / small.size > self.motion_threshold
+
+    def _infer(self, batch):
+        """Run one batched YOLO call over [(source, frame)], return the time it took"""
+        start = time.time()
+        try:
+            with self.lock:
+                results = self.model([frame for _, frame in batch], verbose=False)
+            now = time.time()
+            for (src, _), result in zip(batch, results):
+                classes, confs, boxes = [], [], []
+                for box in result.boxes:
+                    conf = float(box.conf[0])
+                    if conf > MIN_CONFIDENCE:
+                        classes.append(int(box.cls[0]))
+                        confs.append(conf)
+                        boxes.append([float(v) for v in box.xyxy[0]])
+                src.detections.add(classes, confs, boxes, now)
+                src.last_inference = now
+        except Exception as e:
+            print(f"Detection error: {e}")
+        self.frames_inferred += len(batch)
+        self.batches += 1
+        return time.time() - start
+
+    def _infer_now(self, sources):
+        """On-demand: decode the newest frame of each source and run one batch"""
+        if not self.model:
+            return
+        batch = []
+        for src in sources:
+            with self.lock:
+                ret, frame = src.read()
+            if ret:
+                self.frames_read += 1
+                src.frame = frame
+                batch.append((src, frame))
+        if batch:
+            self._infer(batch)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "detections": {src.name: src.detections.stats() for src in self.sources},
+            "sources": len(self.sources),
+            "frames_read": self.frames_read,
+            "frames_inferred": self.frames_inferred,
+            "frames_skipped": self.frames_skipped,
+            "batches": self.batches,
+        }
+
+    def find_source(self, room):
+        if not room:
+            return None
+        room = room_key(room)
+        for src in self.sources:
+            if room_key(src.name) == room:
+                return src
+        return None
+
+    def get_detected_objects(self, room=None):
+        """Return list of detected objects (of one room, or all)"""
         if not self.is_running:
             return []
-        return self.latest_objects
+        src = self.find_source(room)
+        return self._labels(src) if src else self.latest_objects
 
-    def describe_scene(self):
-        """Generate a description of what's seen"""
+    def describe_scene(self, room=None):
+        """Generate a description of what's seen (in one room, or per room)"""
         if not self.is_running:
             return "Die Kamera ist nicht aktiv. Sage 'Pixel, starte Kamera' um zu beginnen."
-        
-        objects = self.latest_objects
-        if not objects:
-            return "Ich sehe momentan nichts, was ich eindeutig erkennen kann."
-        
-        # Count objects by type
-        from collections import Counter
-        # Extract names without confidence
-        names = [obj.split(' (')[0] for obj in objects]
-        object_counts = Counter(names)
-        
-        # Translation dictionary for common YOLO objects (optional, but nice for German)
-        translations = {
-            "person": "Person",
-            "cell phone": "Handy",
-            "cup": "Tasse",
-            "bottle": "Flasche",
-            "laptop": "Laptop",
-            "keyboard": "Tastatur",
-            "mouse": "Maus",
-            "book": "Buch",
-            "chair": "Stuhl",
-            "tv": "Fernseher"
-        }
-        
-        summary_parts = []
-        for name, count in object_counts.items():
-            de_name = translations.get(name, name)
-            if count == 1:
-                summary_parts.append(f"ein {de_name}")
-            else:
-                summary_parts.append(f"{count} {de_name}-Objekte")
-        
-        if len(summary_parts) == 1:
-            return f"Ich sehe {summary_parts[0]}."
-        else:
-            return "Ich sehe: " + ", ".join(summary_parts[:-1]) + " und " + summary_parts[-1] + "."
+
+        src = self.find_source(room)
+        sources = [src] if src else [s for s in self.sources if s.cap]
+
+        if self.mode == "on_demand":
+            self._infer_now(sources)
+
+        if len(sources) == 1:
+            summary_parts = self._summarize(sources[0])
+            if not summary_parts:
+                return "Ich sehe momentan nichts, was ich eindeutig erkennen kann."
+            if len(summary_parts) == 1:
+                return f"Ich sehe {summary_parts[0]}."
+            return f"Ich sehe: {self._join(summary_parts)}."
+
+        rooms = []
+        for s in sources:
+            summary_parts = self._summarize(s)
+            rooms.append(f"{s.name}: {self._join(summary_parts) if summary_parts else 'nichts Erkennbares'}")
+        return ". ".join(rooms) + "."
+
+    @staticmethod
+    def _join(parts):
+        if len(parts) == 1:
+            return parts[0]
+        return ", ".join(parts[:-1]) + " und " + parts[-1]
+
+    def _summarize(self, src):
+        """Smoothed detections of a source as German phrases like 'einen Stuhl', '2 Personen'"""
+        names = self.model.names if self.model else {}
+        counts = src.detections.smoothed_counts()
+        return [german_count(names.get(cls, str(cls)), count) for cls, count in counts.items()]
+
+    def count_objects(self, word, seconds=None, room=None):
+        """
+        "Wie viele Personen hast du in der letzten Minute gesehen?": distinct
+        tracked objects from the stored history, no new inference.
+        Without seconds: how many are in view right now (smoothed).
+        """
+        if not self.is_running:
+            return "Die Kamera ist nicht aktiv. Sage 'Pixel, starte Kamera' um zu beginnen."
+        name = class_name(word or "")
+        cls = next((c for c, n in (self.model.names.items() if self.model else ()) if n == name), None)
+        if cls is None:
+            return f"{word} kann ich nicht erkennen." if word else "Was soll ich zählen?"
+
+        src = self.find_source(room)
+        sources = [src] if src else self.sources
+        plural = TRANSLATIONS.get(name, (name, name, "n"))[1]
+        if seconds is None:
+            count = sum(s.detections.smoothed_counts().get(cls, 0) for s in sources)
+            return f"Ich sehe gerade {count} {plural}." if count != 1 else f"Ich sehe gerade {german_count(name, 1)}."
+
+        seconds = min(seconds, max(s.detections.window for s in sources))
+        count = sum(s.detections.distinct(cls, seconds) for s in sources)
+        span = "der letzten Minute" if seconds == 60 else (
+            f"den letzten {int(seconds // 60)} Minuten" if seconds % 60 == 0 else f"den letzten {int(seconds)} Sekunden")
+        return f"In {span} habe ich {count} {plural} gesehen." if count != 1 else f"In {span} habe ich {german_count(name, 1)} gesehen."
 
     def get_frame_base64(self):
-        """Get current frame as base64 for web display"""
-        if self.frame is None:
+        """Get current frame as base64 for web display (prefer the live view, it sends raw JPEG)"""
+        frame = self.frame
+        if frame is None:
             return None
-        
-        _, buffer = cv2.imencode('.jpg', self.frame)
+        _, buffer = cv2.imencode('.jpg', frame)
         return base64.b64encode(buffer).decode('utf-8')
 
     def capture_image(self, filename="capture.jpg"):
         """Capture and save current frame"""
         if self.frame is None:
             return "Kein Bild verfügbar."
-        
+
         cv2.imwrite(filename, self.frame)
         return f"Bild gespeichert als {filename}"
@@ -0,0 +1,171 @@
+import threading
+import time
+import numpy as np
+
+# One row per detection
+DETECTION_DTYPE = np.dtype([
+    ("time", "f8"),
+    ("frame", "i8"),
+    ("cls", "i2"),
+    ("conf", "f4"),
+    ("box", "f4", (4,)),   # x1, y1, x2, y2 in pixels
+    ("track", "i4"),
+])
+
+
+def iou_matrix(a, b):
+    """IoU of every box in a (n x 4) with every box in b (m x 4)"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class DetectionStore:
+    """
+    Detections of one camera over the last `window` seconds in a
+    fixed-size ring buffer (numpy structured array, no per-object
+    Python objects). Boxes are linked to the previous frames by IoU, so
+    each object keeps a track id while it stays in view; an object
+    missing in up to max_missed frames keeps its track.
+    """
+    def __init__(self, window=300.0, capacity=16384, iou_threshold=0.3, max_missed=1):
+        self.window = window
+        self.capacity = capacity
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.lock = threading.Lock()
+
+        self.rows = np.zeros(capacity, dtype=DETECTION_DTYPE)
+        self.rows["frame"] = -1
+        self.size = 0          # rows written in total (the ring index is size % capacity)
+        self.frame_times = np.full(capacity, -np.inf)  # frame seq % capacity -> time
+        self.frames = 0        # frames added in total
+
+        # Open tracks: parallel arrays of track id, class, last box, last frame
+        self.track_ids = np.zeros(0, dtype="i4")
+        self.track_cls = np.zeros(0, dtype="i2")
+        self.track_box = np.zeros((0, 4), dtype="f4")
+        self.track_frame = np.zeros(0, dtype="i8")
+        self.next_track = 1
+
+    def add(self, classes, confs, boxes, timestamp=None):
+        """Store one inferred frame (possibly without detections); returns the track ids"""
+        timestamp = timestamp or time.time()
+        classes = np.asarray(classes, dtype="i2").reshape(-1)
+        confs = np.asarray(confs, dtype="f4").reshape(-1)
+        boxes = np.asarray(boxes, dtype="f4").reshape(-1, 4)
+
+        with self.lock:
+            frame = self.frames
+            self.frames += 1
+            self.frame_times[frame % self.capacity] = timestamp
+            tracks = self._match(frame, classes, boxes)
+
+            n = min(len(classes), self.capacity)
+            index = (self.size + np.arange(n)) % self.capacity
+            rows = self.rows[index]
+            rows["time"] = timestamp
+            rows["frame"] = frame
+            rows["cls"] = classes[:n]
+            rows["conf"] = confs[:n]
+            rows["box"] = boxes[:n]
+            rows["track"] = tracks[:n]
+            self.rows[index] = rows
+            self.size += n
+        return tracks
+
+    def _match(self, frame, classes, boxes):
+        """Greedy IoU matching against open tracks of the same class"""
+        alive = self.track_frame >= frame - 1 - self.max_missed
+        self.track_ids, self.track_cls = self.track_ids[alive], self.track_cls[alive]
+        self.track_box, self.track_frame = self.track_box[alive], self.track_frame[alive]
+
+        tracks = np.zeros(len(classes), dtype="i4")
+        if len(classes) and len(self.track_ids):
+            iou = iou_matrix(boxes, self.track_box)
+            iou[classes[:, None] != self.track_cls[None, :]] = 0.0
+            # Best pairs first; each detection and track is used once
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                d, t = divmod(int(flat), iou.shape[1])
+                if iou[d, t] < self.iou_threshold:
+                    break
+                if tracks[d] or self.track_frame[t] == frame:
+                    continue
+                tracks[d] = self.track_ids[t]
+                self.track_box[t] = boxes[d]
+                self.track_frame[t] = frame
+
+        new = tracks == 0
+        if new.any():
+            ids = np.arange(self.next_track, self.next_track + new.sum(), dtype="i4")
+            self.next_track += len(ids)
+            tracks[new] = ids
+            self.track_ids = np.concatenate([self.track_ids, ids])
+            self.track_cls = np.concatenate([self.track_cls, classes[new]])
+            self.track_box = np.concatenate([self.track_box, boxes[new]])
+            self.track_frame = np.concatenate([self.track_frame, np.full(len(ids), frame)])
+        return tracks
+
+    def _recent(self, since):
+        """Rows newer than since (time) that are still in the buffer"""
+        valid = self.rows[:min(self.size, self.capacity)]
+        return valid[valid["time"] >= since]
+
+    # --- Queries ---
+
+    def latest(self):
+        """Rows of the newest frame"""
+        with self.lock:
+            if not self.frames:
+                return self.rows[:0].copy()
+            valid = self.rows[:min(self.size, self.capacity)]
+            return valid[valid["frame"] == self.frames - 1].copy()
+
+    def smoothed_counts(self, frames=5):
+        """
+        Objects per class in the current view: median over the last few
+        frames, so a single missed or spurious detection does not change
+        the answer. Returns {class id: count}.
+        """
+        with self.lock:
+            first = max(0, self.frames - frames)
+            count = self.frames - first
+            if not count:
+                return {}
+            valid = self.rows[:min(self.size, self.capacity)]
+            rows = valid[valid["frame"] >= first]
+        if not len(rows):
+            return {}
+        per_frame = np.zeros((count, int(rows["cls"].max()) + 1), dtype="i4")
+        np.add.at(per_frame, (rows["frame"] - first, rows["cls"]), 1)
+        medians = np.round(np.median(per_frame, axis=0)).astype(int)
+        return {int(cls): int(n) for cls, n in enumerate(medians) if n}
+
+    def distinct(self, cls, seconds=None, min_hits=2):
+        """
+        Different objects (tracks) of a class seen in the last seconds
+        (default: the whole window). Tracks with fewer than min_hits
+        detections are ignored as likely false positives.
+        """
+        since = time.time() - min(seconds or self.window, self.window)
+        with self.lock:
+            rows = self._recent(since)
+            frames = int((self.frame_times >= since).sum())
+        tracks, hits = np.unique(rows["track"][rows["cls"] == cls], return_counts=True)
+        return int((hits >= min(min_hits, frames)).sum())
+
+    def stats(self):
+        with self.lock:
+            return {
+                "frames": self.frames,
+                "detections": self.size,
+                "buffered": min(self.size, self.capacity),
+                "open_tracks": len(self.track_ids),
+                "tracks": self.next_track - 1,
+            }
@@ -0,0 +1,135 @@
+import re
+import time
+import html
+import codecs
+import requests
+from requests.adapters import HTTPAdapter
+from cache import TTLCache
+
+# Links in DuckDuckGo Lite: <a class="result-link" href="...">Title</a>
+RESULT_RE = re.compile(r'<a[^>]*class=["\']result-link["\'][^>]*>([^<]*)</a>')
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+def normalize_query(query):
+    """Cache key for a query: lower case, no punctuation, single spaces"""
+    query = PUNCTUATION_RE.sub(" ", query.lower())
+    return WHITESPACE_RE.sub(" ", query).strip()
+
+
+class WebSearch:
+    """
+    DuckDuckGo Lite search with a result cache, connection reuse and a
+    latency budget. The page is parsed while it downloads and the
+    download stops as soon as enough results are found.
+    """
+    def __init__(self, url, max_results=3, budget=4.0, ttl=3600, cache_size=256, chunk_size=1024, drain_limit=65536):
+        self.url = url
+        self.max_results = max_results
+        self.budget = budget
+        self.chunk_size = chunk_size
+        self.drain_limit = drain_limit  # rest of a page small enough to read, so the connection is reused
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+        self.cache = TTLCache(maxsize=cache_size, ttl=ttl)
+
+    def answer(self, query):
+        """Return a spoken summary of the top results for query"""
+        try:
+            results, partial = self.search(query)
+        except Exception as e:
+            print(f"Web Search Exception: {e}")
+            return "Es gab einen Fehler bei der Websuche."
+
+        if results:
+            summary = f"Ich habe im Internet nach '{query}' gesucht. Hier sind einige Ergebnisse:\n"
+            return summary + "\n".join(f"- {title}" for title in results)
+        if partial:
+            return "Die Suche hat zu lange gedauert."
+        return f"Ich habe keine direkten Ergebnisse für '{query}' gefunden."
+
+    def search(self, query):
+        """Return (titles, partial). partial is True if the budget ran out"""
+        key = normalize_query(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, False
+
+        results, partial = self._fetch(query)
+        if not partial:
+            self.cache.put(key, results)
+        return results, partial
+
+    def warm_up(self):
+        """Open a pooled connection so the first search skips the TLS handshake"""
+        self.session.head(self.url, timeout=(self.budget, self.budget))
+
+    def _fetch(self, query):
+        deadline = time.monotonic() + self.budget
+        # Each socket read waits at most the budget; the loop below checks
+        # the deadline after every chunk, so a stalled body ends the search
+        # no later than one read timeout after it stopped
+        response = self.session.get(self.url, params={"q": query}, stream=True,
+                                    timeout=(self.budget, self.budget))
+        done = False  # stopped at a clean point: the connection can go back to the pool
+        try:
+            if response.status_code != 200:
+                raise IOError(f"HTTP {response.status_code}")
+
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+            results = []
+            buffer = ""
+            chunks = response.iter_content(chunk_size=self.chunk_size)
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    done = True
+                    return results, False
+                except (requests.ConnectionError, requests.Timeout):
+                    # Stalled until the deadline (or dropped): what we have so far
+                    return results, True
+                buffer += decoder.decode(chunk)
+
+                end = 0
+                for match in RESULT_RE.finditer(buffer):
+                    end = match.end()
+                    title = html.unescape(match.group(1).strip())
+                    if title:
+                        results.append(title)
+                        if len(results) >= self.max_results:
+                            done = True
+                            return results, False
+
+                # Keep only the unparsed tail; a tag may continue in the next chunk
+                buffer = buffer[end:]
+                if len(buffer) > 2 * self.chunk_size:
+                    buffer = buffer[-self.chunk_size:]
+
+                if time.monotonic() > deadline:
+                    return results, True
+        finally:
+            self._release(response, done)
+
+    def _release(self, response, done):
+        """Hand the connection back to the pool; a stalled or large rest of the page closes it"""
+        remaining = response.raw.length_remaining
+        if done and remaining is not None and remaining <= self.drain_limit:
+            try:
+                response.raw.drain_conn()  # reads the rest and releases the connection
+                return
+            except Exception:
+                pass
+        response.close()
+
+    def stats(self):
+        return self.cache.stats()
@@ -1,30 +1,231 @@
 import threading
 import time
-import re
+import heapq
+import itertools
+import json
+import os
+from datetime import datetime, timedelta
+
+# Spoken when a timer or alarm fires (pre-rendered at boot)
+ALARM_TEXT = "Dein Wecker klingelt!"
+TIMER_TEXT = "Der Timer ist abgelaufen!"
+
+
+class Timer:
+    def __init__(self, timer_id, fire_at, label, kind="timer"):
+        self.id = timer_id
+        self.fire_at = fire_at  # epoch seconds, so it survives restarts
+        self.label = label
+        self.kind = kind  # "timer" or "alarm"
+
+    def to_dict(self):
+        return {"id": self.id, "fire_at": self.fire_at, "label": self.label, "kind": self.kind}
+
 
 class TimerManager:
-    def __init__(self, tts):
+    """
+    Timers and alarms on a single scheduler thread backed by a heap.
+    Pending timers are written to store_path so they survive a restart.
+    """
+    def __init__(self, tts, store_path=None, snooze_minutes=5):
         self.tts = tts
         self.stopwatch_start = None
+        self.store_path = store_path
+        self.snooze_minutes = snooze_minutes
+
+        self.cv = threading.Condition()
+        self.heap = []      # (fire_at, id), cancelled entries are skipped lazily
+        self.timers = {}    # id -> Timer
+        self.ids = itertools.count(1)
+        self.last_fired = None
+        self.dirty = False
+        self.next_save = 0
+
+        self._load()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # --- Scheduling ---
+
+    def add(self, seconds, label, kind="timer"):
+        """Schedule a timer seconds from now and return it"""
+        return self.add_at(time.time() + seconds, label, kind)
+
+    def add_at(self, fire_at, label, kind="timer"):
+        """Schedule a timer at an absolute epoch time and return it"""
+        with self.cv:
+            timer = Timer(next(self.ids), fire_at, label, kind)
+            self.timers[timer.id] = timer
+            heapq.heappush(self.heap, (fire_at, timer.id))
+            self.dirty = True
+            self.cv.notify()
+        return timer
+
+    def cancel(self, timer_id=None, kind=None):
+        """Cancel one timer by id, or all timers (of a kind). Returns the count"""
+        with self.cv:
+            if timer_id is not None:
+                ids = [timer_id] if timer_id in self.timers else []
+            else:
+                ids = [t.id for t in self.timers.values() if kind is None or t.kind == kind]
+            for i in ids:
+                del self.timers[i]
+            if ids:
+                self.dirty = True
+                self.cv.notify()
+        return len(ids)
+
+    def pending(self):
+        """Return pending timers sorted by fire time"""
+        with self.cv:
+            return sorted(self.timers.values(), key=lambda t: t.fire_at)
+
+    def _run(self):
+        while True:
+            due = []
+            with self.cv:
+                while True:
+                    # Drop heap entries of cancelled timers
+                    while self.heap and self.heap[0][1] not in self.timers:
+                        heapq.heappop(self.heap)
+                    now = time.time()
+                    if self.heap and self.heap[0][0] <= now:
+                        break
+                    if self.dirty and now >= self.next_save:
+                        break
+                    deadlines = [self.heap[0][0]] if self.heap else []
+                    if self.dirty:
+                        deadlines.append(self.next_save)
+                    self.cv.wait(min(deadlines) - now if deadlines else None)
+
+                now = time.time()
+                while self.heap and self.heap[0][0] <= now:
+                    _, timer_id = heapq.heappop(self.heap)
+                    timer = self.timers.pop(timer_id, None)
+                    if timer:
+                        due.append(timer)
+                if due:
+                    self.dirty = True
+                    self.last_fired = due[-1]
+
+                # Writes are batched to at most one per second
+                snapshot = None
+                if self.dirty and now >= self.next_save:
+                    self.dirty = False
+                    self.next_save = now + 1.0
+                    if self.store_path:
+                        snapshot = [t.to_dict() for t in self.timers.values()]
+
+            for timer in due:
+                self._fire(timer)
+            if snapshot is not None:
+                self._save(snapshot)
+
+    def _fire(self, timer):
+        # Alarm / Announcement
+        print(f"{timer.kind.upper()} FINISHED! ({timer.label})")
+        try:
+            self.tts.speak(ALARM_TEXT if timer.kind == "alarm" else TIMER_TEXT, alarm=True)
+        except Exception as e:
+            print(f"Timer Error: {e}")
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not self.store_path or not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Timer store unreadable: {e}")
+            return
+
+        # Timers that expired while we were down fire right after start
+        for entry in entries:
+            self.add_at(entry["fire_at"], entry["label"], entry.get("kind", "timer"))
+        if entries:
+            print(f"Restored {len(entries)} timer(s)")
+
+    def _save(self, entries):
+        tmp = self.store_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.store_path)
+        except OSError as e:
+            print(f"Timer store write failed: {e}")
+
+    # --- Voice commands ---
 
     def set_timer(self, duration, unit):
         seconds = 0
-        if "second" in unit:
+        if "sekunde" in unit or "second" in unit:
             seconds = int(duration)
         elif "minute" in unit:
             seconds = int(duration) * 60
-        elif "hour" in unit:
+        elif "stunde" in unit or "hour" in unit:
             seconds = int(duration) * 3600
-        
-        # Start timer thread
-        threading.Thread(target=self._timer_thread, args=(seconds,)).start()
+
+        self.add(seconds, f"{duration} {unit}")
         return f"Timer für {duration} {unit} gestellt."
 
-    def _timer_thread(self, seconds):
-        time.sleep(seconds)
-        # Alarm / Announcement
-        print("TIMER FINISHED!")
-        self.tts.speak("Der Timer ist abgelaufen!")
+    def set_alarm(self, hour, minute=0):
+        now = datetime.now()
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        self.add_at(target.timestamp(), target.strftime("%H:%M"), kind="alarm")
+        return f"Wecker für {target.strftime('%H:%M')} Uhr gestellt."
+
+    def cancel_timers(self):
+        # Alarms are kept: "Lösche alle Timer" must not delete tomorrow's wake-up
+        count = self.cancel(kind="timer")
+        if count == 0:
+            return "Es läuft kein Timer."
+        if count == 1:
+            return "Timer gelöscht."
+        return f"Alle {count} Timer gelöscht."
+
+    def cancel_alarms(self):
+        count = self.cancel(kind="alarm")
+        if count == 0:
+            return "Es ist kein Wecker gestellt."
+        if count == 1:
+            return "Wecker gelöscht."
+        return f"Alle {count} Wecker gelöscht."
+
+    def list_timers(self):
+        timers = self.pending()
+        if not timers:
+            return "Es läuft kein Timer."
+
+        parts = []
+        now = time.time()
+        for timer in timers:
+            remaining = max(0, int(timer.fire_at - now))
+            name = "Wecker" if timer.kind == "alarm" else "Timer"
+            parts.append(f"{name} {timer.label}: noch {self._format_duration(remaining)}")
+        return ". ".join(parts) + "."
+
+    def snooze(self, minutes=None):
+        timer = self.last_fired
+        if not timer:
+            return "Es gibt nichts zum Schlummern."
+        minutes = int(minutes) if minutes else self.snooze_minutes
+        self.last_fired = None
+        self.add(minutes * 60, timer.label, timer.kind)
+        return f"Okay, ich erinnere dich in {minutes} Minuten nochmal."
+
+    @staticmethod
+    def _format_duration(seconds):
+        if seconds < 60:
+            return f"{seconds} Sekunden"
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        if hours:
+            return f"{hours} Stunden und {minutes} Minuten"
+        return f"{minutes} Minuten und {seconds} Sekunden"
 
     def start_stopwatch(self):
         self.stopwatch_start = time.time()
@@ -33,10 +234,10 @@ class TimerManager:
     def stop_stopwatch(self):
         if not self.stopwatch_start:
             return "Es läuft keine Stoppuhr."
-        
+
         elapsed = time.time() - self.stopwatch_start
         self.stopwatch_start = None
-        
+
         # Format output
         if elapsed < 60:
             return f"Zeit: {int(elapsed)} Sekunden."
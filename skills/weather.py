@@ -0,0 +1,112 @@
+import threading
+import time
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+from cache import TTLCache
+
+
+class WeatherService:
+    """
+    OpenWeather client with a per-city TTL cache.
+    Concurrent lookups for the same city share one request, and the
+    default city is refreshed in the background before it expires.
+    """
+    def __init__(self, api_key, default_city, url, ttl=600, timeout=3.0, refresh_ahead=True):
+        self.api_key = api_key
+        self.default_city = default_city
+        self.url = url
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+        self.cache = TTLCache(maxsize=64, ttl=ttl)
+        self.last_good = {}  # city -> data, served if the API is down
+        self.inflight = {}   # city -> Future of the running request
+        self.lock = threading.Lock()
+
+        if refresh_ahead:
+            threading.Thread(target=self._refresh_loop, daemon=True).start()
+
+    def report(self, city=None):
+        """Return a spoken weather report for city"""
+        city = city or self.default_city
+        try:
+            data = self.get(city)
+        except LookupError:
+            return f"Ich konnte das Wetter für {city} nicht abrufen."
+        except Exception as e:
+            print(f"Weather Exception: {e}")
+            return "Es gab einen Fehler beim Abrufen des Wetters."
+
+        temp = round(data['main']['temp'])
+        desc = data['weather'][0]['description']
+        return f"Das Wetter in {city}: {desc} bei {temp} Grad Celsius."
+
+    def get(self, city):
+        """Return OpenWeather data for city, from the cache when possible"""
+        key = city.lower()
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        try:
+            return self._fetch_shared(key, city)
+        except LookupError:
+            raise
+        except Exception:
+            # Slow or broken API: an older answer beats no answer
+            if key in self.last_good:
+                return self.last_good[key]
+            raise
+
+    def _fetch_shared(self, key, city):
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.inflight[key] = future
+
+        if not leader:
+            return future.result(timeout=self.timeout * 2)
+
+        try:
+            data = self._fetch(city)
+            self.cache.put(key, data)
+            self.last_good[key] = data
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+    def _fetch(self, city):
+        params = {"q": city, "appid": self.api_key, "units": "metric", "lang": "de"}
+        response = self.session.get(self.url, params=params, timeout=(self.timeout, self.timeout))
+        if response.status_code == 404:
+            print(f"Weather Error: {response.text}")
+            raise LookupError(city)
+        # Any other error is an outage: the caller falls back to the last good value
+        response.raise_for_status()
+        return response.json()
+
+    def warm_up(self):
+        """Open a pooled connection to the API (any response will do)"""
+        self.session.head(self.url, timeout=(self.timeout, self.timeout))
+
+    def _refresh_loop(self):
+        key = self.default_city.lower()
+        while True:
+            try:
+                self._fetch_shared(key, self.default_city)
+                # Refresh shortly before the entry expires
+                time.sleep(max(5.0, self.cache.remaining(key) - self.timeout * 2))
+            except Exception as e:
+                print(f"Weather refresh failed: {e}")
+                time.sleep(30)
@@ -0,0 +1,168 @@
+import threading
+import time
+from answer_cache import normalize_question
+
+# Intents that only read: safe to run before the user has finished speaking
+SAFE_INTENTS = {"ai", "time", "weather", "search", "camera_describe", "camera_count"}
+
+
+class Speculation:
+    """A speculative answer for one interim transcript"""
+    def __init__(self, key, query):
+        self.key = key
+        self.query = query
+        self.future = None
+        self.started = None
+        self.finished = None
+
+
+class Speculator:
+    """
+    Answers web questions from interim transcripts. Once a session's
+    interim text has not changed for `stable` seconds (usually the end
+    of speech, while the browser is still waiting to finalize), its
+    query is routed and, for side-effect free intents, answered on the
+    worker pool. The final transcript then commits that answer if it is
+    the same question, or drops it and is answered normally.
+
+    Each session has one debounce deadline, pushed back by every new
+    interim text; a single thread starts the sessions whose deadline
+    passed, so a burst of interim results costs no threads.
+
+    route(query) -> Intent, answer(query) -> str, submit(fn, *args) -> Future
+    """
+    def __init__(self, route, answer, submit, stable=0.3, enabled=True, clock=time.monotonic):
+        self.route = route
+        self.answer = answer
+        self.submit = submit
+        self.stable = stable
+        self.enabled = enabled
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.pending = {}   # sid -> Speculation
+        self.due = {}       # sid -> (settle time, newest interim text)
+        self.thread = None
+
+        # Counters
+        self.partials = 0
+        self.speculated = 0   # answers started early
+        self.committed = 0    # ... and used
+        self.wasted = 0       # ... and thrown away after reaching a backend
+        self.cancelled = 0    # ... and dropped before they started
+        self.saved_seconds = 0.0
+
+    def partial(self, sid, query):
+        """Interim transcript (wake word already removed)"""
+        if not self.enabled or not query:
+            return
+        with self.lock:
+            self.partials += 1
+            self.due[sid] = (self.clock() + self.stable, query)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._debounce_loop, name="speculation", daemon=True)
+                self.thread.start()
+            self.changed.notify()
+
+    def _debounce_loop(self):
+        while True:
+            self.settle()
+            with self.lock:
+                if not self.due:
+                    self.changed.wait()
+                    continue
+                wait = min(t for t, _ in self.due.values()) - self.clock()
+                if wait > 0:
+                    self.changed.wait(wait)
+
+    def settle(self):
+        """Speculate for every session whose text has been stable long enough"""
+        now = self.clock()
+        with self.lock:
+            ready = [(sid, query) for sid, (t, query) in self.due.items() if t <= now]
+            for sid, _ in ready:
+                del self.due[sid]
+        for sid, query in ready:
+            self._settled(sid, query)
+
+    def _settled(self, sid, query):
+        key = normalize_question(query)
+        with self.lock:
+            current = self.pending.get(sid)
+            if current is not None and current.key == key:
+                return
+        if self.route(query).name not in SAFE_INTENTS:
+            return
+
+        with self.lock:
+            if sid in self.due:
+                return  # changed again while routing
+            if current is not None:
+                self._drop(current)
+            spec = self.pending[sid] = Speculation(key, query)
+            self.speculated += 1
+            spec.future = self.submit(self._run, spec)
+
+    def _run(self, spec):
+        spec.started = self.clock()
+        try:
+            return self.answer(spec.query)
+        finally:
+            spec.finished = self.clock()
+
+    def final(self, sid, query):
+        """
+        Final transcript: the speculative answer if it was for the same
+        question, else None (the caller answers it now).
+        """
+        with self.lock:
+            self.due.pop(sid, None)
+            spec = self.pending.pop(sid, None)
+            if spec is None:
+                return None
+            if spec.key != normalize_question(query):
+                self._drop(spec)
+                return None
+            if spec.future.cancel():
+                # Still queued behind other work: no head start to gain
+                self.cancelled += 1
+                return None
+        arrived = self.clock()
+        try:
+            response = spec.future.result()
+        except Exception as e:
+            print(f"Speculation error: {e}")
+            with self.lock:
+                self.wasted += 1
+            return None
+        with self.lock:
+            self.committed += 1
+            self.saved_seconds += min(arrived, spec.finished) - spec.started
+        return response
+
+    def discard(self, sid):
+        """Session ended or the final text is not a question"""
+        with self.lock:
+            self.due.pop(sid, None)
+            spec = self.pending.pop(sid, None)
+            if spec is not None:
+                self._drop(spec)
+
+    def _drop(self, spec):
+        """Throw a speculation away (caller holds the lock)"""
+        if spec.future.cancel():
+            self.cancelled += 1
+        else:
+            self.wasted += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "partials": self.partials,
+                "speculated": self.speculated,
+                "committed": self.committed,
+                "wasted": self.wasted,
+                "cancelled": self.cancelled,
+                "waste_rate": self.wasted / self.speculated if self.speculated else 0.0,
+                "saved_ms_avg": round(self.saved_seconds / self.committed * 1000) if self.committed else 0,
+            }
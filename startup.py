@@ -0,0 +1,40 @@
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+T0 = time.perf_counter()
+phases = []  # (name, seconds)
+
+@contextmanager
+def phase(name):
+    """Time one import/init step of the boot sequence"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases.append((name, time.perf_counter() - start))
+
+def peak_memory_mb():
+    """Peak resident memory of this process, None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def report():
+    """Print how long each boot phase took"""
+    total = time.perf_counter() - T0
+    lines = ["Startup timing:"]
+    for name, seconds in phases:
+        lines.append(f"  {name:<20} {seconds * 1000:8.1f} ms")
+    lines.append(f"  {'total':<20} {total * 1000:8.1f} ms")
+    memory = peak_memory_mb()
+    if memory is not None:
+        lines.append(f"  {'peak memory':<20} {memory:8.1f} MB")
+    print("\n".join(lines))
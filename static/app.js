@@ -69,11 +69,22 @@ let recognition = null;
 if (SpeechRecognition) {
     recognition = new SpeechRecognition();
     recognition.continuous = true;
-    recognition.interimResults = false;
+    recognition.interimResults = true;
     recognition.lang = 'de-DE';
+    let lastPartial = "";
 
     recognition.onresult = (event) => {
-        const transcript = event.results[event.results.length - 1][0].transcript.trim();
+        const result = event.results[event.results.length - 1];
+        const transcript = result[0].transcript.trim();
+        if (!result.isFinal) {
+            // Interim hypothesis: the server may start answering before the final text
+            if (transcript && transcript !== lastPartial) {
+                socket.emit('audio_partial', { text: transcript });
+                lastPartial = transcript;
+            }
+            return;
+        }
+        lastPartial = "";
         statusText.innerText = "Heard: " + transcript;
         socket.emit('audio_input', { text: transcript });
         state = 'processing';
@@ -151,7 +162,45 @@ socket.on('pixel_state', (data) => {
     else if (data.state === 'idle') state = 'idle';
     if (data.text) statusText.innerText = data.text;
 });
+socket.on('response', (data) => {
+    // Answer to this browser's own question
+    statusText.innerText = data.text;
+    state = 'idle';
+});
 socket.on('notification', (data) => {
     if (Notification.permission === 'granted') new Notification("Pixel", { body: data.message });
 });
 if (Notification.permission === 'default') Notification.requestPermission();
+
+// Live latency spans, only with ?metrics in the URL (the server pushes nothing otherwise)
+if (new URLSearchParams(window.location.search).has('metrics')) {
+    const panel = document.createElement('pre');
+    panel.id = 'metrics-panel';
+    document.body.appendChild(panel);
+    const lines = [];
+    socket.on('connect', () => socket.emit('subscribe_metrics'));
+    socket.on('trace', (span) => {
+        lines.push(`#${span.turn} ${span.stage.padEnd(14)} +${span.offset_ms} ms  ${span.duration_ms} ms`);
+        if (lines.length > 20) lines.shift();
+        panel.innerText = lines.join('\n');
+    });
+}
+
+// Camera live view with ?live in the URL: binary JPEG frames, the next one is requested
+// only after the last one is shown, so a slow device skips frames instead of lagging behind
+if (new URLSearchParams(window.location.search).has('live')) {
+    const view = document.createElement('img');
+    view.id = 'live-view';
+    document.body.appendChild(view);
+    let shownUrl = null;
+    socket.on('connect', () => socket.emit('live_view_start'));
+    socket.on('live_frame', (data) => {
+        const url = URL.createObjectURL(new Blob([data], { type: 'image/jpeg' }));
+        view.onload = () => {
+            if (shownUrl) URL.revokeObjectURL(shownUrl);
+            shownUrl = url;
+            socket.emit('live_view_next');
+        };
+        view.src = url;
+    });
+}
@@ -2,16 +2,84 @@ import speech_recognition as sr
 import threading
 import os
 import io
-from groq import Groq
+import time
+import shutil
+import subprocess
+import numpy as np
+import groq_client
+from vad import VoiceActivityDetector
+from config import (GROQ_STT_TIMEOUT, VAD_ENABLED, VAD_END_SILENCE, VAD_MIN_VOICED_MS,
+                    WAKEWORD_ENABLED, WAKEWORD_DIR, WAKEWORD_THRESHOLD, WAKEWORD_FOLLOWUP,
+                    STT_UPLOAD_FORMAT, STT_OPUS_BITRATE)
+
+UPLOAD_RATE = 16000  # Whisper resamples everything to 16 kHz mono anyway
+
+
+def encode_upload(audio, fmt="flac", opus_bitrate="24k"):
+    """
+    Resample a phrase to 16 kHz 16 bit mono and encode it for upload.
+    Returns (bytes, filename); "opus" needs ffmpeg and falls back to FLAC.
+    """
+    if fmt == "opus" and shutil.which("ffmpeg"):
+        raw = audio.get_raw_data(convert_rate=UPLOAD_RATE, convert_width=2)
+        result = subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-f", "s16le", "-ar", str(UPLOAD_RATE), "-ac", "1", "-i", "-",
+             "-c:a", "libopus", "-b:a", opus_bitrate, "-application", "voip", "-f", "ogg", "-"],
+            input=raw, capture_output=True, check=True
+        )
+        return result.stdout, "speech.ogg"
+    if fmt in ("flac", "opus"):
+        return audio.get_flac_data(convert_rate=UPLOAD_RATE, convert_width=2), "speech.flac"
+    return audio.get_wav_data(convert_rate=UPLOAD_RATE, convert_width=2), "speech.wav"
+
+
+class Transcript:
+    """Similar to AssemblyAI's structure, for compatibility"""
+    def __init__(self, text):
+        self.text = text
 
 class SpeechToText:
-    def __init__(self, on_data):
+    """
+    Microphone capture + Groq Whisper transcription.
+    With on_audio, captured phrases are handed over untouched and the
+    caller runs transcribe() on its own worker; otherwise each phrase is
+    transcribed on the capture thread and passed to on_data.
+    """
+    def __init__(self, on_data=None, on_audio=None):
         self.on_data = on_data
+        self.on_audio = on_audio
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.microphone = None  # opened in start_stream, transcribe() works without one
         self.stop_listening = None
 
+        # End a phrase after this much silence (speech_recognition default is 0.8 s)
+        self.recognizer.pause_threshold = VAD_END_SILENCE
+        self.recognizer.non_speaking_duration = min(self.recognizer.non_speaking_duration, VAD_END_SILENCE)
+        self.vad = VoiceActivityDetector(min_voiced_ms=VAD_MIN_VOICED_MS) if VAD_ENABLED else None
+
+        # Local wake word gate: phrases are only uploaded after "Pixel"
+        self.wakeword = None
+        self.followup_until = 0
+        self.phrases = 0
+        self.uploaded = 0
+        self.rejected = 0
+        self.upload_bytes = 0
+        self.encode_seconds = 0.0
+
+        self.upload_format = STT_UPLOAD_FORMAT
+        if self.upload_format == "opus" and not shutil.which("ffmpeg"):
+            print("STT: ffmpeg not found, uploading FLAC instead of Opus")
+            self.upload_format = "flac"
+        if WAKEWORD_ENABLED:
+            from wakeword import WakeWordDetector
+            detector = WakeWordDetector.from_directory(WAKEWORD_DIR, threshold=WAKEWORD_THRESHOLD)
+            if detector.templates:
+                self.wakeword = detector
+            else:
+                print(f"Wake word gate off: no templates in '{WAKEWORD_DIR}' (record them with: python wakeword.py enroll)")
+
     def start_stream(self):
+        self.microphone = self.microphone or sr.Microphone()
         print("Calibrating microphone...")
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source)
@@ -25,40 +93,104 @@ class SpeechToText:
         )
 
     def _callback(self, recognizer, audio):
+        if self.on_audio:
+            self.on_audio(audio)
+            return
+        text = self.transcribe(audio)
+        if text:
+            # Pass to main callback
+            self.on_data(Transcript(text))
+
+    def transcribe(self, audio):
+        """VAD, wake word gate and Whisper upload; returns the text or None"""
         try:
-            # Get WAV data instead of letting recognizer choose format (Google needs FLAC)
-            wav_data = audio.get_wav_data()
-            
+            if self.vad:
+                audio = self._trim(audio)
+                if audio is None:
+                    return None
+
+            self.phrases += 1
+            if self.wakeword:
+                audio = self._gate(audio)
+                if audio is None:
+                    return None
+            self.uploaded += 1
+
+            # 16 kHz mono, compressed: the smallest payload Whisper still reads losslessly
+            start = time.perf_counter()
+            data, filename = encode_upload(audio, self.upload_format, STT_OPUS_BITRATE)
+            encode_time = time.perf_counter() - start
+            self.upload_bytes += len(data)
+            self.encode_seconds += encode_time
+            print(f"STT upload: {len(data) / 1024:.1f} KB {filename.rsplit('.', 1)[1]}, encoded in {encode_time * 1000:.0f} ms")
+
             # Use Groq Whisper for transcription
-            client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+            client = groq_client.get_client()
             
             # Wrap bytes in a file-like object
-            audio_file = io.BytesIO(wav_data)
-            audio_file.name = "speech.wav" # Groq needs a filename extension
+            audio_file = io.BytesIO(data)
+            audio_file.name = filename # Groq needs a filename extension
             
             transcription = client.audio.transcriptions.create(
                 file=audio_file,
                 model="whisper-large-v3-turbo",
                 language="de", # Forcing German as in previous implementation
-                response_format="text"
+                response_format="text",
+                timeout=GROQ_STT_TIMEOUT
             )
             
             text = transcription.strip()
             if not text:
-                return
+                return None
 
             print(f"STT: {text}")
-            
-            # Create a mock object similar to AssemblyAI's structure for compatibility
-            class Transcript:
-                def __init__(self, text):
-                    self.text = text
-            
-            # Pass to main callback
-            self.on_data(Transcript(text))
+            return text
             
         except Exception as e:
             print(f"STT Error: {e}")
+            return None
+
+    def _trim(self, audio):
+        """Cut silence around the speech; None if there is no speech at all"""
+        raw = audio.get_raw_data()
+        span = self.vad.speech_span(raw, audio.sample_rate, audio.sample_width)
+        if span is None:
+            seconds = len(raw) / audio.sample_width / audio.sample_rate
+            print(f"VAD: dropped {seconds:.1f} s without speech ({self.vad.dropped} so far)")
+            return None
+        start, end = span
+        return sr.AudioData(raw[start:end], audio.sample_rate, audio.sample_width)
+
+    def _gate(self, audio):
+        """Keep a phrase only if it starts with the wake word (or follows one closely)"""
+        if time.time() < self.followup_until:
+            self.followup_until = time.time() + WAKEWORD_FOLLOWUP
+            return audio
+
+        from wakeword import SAMPLE_RATE
+        raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        detection = self.wakeword.detect(np.frombuffer(raw, dtype="<i2"))
+        if detection is None:
+            self.rejected += 1
+            print(f"Wake word: no 'Pixel', phrase not uploaded ({self.rejected} so far)")
+            return None
+
+        self.followup_until = time.time() + WAKEWORD_FOLLOWUP
+        # Start shortly before the wake word, so Whisper still hears "Pixel"
+        start = max(0, detection.start - SAMPLE_RATE // 10) * 2
+        return sr.AudioData(raw[start:], SAMPLE_RATE, 2)
+
+    def stats(self):
+        stats = self.vad.stats() if self.vad else {}
+        stats.update({
+            "phrases": self.phrases,
+            "uploaded": self.uploaded,
+            "wakeword_rejected": self.rejected,
+            "upload_format": self.upload_format,
+            "upload_kb": round(self.upload_bytes / 1024, 1),
+            "encode_ms": round(self.encode_seconds * 1000),
+        })
+        return stats
 
     def stop_stream(self):
         if self.stop_listening:
@@ -0,0 +1,127 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+import types
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+import groq_client
+from assistant import Assistant
+from answer_cache import AnswerCache, normalize_question
+
+class FakeGroq:
+    """Chat completion with a fixed round trip, counts requests"""
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.requests = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, messages, stream=False, **kwargs):
+        self.requests += 1
+        time.sleep(self.latency)
+        answer = f"Antwort {self.requests}. Das ist alles dazu."
+        if not stream:
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=answer))])
+        chunk = lambda text: types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=text))])
+        return iter([chunk(word + " ") for word in answer.split()])
+
+def with_fake_groq(test):
+    def run():
+        fake, saved_client = FakeGroq(), groq_client._client
+        saved_key = os.environ.get("GROQ_API_KEY")
+        groq_client._client = fake
+        os.environ["GROQ_API_KEY"] = "test"
+        try:
+            test(fake)
+        finally:
+            groq_client._client = saved_client
+            if saved_key is None:
+                del os.environ["GROQ_API_KEY"]
+            else:
+                os.environ["GROQ_API_KEY"] = saved_key
+    run.__name__ = test.__name__
+    return run
+
+def test_normalization():
+    assert normalize_question("Pixel, was ist die Hauptstadt von Frankreich?") == "was ist die hauptstadt von frankreich"
+    assert normalize_question("Hey, sag mir bitte mal: was ist die Hauptstadt von Frankreich") == "was ist die hauptstadt von frankreich"
+    cache = AnswerCache()
+    assert cache.key("Wer hat gestern gewonnen?") is None
+    assert cache.key("Was gibt es Neues in den Nachrichten") is None
+
+@with_fake_groq
+def test_repeats_skip_the_network(fake):
+    assistant = Assistant()
+    questions = ["Wer hat die Relativitätstheorie entwickelt?", "wer hat die relativitätstheorie entwickelt",
+                 "Ähm, wer hat eigentlich die Relativitätstheorie entwickelt", "Wer hat das Telefon erfunden?"] * 5
+
+    start = time.perf_counter()
+    answers = [assistant.process_query(q) for q in questions]
+    elapsed = time.perf_counter() - start
+
+    stats = assistant.answers.stats()
+    print(f"{len(questions)} questions, {fake.requests} requests in {elapsed * 1000:.0f} ms, cache: {stats}")
+    assert fake.requests == 2
+    assert answers[0] == answers[1] == answers[2] != answers[3]
+    assert stats["hit_rate"] == 0.9
+    assert stats["saved_ms"] >= 18 * 50
+
+    # Time-sensitive questions always go to the model
+    assistant.process_query("Wer hat aktuell die meisten Follower?")
+    assistant.process_query("Wer hat aktuell die meisten Follower?")
+    assert fake.requests == 4
+
+@with_fake_groq
+def test_streaming_and_persistence(fake):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "answers.sqlite")
+        assistant = Assistant()
+        assistant.answers = AnswerCache(store_path=store)
+        first = list(assistant.process_query("Wie hoch ist der Mount Everest", stream=True))
+        assert fake.requests == 1
+
+        # A new process reads the answer back from SQLite
+        restarted = Assistant()
+        restarted.answers = AnswerCache(store_path=store)
+        again = list(restarted.process_query("Pixel, wie hoch ist der Mount Everest?", stream=True))
+        assert fake.requests == 1
+        assert again == first
+        assert restarted.process_query("wie hoch ist der mount everest") == " ".join(first)
+        restarted.answers.db.close()
+        assistant.answers.db.close()
+
+def test_counters_and_store_bound():
+    cache = AnswerCache()
+    cache.put("hauptstadt von frankreich", "Paris.", 0.001)
+
+    def ask():
+        for _ in range(2000):
+            cache.get("hauptstadt von frankreich")
+            cache.get("unbekannt")
+    threads = [threading.Thread(target=ask) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # No lost updates with several web workers asking at once
+    stats = cache.stats()
+    assert stats["hits"] == stats["misses"] == 16000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnswerCache(maxsize=3, store_path=os.path.join(tmp, "answers.sqlite"))
+        for i in range(5):
+            cache.put(f"frage {i}", f"Antwort {i}", 0.1)
+            time.sleep(0.002)
+        # The table keeps the newest maxsize answers, like the memory cache
+        keys = sorted(row[0] for row in cache.db.execute("SELECT key FROM answers"))
+        assert keys == ["frage 2", "frage 3", "frage 4"]
+        cache.db.close()
+
+if __name__ == "__main__":
+    test_normalization()
+    test_repeats_skip_the_network()
+    test_streaming_and_persistence()
+    test_counters_and_store_bound()
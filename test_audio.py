@@ -0,0 +1,174 @@
+import sys
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from vad import VoiceActivityDetector
+from wakeword import WakeWordDetector, mfcc, evaluate
+
+RATE = 16000
+
+# --- Fixtures: synthetic recordings written as WAV files ---
+
+def _noise(seconds, amplitude, rng):
+    return rng.normal(0, amplitude, int(RATE * seconds))
+
+def _voiced(seconds, rng, f0=130.0):
+    """Speech-like: harmonics of a wobbling f0 with a 4 Hz syllable envelope"""
+    t = np.arange(int(RATE * seconds)) / RATE
+    pitch = f0 * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = 0.35 + 0.65 * np.abs(np.sin(2 * np.pi * 2 * t))
+    return 4000 * signal * envelope + _noise(seconds, 50, rng)
+
+def fixture_set(directory):
+    """Write the WAV fixtures and return {name: path}"""
+    rng = np.random.default_rng(7)
+    quiet = lambda s: _noise(s, 40, rng)
+    clips = {
+        "speech": np.concatenate([quiet(0.6), _voiced(1.2, rng), quiet(0.9)]),
+        "cough": np.concatenate([quiet(0.5), _noise(0.15, 9000, rng), quiet(0.5)]),
+        "silence": quiet(2.0),
+        "tv_hiss": np.concatenate([quiet(0.3), _noise(1.5, 1500, rng), quiet(0.3)]),
+    }
+    paths = {}
+    for name, samples in clips.items():
+        path = os.path.join(directory, f"{name}.wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(RATE)
+            f.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+        paths[name] = path
+    return paths
+
+def read_wav(path):
+    with wave.open(path, "rb") as f:
+        return f.readframes(f.getnframes()), f.getframerate(), f.getsampwidth()
+
+# --- VAD ---
+
+def test_vad_trims_and_drops():
+    vad = VoiceActivityDetector()
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = fixture_set(tmp)
+        spans = {name: vad.speech_span(*read_wav(path)) for name, path in fixtures.items()}
+
+    assert spans["cough"] is None
+    assert spans["silence"] is None
+    assert spans["tv_hiss"] is None
+
+    start, end = spans["speech"]
+    kept = (end - start) / 2 / RATE
+    print(f"Speech kept: {start / 2 / RATE:.2f}s - {end / 2 / RATE:.2f}s ({kept:.2f}s of 2.70s)")
+    assert 0.3 < start / 2 / RATE < 0.6
+    assert 1.2 <= kept < 1.7
+
+    stats = vad.stats()
+    print(f"VAD stats: {stats}")
+    assert stats["segments"] == 4
+    assert stats["dropped"] == 3
+    assert stats["seconds_uploaded"] < stats["seconds_captured"] / 3
+
+# --- Wake word: formant-synthesized words ---
+
+def _vowel(seconds, f1, f2, f0=120.0):
+    t = np.arange(int(RATE * seconds)) / RATE
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.03 * np.sin(2 * np.pi * 3 * t))) / RATE
+    signal = np.zeros(len(t))
+    for k in range(1, int(7000 / f0)):
+        weight = 1 / (1 + ((k * f0 - f1) / 90) ** 2) + 0.7 / (1 + ((k * f0 - f2) / 120) ** 2)
+        signal += weight * np.sin(k * phase)
+    ramp = np.minimum(1, np.minimum(np.arange(len(t)), len(t) - np.arange(len(t))) / (0.02 * RATE))
+    return 3000 * signal * ramp
+
+def _fricative(seconds, low, rng):
+    n = int(RATE * seconds)
+    spectrum = np.fft.rfft(rng.normal(0, 1, n))
+    spectrum[np.fft.rfftfreq(n, 1 / RATE) < low] = 0
+    noise = np.fft.irfft(spectrum, n)
+    return 1500 * noise / (np.std(noise) + 1e-9)
+
+def _word(parts, rng, stretch=1.0, f0=120.0):
+    return np.concatenate([
+        _vowel(p[1] * stretch, p[2], p[3], f0) if p[0] == "v" else _fricative(p[1] * stretch, p[2], rng)
+        for p in parts
+    ])
+
+# ("v", seconds, F1, F2) vowel, ("f", seconds, lowest Hz) fricative
+PIXEL = [("f", 0.05, 1500), ("v", 0.15, 300, 2300), ("f", 0.1, 3500), ("v", 0.12, 500, 1500), ("v", 0.1, 350, 1000)]
+OTHER_WORDS = [
+    [("v", 0.2, 700, 1200), ("f", 0.1, 2500), ("v", 0.15, 400, 800)],
+    [("f", 0.12, 4000), ("v", 0.2, 300, 2300), ("v", 0.1, 600, 1800)],
+    [("v", 0.15, 500, 1500), ("v", 0.15, 300, 2300), ("f", 0.1, 3500)],
+    [("v", 0.3, 700, 1100), ("v", 0.2, 450, 900)],
+    [("f", 0.05, 1500), ("v", 0.15, 600, 1000), ("f", 0.1, 2500), ("v", 0.12, 700, 1200), ("v", 0.1, 300, 2300)],
+]
+
+def test_wakeword_false_accept_reject():
+    rng = np.random.default_rng(1)
+    quiet = lambda s: _noise(s, 40, rng)
+    templates = [mfcc(np.concatenate([quiet(0.05), _word(PIXEL, rng, stretch, f0), quiet(0.05)]))
+                 for stretch, f0 in [(1.0, 120), (0.9, 140), (1.1, 110)]]
+    detector = WakeWordDetector(templates)
+
+    positives, negatives = [], []
+    for i in range(30):
+        stretch, f0 = rng.uniform(0.85, 1.15), rng.uniform(100, 160)
+        command = _word(OTHER_WORDS[i % 5], rng, f0=f0)
+        positives.append(np.concatenate([quiet(rng.uniform(0.1, 0.6)), _word(PIXEL, rng, stretch, f0), quiet(0.1), command, quiet(0.3)]))
+        negatives.append(np.concatenate([quiet(0.3), _word(OTHER_WORDS[i % 5], rng, stretch, f0), quiet(0.1),
+                                         _word(OTHER_WORDS[(i + 2) % 5], rng, f0=f0), quiet(0.3)]))
+    negatives += [_noise(2.0, 800, rng) for _ in range(10)]
+
+    start = time.perf_counter()
+    rates = evaluate(detector, positives, negatives)
+    per_phrase = (time.perf_counter() - start) / (len(positives) + len(negatives)) * 1000
+    print(f"Wake word: {rates}, {per_phrase:.1f} ms per phrase")
+    assert rates["false_reject_rate"] <= 0.1
+    assert rates["false_accept_rate"] <= 0.1
+
+    # The match starts at the wake word, not at the leading silence
+    padded = np.concatenate([quiet(0.5), _word(PIXEL, rng), quiet(0.2)])
+    detection = detector.detect(padded)
+    assert detection and abs(detection.start - 0.5 * RATE) < 0.1 * RATE
+
+# --- Upload encoding ---
+
+UPLINK_BYTES_PER_S = 1_000_000 / 8  # 1 Mbit/s
+
+def test_upload_encoding_benchmark():
+    import shutil
+    import speech_recognition as sr
+    from stt import encode_upload
+
+    rng = np.random.default_rng(3)
+    mic_rate = 48000
+    for seconds in (1.5, 4.0, 8.0):
+        # Typical microphone capture: 48 kHz, resampled from the 16 kHz fixture signal
+        phrase = np.concatenate([_noise(0.2, 40, rng), _voiced(seconds, rng), _noise(0.2, 40, rng)])
+        phrase = np.repeat(phrase, mic_rate // RATE)
+        audio = sr.AudioData(np.clip(phrase, -32768, 32767).astype("<i2").tobytes(), mic_rate, 2)
+        original = len(audio.get_wav_data())
+
+        for fmt in ("wav", "flac") + (("opus",) if shutil.which("ffmpeg") else ()):
+            start = time.perf_counter()
+            data, filename = encode_upload(audio, fmt)
+            encode_time = time.perf_counter() - start
+            saved = (original - len(data)) / UPLINK_BYTES_PER_S
+            print(f"{seconds:.1f}s {filename:12} {original / 1024:7.1f} KB -> {len(data) / 1024:6.1f} KB, "
+                  f"encode {encode_time * 1000:5.1f} ms, upload saved {saved * 1000:6.0f} ms")
+            assert len(data) < original / 2.5
+            assert encode_time < saved
+
+if __name__ == "__main__":
+    test_vad_trims_and_drops()
+    test_wakeword_false_accept_reject()
+    test_upload_encoding_benchmark()
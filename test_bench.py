@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import subprocess
+import tempfile
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+def test_corpus_routes_as_labeled():
+    """Every corpus line hits the intent its numbers are reported under"""
+    from bench import CORPUS, check_corpus
+    from router import IntentRouter, default_rules
+    from config import WETTER_KEYWORDS
+    router = IntentRouter(default_rules(WETTER_KEYWORDS), skills={"timer", "camera"})
+    assert check_corpus(router) == []
+    assert {"alarm", "notification", "ai"} <= {intent for _, intent in CORPUS}
+
+def test_offline_benchmark_smoke():
+    """Short cold run of bench.py: every turn completes against the local fakes"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "bench.json")
+        # Own process: config must be read with the fake endpoints
+        subprocess.run([sys.executable, os.path.join(root, "bench.py"), "--runs", "1", "--scale", "0.02",
+                        "--cold", "--out", out], cwd=tmp, check=True, capture_output=True, timeout=120)
+        with open(out, encoding="utf-8") as f:
+            results = json.load(f)
+
+    print(json.dumps(results["end_to_end"]["first_audio"], indent=1))
+    intents = results["assistant"]["intents"]
+    for name in ("ai", "weather", "search", "time", "timer"):
+        assert intents[name]["count"] > 0 and intents[name]["p99_ms"] >= intents[name]["p50_ms"]
+    assert results["end_to_end"]["failed_turns"] == 0
+    assert sum(s["count"] for s in results["end_to_end"]["first_audio"].values()) == results["config"]["corpus_size"]
+    # Cold: every AI question (sequential, concurrent, end to end) reached the fake Groq
+    assert results["requests"]["chat"] == 3 * intents["ai"]["count"]
+    assert results["requests"]["stt"] == results["config"]["corpus_size"]
+    for stage in ("stt", "route", "tts_synthesis", "playback", "first_audio"):
+        assert stage in results["stages"]
+
+    # Web sessions: every query answered, more sessions serve more queries per second
+    web = results["web_sessions"]
+    print(json.dumps(web, indent=1))
+    assert all(web[n]["failed"] == 0 and web[n]["count"] == int(n) * 5 for n in ("1", "10", "100"))
+    assert web["10"]["throughput_qps"] > 2 * web["1"]["throughput_qps"]
+
+    # Interim transcripts: every reply arrives, earlier with speculation, wrong guesses are counted
+    speculation = results["speculation"]
+    print(json.dumps(speculation, indent=1))
+    assert speculation["off"]["failed"] == 0 and speculation["on"]["failed"] == 0
+    assert speculation["speculation"]["committed"] > 0 and speculation["speculation"]["wasted"] > 0
+    assert speculation["on"]["p50_ms"] < speculation["off"]["p50_ms"]
+
+def test_boot_report_warm_vs_cold():
+    """First turns after boot in two fresh processes, with and without warm-up"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "boot.json")
+        subprocess.run([sys.executable, os.path.join(root, "bench.py"), "--boot", "--scale=0.05", f"--out={out}"],
+                       cwd=tmp, check=True, capture_output=True, timeout=120)
+        with open(out, encoding="utf-8") as f:
+            results = json.load(f)
+
+    print(results["report"])
+    for label in ("cold", "warm"):
+        assert all(ms is not None for ms in results[label]["first_turn_ms"].values())
+    assert all(task["status"] == "ok" for task in results["warm"]["warm_up"].values())
+    assert results["warm"]["requests"]["models"] == 1
+    # The very first turn pays for imports and synthesis unless the warm-up did that already
+    assert results["warm"]["first_turn_ms"]["ack"] < results["cold"]["first_turn_ms"]["ack"]
+
+if __name__ == "__main__":
+    test_corpus_routes_as_labeled()
+    test_offline_benchmark_smoke()
+    test_boot_report_warm_vs_cold()
@@ -0,0 +1,202 @@
+import sys
+import os
+import time
+import tempfile
+import types
+
+import cv2
+import numpy as np
+import pytest
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from skills.camera import CameraManager, CameraSource, class_name, german_count
+
+ROOMS = ["kueche", "wohnzimmer", "flur", "buero"]
+
+def _write_video(path, frames=30, size=(320, 240), seed=0, step=7):
+    """Synthetic room: a box moving over a static background (standing still with step=0)"""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 15, size)
+    for i in range(frames):
+        frame = background.copy()
+        x = (i * step) % (size[0] - 60)
+        cv2.rectangle(frame, (x, 80), (x + 60, 200), (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+def _make_videos(tmp, count):
+    spec = []
+    for i, room in enumerate(ROOMS[:count]):
+        path = os.path.join(tmp, f"{room}.avi")
+        _write_video(path, seed=i)
+        spec.append(f"{room}={path}")
+    return ",".join(spec)
+
+class FakeModel:
+    """Stands in for YOLO: one 'person' per frame, records batch sizes"""
+    names = {0: "person", 41: "cup"}
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, frames, verbose=False):
+        self.calls.append(len(frames))
+        box = types.SimpleNamespace(cls=[0], conf=[0.9], xyxy=[[40.0, 60.0, 120.0, 220.0]])
+        return [types.SimpleNamespace(boxes=[box]) for _ in frames]
+
+def _box(cls, x, conf=0.9):
+    return types.SimpleNamespace(cls=[cls], conf=[conf], xyxy=[[x, 50.0, x + 60.0, 200.0]])
+
+class ScriptedModel(FakeModel):
+    """Returns prepared boxes, one list per call"""
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+
+    def __call__(self, frames, verbose=False):
+        self.calls.append(len(frames))
+        return [types.SimpleNamespace(boxes=self.script.pop(0)) for _ in frames]
+
+def test_batched_ticks_and_rooms():
+    with tempfile.TemporaryDirectory() as tmp:
+        camera = CameraManager(sources=_make_videos(tmp, 3), mode="continuous", cpu_budget=1.0)
+        camera.model = FakeModel()
+        camera.start_camera()
+        time.sleep(0.5)
+
+        # One model call per tick, covering all three sources
+        assert camera.model.calls and all(n == 3 for n in camera.model.calls)
+        assert camera.describe_scene("flur") == "Ich sehe eine Person."
+        assert camera.describe_scene().startswith("kueche: eine Person. wohnzimmer: eine Person.")
+        camera.stop_camera()
+
+def test_motion_mode_skips_static_scene():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "flur.avi")
+        _write_video(path, step=0)
+        camera = CameraManager(sources=f"flur={path}", mode="motion", cpu_budget=1.0)
+        camera.model = FakeModel()
+        camera.start_camera()
+        time.sleep(0.6)
+        camera.stop_camera()
+        stats = camera.stats()
+        print(f"Static video: {stats}")
+        # Only the first frame goes to the model, the unchanged ones after it are skipped
+        assert stats["frames_skipped"] > 0
+        assert stats["frames_inferred"] <= 2
+
+    # A slow drift is measured against the last inferred frame, so small steps add up
+    src = camera.sources[0]
+    src.ref_small = np.zeros((48, 64), dtype=np.uint8)
+    drifted = src.ref_small.copy()
+    moved = []
+    for i in range(4):
+        drifted.flat[i * 16:(i + 1) * 16] = 255  # about 0.5% of the pixels per step, below the threshold
+        moved.append(camera._has_motion(src, drifted))
+    assert moved == [False, True, True, True]
+    assert not camera._has_motion(src, src.ref_small.copy())
+
+def test_on_demand_infers_once_per_question():
+    with tempfile.TemporaryDirectory() as tmp:
+        camera = CameraManager(sources=_make_videos(tmp, 1), mode="on_demand")
+        camera.model = FakeModel()
+        camera.start_camera()
+        time.sleep(0.3)
+        # Nobody asked and nobody watches: no inference, no decoded frame
+        assert camera.model.calls == [] and camera.frame is None
+
+        assert camera.describe_scene("kueche") == "Ich sehe eine Person."
+        assert camera.model.calls == [1] and camera.frames_inferred == 1
+
+        # The live view keeps frames coming without running the model
+        camera.sources[0].frame = None
+        camera.live_frame()
+        time.sleep(0.3)
+        assert camera.frame is not None and camera.model.calls == [1]
+        camera.stop_camera()
+
+def test_smoothed_scene_and_history():
+    camera = CameraManager(sources="kueche=0")
+    camera.is_running = True
+    src = camera.sources[0]
+
+    # Two people walking right, a cup on the table; frame 4 misses a person, frame 5 sees a ghost cup
+    script = []
+    for i in range(8):
+        boxes = [_box(0, 20 + 5 * i), _box(0, 300 + 5 * i), _box(41, 500)]
+        if i == 4:
+            boxes = boxes[1:]
+        if i == 5:
+            boxes.append(_box(41, 100, conf=0.6))
+        script.append(boxes)
+    # Then only a third person, coming in from the right
+    script += [[_box(0, 700 + 3 * i)] for i in range(5)]
+    camera.model = ScriptedModel(script)
+    for _ in range(8):
+        camera._infer([(src, None)])
+
+    # The single bad frames do not show up in the answer
+    assert camera.describe_scene("kueche") == "Ich sehe: 2 Personen und eine Tasse."
+    # Spoken "Küche" (router slot) finds the source configured as "kueche"
+    assert camera.find_source("Küche") is src
+    assert camera.describe_scene("küche") == "Ich sehe: 2 Personen und eine Tasse."
+    # Tracking: two people stayed the same two people over 8 frames
+    assert camera.count_objects("Personen", 60) == "In der letzten Minute habe ich 2 Personen gesehen."
+    assert camera.count_objects("Tassen") == "Ich sehe gerade eine Tasse."
+    assert camera.count_objects("Einhörner", 60) == "Einhörner kann ich nicht erkennen."
+
+    # A third person comes in later: distinct count grows, the current view follows once it is stable
+    for _ in range(5):
+        camera._infer([(src, None)])
+    assert camera.count_objects("menschen", 60) == "In der letzten Minute habe ich 3 Personen gesehen."
+    assert camera.describe_scene("kueche") == "Ich sehe eine Person."
+    print(f"Detection store: {src.detections.stats()}")
+
+def test_german_phrases():
+    assert [german_count(name, 1) for name in ("person", "chair", "book")] == ["eine Person", "einen Stuhl", "ein Buch"]
+    assert german_count("mouse", 3) == "3 Mäuse"
+    assert [class_name(word) for word in ("Mäuse", "stuhl", "Leute", "f")] == ["mouse", "chair", "person", None]
+
+def test_batched_vs_independent_benchmark():
+    """Total frames/s of one batched loop vs N independent per-frame loops"""
+    ultralytics = pytest.importorskip("ultralytics")
+    model = ultralytics.YOLO("yolov8n.pt")
+    ticks = 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (1, 2, 4):
+            paths = [os.path.join(tmp, f"{room}.avi") for room in ROOMS[:count]]
+            for i, path in enumerate(paths):
+                _write_video(path, seed=i)
+            sources = [CameraSource(f"cam{i}", path) for i, path in enumerate(paths)]
+            for src in sources:
+                src.open()
+            model([src.read()[1] for src in sources], verbose=False)  # warm-up
+
+            start = time.perf_counter()
+            for _ in range(ticks):
+                for src in sources:
+                    model(src.read()[1], verbose=False)
+            independent = count * ticks / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in range(ticks):
+                model([src.read()[1] for src in sources], verbose=False)
+            batched = count * ticks / (time.perf_counter() - start)
+
+            for src in sources:
+                src.release()
+            print(f"{count} sources: independent {independent:.1f} fps, batched {batched:.1f} fps ({batched / independent:.2f}x)")
+            if count > 1:
+                assert batched > independent
+
+if __name__ == "__main__":
+    test_batched_ticks_and_rooms()
+    test_motion_mode_skips_static_scene()
+    test_on_demand_infers_once_per_question()
+    test_german_phrases()
+    test_smoothed_scene_and_history()
+    test_batched_vs_independent_benchmark()
@@ -8,7 +8,7 @@ sys.path.append(os.getcwd())
 from assistant import Assistant
 
 class MockTTS:
-    def speak(self, text):
+    def speak(self, text, **kwargs):
         print(f"[TTS] {text}")
 
 def test_assistant():
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import threading
+
+import numpy as np
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from live_view import LiveView, PROFILES
+
+class FakeCamera:
+    """Produces a new 640x480 frame every 1/fps seconds"""
+    def __init__(self, fps=20):
+        self.frame = None
+        self.count = 0
+        rng = np.random.default_rng(0)
+        self.background = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        self.running = True
+        threading.Thread(target=self._run, args=(fps,), daemon=True).start()
+
+    def _run(self, fps):
+        while self.running:
+            frame = self.background.copy()
+            frame[:, (self.count * 8) % 600:(self.count * 8) % 600 + 40] = 255
+            self.frame = frame
+            self.count += 1
+            time.sleep(1 / fps)
+
+def _watch(view, viewers, seconds, slow=()):
+    """Socket.IO-style viewers: ask for the next frame after 'receiving' the last"""
+    received = {key: 0 for key in viewers}
+    inbox = {key: threading.Event() for key in viewers}
+
+    def send(key, jpeg):
+        received[key] += 1
+        inbox[key].set()
+
+    def client(key):
+        view.add_viewer(key)
+        view.request_frame(key)
+        end = time.time() + seconds
+        while time.time() < end:
+            if inbox[key].wait(0.05):
+                inbox[key].clear()
+                time.sleep(0.3 if key in slow else 0.001)  # slow link / slow device
+                view.request_frame(key)
+        view.remove_viewer(key)
+
+    view.send = send
+    threads = [threading.Thread(target=client, args=(key,)) for key in viewers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return received
+
+def test_encode_once_flat_cost():
+    camera = FakeCamera()
+    for count in (1, 10, 50):
+        view = LiveView(lambda: camera.frame, max_fps=10)
+        start = time.process_time()
+        received = _watch(view, [f"v{i}" for i in range(count)], 1.0)
+        cpu = time.process_time() - start
+        stats = view.stats()
+        print(f"{count:3} viewers: {stats['encodes']} encodes, {stats['frames_sent']} frames sent, "
+              f"{cpu * 1000:.0f} ms CPU, profile {PROFILES[view.level]}")
+        # One encode per captured frame, no matter how many viewers
+        assert 5 <= stats["encodes"] <= 12
+        assert min(received.values()) >= stats["encodes"] - 3
+    camera.running = False
+
+def test_slow_viewer_drops_and_quality_adapts():
+    camera = FakeCamera()
+    view = LiveView(lambda: camera.frame, max_fps=10)
+    received = _watch(view, ["fast", "slow"], 1.5, slow=("slow",))
+    print(f"Received: {received}, encodes: {view.encodes}")
+    assert received["fast"] >= view.encodes - 3
+    assert received["slow"] <= received["fast"] / 2
+    camera.running = False
+
+    many = LiveView(max_fps=10)
+    for i in range(20):
+        many.add_viewer(f"v{i}")
+    assert many._choose_level() == len(PROFILES) - 1
+    for i in range(20):
+        many.remove_viewer(f"v{i}")
+
+def test_mjpeg_route():
+    import server
+    camera = FakeCamera()
+    server.set_frame_source(lambda: camera.frame)
+    response = server.app.test_client().get("/live.mjpg")
+    assert response.mimetype == "multipart/x-mixed-replace"
+    chunk = next(response.response)
+    assert chunk.startswith(b"--frame\r\nContent-Type: image/jpeg")
+    assert b"\xff\xd8" in chunk  # JPEG start
+    response.close()
+    camera.running = False
+    server.set_frame_source(None)
+
+if __name__ == "__main__":
+    test_encode_once_flat_cost()
+    test_slow_viewer_drops_and_quality_adapts()
+    test_mjpeg_route()
@@ -0,0 +1,120 @@
+import sys
+import os
+import time
+import threading
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from pipeline import Pipeline
+
+class Recorder:
+    """Fake stages: slow transcription and skills, records what gets spoken"""
+    def __init__(self, stt_delay=0.05, skill_delay=0.2):
+        self.stt_delay = stt_delay
+        self.skill_delay = skill_delay
+        self.spoken = []
+        self.done = threading.Event()
+
+    def transcribe(self, audio):
+        time.sleep(self.stt_delay)
+        return audio  # the "audio" is already the text in this test
+
+    def respond(self, query):
+        time.sleep(self.skill_delay)
+        return f"Antwort auf {query}"
+
+    def speak(self, turn):
+        self.spoken.append(turn.response)
+        self.done.set()
+
+def make_pipeline(rec, pipeline_box, **kwargs):
+    def on_transcript(turn):
+        if "pixel" in turn.text:
+            pipeline_box[0].cancel(keep=turn)
+        pipeline_box[0].answer(turn, turn.text)
+    pipeline_box[0] = Pipeline(rec.transcribe, on_transcript, rec.respond, rec.speak, **kwargs)
+    return pipeline_box[0]
+
+def wait_for(condition, timeout=3.0):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.01)
+    return condition()
+
+def test_capture_never_blocks():
+    rec = Recorder()
+    pipeline = make_pipeline(rec, [None], queue_size=2)
+
+    start = time.perf_counter()
+    for i in range(10):
+        pipeline.submit_audio(f"frage {i}")
+    submit_ms = (time.perf_counter() - start) * 1000
+    print(f"10 phrases submitted in {submit_ms:.2f} ms")
+    assert submit_ms < 20
+
+    # Backpressure: the full STT queue dropped the oldest phrases
+    assert wait_for(lambda: "Antwort auf frage 9" in rec.spoken)
+    stats = pipeline.stats()
+    print(f"Stats: {stats}")
+    assert stats["stt"]["dropped"] >= 6
+    assert len(rec.spoken) <= 4
+
+def test_wake_word_cancels_stale_turn():
+    rec = Recorder(stt_delay=0.01, skill_delay=0.3)
+    pipeline = make_pipeline(rec, [None])
+
+    pipeline.submit_audio("alte frage")
+    time.sleep(0.1)  # old turn is now running in the skill stage
+    pipeline.submit_audio("pixel neue frage")
+    assert wait_for(lambda: "Antwort auf pixel neue frage" in rec.spoken)
+    time.sleep(0.4)
+    assert rec.spoken == ["Antwort auf pixel neue frage"]
+
+def test_wake_word_only_cancels_own_source():
+    rec = Recorder(stt_delay=0.01, skill_delay=0.3)
+    pipeline = make_pipeline(rec, [None])
+
+    pipeline.submit_audio("frage vom mikrofon")
+    time.sleep(0.1)
+    pipeline.submit_audio("pixel frage aus dem browser", source="sid-1")
+    assert wait_for(lambda: len(rec.spoken) == 2)
+    assert set(rec.spoken) == {"Antwort auf frage vom mikrofon", "Antwort auf pixel frage aus dem browser"}
+
+def test_deadline():
+    rec = Recorder(stt_delay=0.2, skill_delay=0.0)
+    pipeline = make_pipeline(rec, [None], deadline=0.1)
+    pipeline.submit_audio("zu langsam")
+    time.sleep(0.4)
+    assert rec.spoken == []
+    assert pipeline.stats()["skill"]["expired"] == 1
+
+    # Turns captured with a longer deadline get through
+    pipeline.deadline = 5.0
+    pipeline.submit_audio("hallo")
+    assert wait_for(lambda: rec.spoken == ["Antwort auf hallo"])
+
+def test_counters_and_busy_survive_errors():
+    rec = Recorder(stt_delay=0.0, skill_delay=0.001)
+    respond = rec.respond
+    def flaky(query):
+        if query.endswith("3"):
+            raise RuntimeError("kaputt")
+        return respond(query)
+    rec.respond = flaky
+    pipeline = make_pipeline(rec, [None], queue_size=64, skill_workers=4)
+
+    for i in range(40):
+        pipeline.submit_audio(f"frage {i}")
+    assert wait_for(lambda: pipeline.stats()["skill"]["processed"] == 40)
+    # Every handler call was counted, failed ones too, and nothing is left "active"
+    assert wait_for(lambda: not pipeline.busy())
+    stats = pipeline.stats()["skill"]
+    assert stats["errors"] == 4 and pipeline.skill.active == 0
+
+if __name__ == "__main__":
+    test_capture_never_blocks()
+    test_wake_word_cancels_stale_turn()
+    test_wake_word_only_cancels_own_source()
+    test_deadline()
+    test_counters_and_busy_survive_errors()
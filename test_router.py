@@ -0,0 +1,108 @@
+import sys
+import os
+import random
+import string
+import time
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from router import IntentRouter, Rule, default_rules
+from config import WETTER_KEYWORDS
+
+QUERIES = [
+    ("Stelle einen Timer auf 5 Minuten", "timer"),
+    ("Stell noch einen Timer auf 5 Minuten", "timer"),
+    ("Wie lange läuft der Timer noch?", "timer_list"),
+    ("Wecke mich um 7 Uhr", "alarm"),
+    ("Wecke mich um 7:30", "alarm"),
+    ("Wecke mich morgen um 6:30", "alarm"),
+    ("Weck mich um 6 Uhr 15", "alarm"),
+    ("Stelle den Wecker auf 7 Uhr", "alarm"),
+    ("Lösche alle Timer", "timer_cancel"),
+    ("Lösche den Wecker", "alarm_cancel"),
+    ("Wecker abbrechen", "alarm_cancel"),
+    ("Kannst du mich um 6 Uhr aufwecken?", "alarm"),
+    ("Wie spät ist es, ich will den Zweck wissen", "time"),
+    ("Starte die Stoppuhr", "stopwatch_start"),
+    ("Stoppuhr stoppen", "stopwatch_stop"),
+    ("Wie spät ist es?", "time"),
+    ("Welcher Tag ist heute?", "time"),
+    ("Suche nach der Hauptstadt von Frankreich", "search"),
+    ("Wer ist der Präsident der USA?", "search"),
+    ("Sende Benachrichtigung an PC: Essen ist fertig", "notification"),
+    ("Wie ist das Wetter in Hamburg?", "weather"),
+    ("Starte Kamera", "camera_start"),
+    ("Kamera aus", "camera_stop"),
+    ("Was siehst du?", "camera_describe"),
+    ("Wie viele Personen hast du in der letzten Minute gesehen?", "camera_count"),
+    ("Wie viele Einwohner hat Deutschland?", "ai"),
+    ("Erzähl mir einen Witz", "ai"),
+]
+
+def _router(extra_rules=()):
+    return IntentRouter(default_rules(WETTER_KEYWORDS) + list(extra_rules), skills={"timer", "camera"})
+
+def test_intents():
+    router = _router()
+    for text, expected in QUERIES:
+        intent = router.classify(text)
+        print(f"{text!r} -> {intent}")
+        assert intent.name == expected, (text, intent)
+
+def test_slots():
+    router = _router()
+    assert router.classify("Timer auf 10 Sekunden").slots == {"amount": "10", "unit": "sekunde"}
+    assert router.classify("Wie ist das Wetter in Hamburg?").slots == {"city": "Hamburg"}
+    assert router.classify("Suche nach Python").slots == {"query": "python"}
+    assert router.classify("Sende Benachrichtigung an PC: Hallo").slots == {"target": "PC", "message": "Hallo"}
+    assert router.classify("Wecke mich morgen um 6:30").slots == {"hour": 6, "minute": 30}
+    assert router.classify("Wie viele Tassen siehst du in der Küche?").slots == {"object": "tassen", "seconds": None, "room": "küche"}
+    assert router.classify("Was siehst du in den Flur?").slots == {"room": "flur"}
+    assert router.classify("Was siehst du im Büro?").slots == {"room": "büro"}
+    assert router.classify("Wie viele Personen hast du in den letzten 10 Minuten in der Küche gesehen?").slots == \
+        {"object": "personen", "seconds": 600, "room": "küche"}
+    assert router.classify("Wie viele Personen hast du in der Küche in den letzten 10 Minuten gesehen?").slots["room"] == "küche"
+    assert router.classify("Wieviele Menschen waren in den letzten 10 Minuten im Bild?").slots["seconds"] == 600
+    # "time but not timer": a timer without duration must not fall back to the time intent
+    assert router.classify("Wie lange läuft der Timer noch").name != "time"
+    # "Zweck" contains "weck" but never sets an alarm
+    assert router.classify("Was war der Zweck des Treffens um 8 Uhr?").name != "alarm"
+    assert router.classify("Erkläre mir den Zweck von Wasserstoff um 7:30").name == "ai"
+
+def test_skills_disabled():
+    router = IntentRouter(default_rules(WETTER_KEYWORDS), skills=set())
+    assert router.classify("Starte Kamera").name == "ai"
+    assert router.classify("Stelle einen Timer auf 5 Minuten").name == "ai"
+
+def _synthetic_rules(count, keywords_per_rule, rng):
+    rules = []
+    for i in range(count):
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(8)) for _ in range(keywords_per_rule)]
+        rules.append(Rule(f"skill_{i}", [words], 100 + i))
+    return rules
+
+def _time_per_query(router, rounds=200):
+    texts = [q for q, _ in QUERIES]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            router.classify(text)
+    return (time.perf_counter() - start) / (rounds * len(texts))
+
+def test_routing_cost_is_flat():
+    """Micro-benchmark: per-query cost should not grow with the number of skills/keywords"""
+    rng = random.Random(42)
+    timings = {}
+    for skills in (0, 10, 100, 1000):
+        router = _router(_synthetic_rules(skills, 20, rng))
+        timings[skills] = _time_per_query(router)
+        print(f"{skills:5d} extra skills ({skills * 20:6d} keywords): {timings[skills] * 1e6:.1f} us/query")
+
+    assert timings[1000] < timings[0] * 3
+
+if __name__ == "__main__":
+    test_intents()
+    test_slots()
+    test_skills_disabled()
+    test_routing_cost_is_flat()
@@ -0,0 +1,127 @@
+import sys
+import os
+import time
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from fixture_server import FixtureHandler, start_server
+from skills.search import WebSearch, normalize_query
+
+# DuckDuckGo Lite look-alike: a few results followed by a lot of page
+RESULTS = "".join(
+    f'<tr><td><a rel="nofollow" href="https://example.com/{i}" class="result-link">Ergebnis {i} &amp; mehr</a></td></tr>\n'
+    for i in range(30)
+)
+PAGE = ("<html><body><table>" + RESULTS + "<tr><td>" + "x" * 200000 + "</td></tr></table></body></html>").encode("utf-8")
+
+class SearchHandler(FixtureHandler):
+    """DuckDuckGo Lite look-alike that can send slowly or stall mid-page"""
+    delay = 0.0
+    stall = None  # (bytes, seconds): stop sending after that many bytes for that long
+
+    def do_GET(self):
+        self.count()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        try:
+            for i in range(0, len(PAGE), 512):
+                if SearchHandler.delay:
+                    time.sleep(SearchHandler.delay)
+                if SearchHandler.stall and i == SearchHandler.stall[0]:
+                    self.wfile.flush()
+                    time.sleep(SearchHandler.stall[1])
+                self.wfile.write(PAGE[i:i + 512])
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped reading early
+
+def _start_server():
+    SearchHandler.requests_served = 0
+    return start_server(SearchHandler, "/lite/")
+
+def test_parse_time_and_cache():
+    server, url = _start_server()
+    SearchHandler.delay = 0.0
+    search = WebSearch(url, budget=2.0)
+    try:
+        start = time.perf_counter()
+        results, partial = search.search("Hauptstadt von Frankreich?")
+        cold = time.perf_counter() - start
+        assert results == ["Ergebnis 0 & mehr", "Ergebnis 1 & mehr", "Ergebnis 2 & mehr"]
+        assert not partial
+
+        # Household repeats: same question, different spelling
+        start = time.perf_counter()
+        for q in ["hauptstadt von frankreich", "Hauptstadt  von Frankreich!"] * 50:
+            search.search(q)
+        warm = (time.perf_counter() - start) / 100
+
+        stats = search.stats()
+        print(f"Cold search {cold * 1000:.1f} ms, cached {warm * 1e6:.1f} us, hit rate {stats['hit_rate']:.0%}")
+        assert SearchHandler.requests_served == 1
+        assert stats["hit_rate"] > 0.98
+    finally:
+        server.shutdown()
+
+def test_budget_returns_partial_results():
+    server, url = _start_server()
+    SearchHandler.delay = 0.1  # ~5 KB/s, results trickle in
+    search = WebSearch(url, budget=0.3, max_results=30)
+    try:
+        start = time.perf_counter()
+        results, partial = search.search("langsame Seite")
+        elapsed = time.perf_counter() - start
+        print(f"Budget 300 ms: {len(results)} results after {elapsed * 1000:.0f} ms")
+        assert partial
+        assert elapsed < 0.6
+        # Partial answers are not cached
+        assert search.stats()["entries"] == 0
+    finally:
+        SearchHandler.delay = 0.0
+        server.shutdown()
+
+def test_budget_holds_when_body_stalls():
+    server, url = _start_server()
+    SearchHandler.delay = 0.1  # the first results arrive late in the budget ...
+    SearchHandler.stall = (2048, 3.0)  # ... then the server stops sending
+    search = WebSearch(url, budget=0.5, max_results=30)
+    try:
+        start = time.perf_counter()
+        results, partial = search.search("hängende Seite")
+        elapsed = time.perf_counter() - start
+        print(f"Budget 500 ms, stalled body: {len(results)} results after {elapsed * 1000:.0f} ms")
+        assert partial and results
+        # Stalled at ~0.4 s: at most one read timeout (the budget) later, not after the 3 s stall
+        assert elapsed < 1.2
+    finally:
+        SearchHandler.delay = 0.0
+        SearchHandler.stall = None
+        server.shutdown()
+
+def test_connection_reused_after_early_stop():
+    server, url = _start_server()
+    try:
+        opened = []
+        for drain_limit in (len(PAGE), 0):
+            search = WebSearch(url, budget=2.0, drain_limit=drain_limit)
+            SearchHandler.connections = 0
+            for q in ("eins", "zwei", "drei"):
+                assert search.search(q)[0]
+            opened.append(SearchHandler.connections)
+        # Rest of the page drained: all three searches on one pooled connection;
+        # not worth reading: closed, a new connection every time
+        assert opened == [1, 3]
+    finally:
+        server.shutdown()
+
+def test_normalize_query():
+    assert normalize_query("  Wer ist  der Präsident der USA? ") == "wer ist der präsident der usa"
+
+if __name__ == "__main__":
+    test_parse_time_and_cache()
+    test_budget_returns_partial_results()
+    test_budget_holds_when_body_stalls()
+    test_connection_reused_after_early_stop()
+    test_normalize_query()
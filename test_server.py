@@ -0,0 +1,116 @@
+import sys
+import os
+import time
+import threading
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+import server
+
+MOBILE_UA = {"User-Agent": "Mozilla/5.0 (Linux; Android 14) Mobile Safari"}
+PC_UA = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+def _connect(count):
+    """Simulated dashboards/phones: every third client is a phone"""
+    return [server.socketio.test_client(server.app, headers=MOBILE_UA if i % 3 == 0 else PC_UA)
+            for i in range(count)]
+
+def _events(client, name):
+    return [e for e in client.get_received() if e["name"] == name]
+
+def test_room_fanout_load():
+    clients = _connect(300)
+    assert len(server.clients) == 300
+    for c in clients:
+        c.get_received()
+
+    start = time.perf_counter()
+    sent = server.send_notification("Mobile", "Essen ist fertig")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Notification to {sent} phones of 300 clients in {elapsed:.1f} ms")
+    assert sent == 100
+    received = [len(_events(c, "notification")) for c in clients]
+    assert received == [1 if i % 3 == 0 else 0 for i in range(300)]
+
+    assert server.send_notification("All", "Hallo") == 300
+    assert all(len(_events(c, "notification")) == 1 for c in clients)
+
+    for c in clients:
+        c.disconnect()
+    assert len(server.clients) == 0
+
+def test_status_coalescing():
+    clients = _connect(200)
+    for c in clients:
+        c.get_received()
+
+    # Rapid state flips for half a second
+    states = ["listening", "processing", "speaking", "idle"]
+    start = time.time()
+    i = 0
+    while time.time() - start < 0.5:
+        server.emit_status(states[i % 4], f"Satz {i}")
+        i += 1
+    server.emit_status("idle")
+    time.sleep(server.STATUS_MIN_INTERVAL * 2)
+
+    per_client = [_events(c, "pixel_state") for c in clients]
+    limit = 0.5 / server.STATUS_MIN_INTERVAL + 3
+    print(f"{i + 1} status changes -> {len(per_client[0])} emits per client (limit {limit:.0f})")
+    assert all(len(events) == len(per_client[0]) for events in per_client)
+    assert 1 <= len(per_client[0]) <= limit
+    assert per_client[0][-1]["args"][0]["state"] == "idle"
+
+    for c in clients:
+        c.disconnect()
+
+def test_registry_thread_safety():
+    registry = server.ClientRegistry()
+
+    def churn(worker):
+        for i in range(2000):
+            sid = f"{worker}-{i}"
+            registry.add(sid, "PC" if i % 2 else "Mobile", "")
+            registry.count(device="Mobile")
+            registry.subscribe(sid, "metrics")
+            if i % 4:
+                registry.remove(sid)
+
+    threads = [threading.Thread(target=churn, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(registry) == 8 * 500
+    assert registry.count(topic="metrics") == 8 * 500
+
+def test_emit_from_os_thread():
+    emitter = server.ThreadSafeEmitter(server.socketio)
+    emitter.start()  # this thread plays the server thread
+    client = _connect(1)[0]
+    client.get_received()
+
+    done = threading.Event()
+    def worker():
+        emitter.emit('notification', {'message': 'Timer abgelaufen'}, room=server.topic_room('notifications'))
+        done.set()
+    threading.Thread(target=worker).start()
+    assert done.wait(2)
+
+    events = []
+    for _ in range(200):
+        # Lets the background task run (eventlet/gevent) until the emit arrives
+        server.socketio.sleep(0.01)
+        events = _events(client, "notification")
+        if events:
+            break
+    print(f"{server.socketio.async_mode}: {len(events)} event(s) from an OS thread")
+    assert [e["args"][0]["message"] for e in events] == ["Timer abgelaufen"]
+    client.disconnect()
+
+if __name__ == "__main__":
+    test_room_fanout_load()
+    test_status_coalescing()
+    test_registry_thread_safety()
+    test_emit_from_os_thread()
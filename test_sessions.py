@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import threading
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+import server
+from sessions import Session, sessions, split_wake_word
+
+def test_wake_word_split():
+    assert split_wake_word("Pixel, wie spät ist es?") == (True, "wie spät ist es?")
+    assert split_wake_word("Hey pixel.") == (True, "")
+    assert split_wake_word("Wie spät ist es?") == (False, "Wie spät ist es?")
+
+    session = Session("mic")
+    assert session.hear("wie spät ist es") is None
+    assert session.hear("Pixel") == ""
+    assert session.active
+    assert session.hear("wie spät ist es") == "wie spät ist es"
+    assert not session.active and session.queries == 1
+
+def web_handler(delay):
+    """Like main.on_web_input, with a slow fake assistant"""
+    def handle(text, sid):
+        session = sessions.get(sid)
+        if session is None:
+            return None
+        query = session.hear(text)
+        if query is None:
+            return None
+        if not query:
+            return "Ja?"
+        time.sleep(delay)
+        return f"Antwort auf {query}"
+    return handle
+
+def replies(client):
+    return [e["args"][0]["text"] for e in client.get_received() if e["name"] == "response"]
+
+def test_wake_state_per_session():
+    server.set_input_handler(web_handler(0.0))
+    a = server.socketio.test_client(server.app)
+    b = server.socketio.test_client(server.app)
+    a.get_received(), b.get_received()
+
+    a.emit("audio_input", {"text": "Pixel"})
+    assert replies(a) == ["Ja?"]
+    # b never said the wake word: ignored, a's wake state does not leak
+    b.emit("audio_input", {"text": "wie spät ist es"})
+    assert replies(b) == []
+    a.emit("audio_input", {"text": "wie spät ist es"})
+    assert replies(a) == ["Antwort auf wie spät ist es"]
+
+    # Disconnecting drops the session state
+    count = len(sessions)
+    a.disconnect()
+    b.disconnect()
+    assert len(sessions) == count - 2
+
+    # A phrase still queued from a closed browser does not bring its session back
+    assert web_handler(0.0)("Pixel, wie spät ist es", "gone") is None
+    assert sessions.get("gone") is None and len(sessions) == count - 2
+
+def test_sessions_answered_concurrently():
+    delay = 0.1
+    server.set_input_handler(web_handler(delay))
+    clients = [server.socketio.test_client(server.app) for _ in range(server.WEB_SESSION_WORKERS)]
+    answers = []
+
+    def ask(client):
+        client.get_received()
+        client.emit("audio_input", {"text": "Pixel, erzähl einen Witz"})
+        answers.extend(replies(client))
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=ask, args=(c,)) for c in clients]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    print(f"{len(clients)} sessions answered in {elapsed * 1000:.0f} ms (one answer takes {delay * 1000:.0f} ms)")
+    assert answers == ["Antwort auf erzähl einen Witz"] * len(clients)
+    # In parallel on the pool, not one after another
+    assert elapsed < delay * len(clients) / 2
+
+    for c in clients:
+        c.disconnect()
+
+if __name__ == "__main__":
+    test_wake_word_split()
+    test_wake_state_per_session()
+    test_sessions_answered_concurrently()
@@ -0,0 +1,127 @@
+import sys
+import os
+import queue
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from speculation import Speculator
+
+class FakeClock:
+    """Time only moves when the test (or the fake LLM) says so"""
+    def __init__(self):
+        self.now = 1000.0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            return self.now
+
+    def advance(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+class FakeAssistant:
+    """Routes 'timer' to a skill with side effects, everything else to the LLM"""
+    def __init__(self, clock, delay=0.1):
+        self.clock = clock
+        self.delay = delay
+        self.calls = []
+        self.called = queue.Queue()
+
+    def route(self, query):
+        return types.SimpleNamespace(name="timer" if "timer" in query.lower() else "ai")
+
+    def answer(self, query):
+        self.calls.append(query)
+        self.clock.advance(self.delay)  # the LLM call takes delay seconds
+        self.called.put(query)
+        return f"Antwort auf {query}"
+
+def make_speculator(delay=0.1, stable=0.3):
+    clock = FakeClock()
+    fake = FakeAssistant(clock, delay)
+    pool = ThreadPoolExecutor(max_workers=4)
+    return clock, fake, Speculator(fake.route, fake.answer, pool.submit, stable=stable, clock=clock)
+
+def speak(speculator, sid, words):
+    """Interim results word by word, then the speaker stops long enough to settle"""
+    for n in range(1, len(words) + 1):
+        speculator.partial(sid, " ".join(words[:n]))
+    speculator.clock.advance(speculator.stable)
+    speculator.settle()
+
+def wait_answered(speculator, sid):
+    """Until the speculative answer for sid has finished"""
+    for _ in range(1000):
+        spec = speculator.pending.get(sid)
+        if spec is not None and spec.future is not None and spec.future.done():
+            return
+        time.sleep(0.002)
+    raise AssertionError("no speculative answer")
+
+def test_commit_when_final_matches():
+    clock, fake, speculator = make_speculator()
+    speculator.partial("a", "Warum ist der")
+    clock.advance(speculator.stable / 2)
+    speculator.settle()  # a short gap between words does not settle anything
+    speak(speculator, "a", "Warum ist der Himmel blau".split())
+    wait_answered(speculator, "a")
+
+    # The browser finalizes after the answer is done: all of its time was saved
+    clock.advance(0.5)
+    response = speculator.final("a", "Warum ist der Himmel blau?")
+    stats = speculator.stats()
+    print(f"Final -> {response!r}, stats {stats}")
+    assert response == "Antwort auf Warum ist der Himmel blau"
+    # Only the settled hypothesis was sent, not every interim one
+    assert fake.calls == ["Warum ist der Himmel blau"]
+    assert stats["committed"] == 1 and stats["wasted"] == 0 and stats["saved_ms_avg"] == 100
+    assert stats["partials"] == 6
+
+def test_mismatch_is_wasted_and_unsafe_not_started():
+    clock, fake, speculator = make_speculator()
+    # A pause mid-sentence settles the prefix ...
+    speak(speculator, "a", "Wie ist das Wetter".split())
+    assert fake.called.get(timeout=2) == "Wie ist das Wetter"
+    # ... the guess was wrong, the settled full question is used
+    speak(speculator, "a", "Wie ist das Wetter in Hamburg".split())
+    assert fake.called.get(timeout=2) == "Wie ist das Wetter in Hamburg"
+    assert speculator.final("a", "Wie ist das Wetter in Hamburg") == "Antwort auf Wie ist das Wetter in Hamburg"
+
+    speak(speculator, "b", "Erzähl mir einen Witz".split())
+    assert fake.called.get(timeout=2) == "Erzähl mir einen Witz"
+    # The final text differs: the early answer is thrown away
+    assert speculator.final("b", "Erzähl mir einen Witz über Katzen") is None
+
+    # Side effects are never speculated
+    speak(speculator, "c", "Stelle einen Timer auf 5 Minuten".split())
+    assert speculator.final("c", "Stelle einen Timer auf 5 Minuten") is None
+    assert not any("Timer" in call for call in fake.calls)
+
+    stats = speculator.stats()
+    print(f"Stats: {stats}")
+    assert stats["speculated"] == 3 and stats["committed"] == 1 and stats["wasted"] == 2
+    assert abs(stats["waste_rate"] - 2 / 3) < 1e-9
+
+def test_one_debounce_thread_for_many_partials():
+    clock, fake, speculator = make_speculator()
+    before = threading.active_count()
+    for sid in range(20):
+        for n in range(50):
+            speculator.partial(f"s{sid}", f"Frage {sid} Wort {n}")
+    # 1000 interim texts from 20 sessions: one debounce thread, nothing settled yet
+    assert threading.active_count() <= before + 1
+    assert len(speculator.due) == 20 and fake.called.empty()
+    clock.advance(speculator.stable)
+    speculator.settle()
+    assert sorted(fake.called.get(timeout=2) for _ in range(20)) == sorted(f"Frage {sid} Wort 49" for sid in range(20))
+
+if __name__ == "__main__":
+    test_commit_when_final_matches()
+    test_mismatch_is_wasted_and_unsafe_not_started()
+    test_one_debounce_thread_for_many_partials()
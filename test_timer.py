@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+import tracemalloc
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from skills.timer import TimerManager
+
+class MockTTS:
+    def __init__(self):
+        self.spoken = []
+
+    def speak(self, text, **kwargs):
+        self.spoken.append((time.time(), text))
+
+def test_many_timers():
+    """Thousands of timers: one thread, small memory, accurate firing"""
+    count = 5000
+    threads_before = threading.active_count()
+    tracemalloc.start()
+    mem_before = tracemalloc.get_traced_memory()[0]
+
+    tts = MockTTS()
+    manager = TimerManager(tts)
+    start = time.time()
+    timers = [manager.add_at(start + 0.5 + (i % 100) / 100, f"t{i}") for i in range(count)]
+
+    mem_after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    threads_after = threading.active_count()
+    per_timer = (mem_after - mem_before) / count
+    print(f"{count} timers: {threads_after - threads_before} extra thread(s), {per_timer:.0f} bytes/timer")
+    assert threads_after - threads_before == 1
+    assert per_timer < 2048
+
+    deadline = time.time() + 5
+    while len(tts.spoken) < count and time.time() < deadline:
+        time.sleep(0.05)
+    assert len(tts.spoken) == count
+
+    # Fire times are recorded in order; compare against the sorted targets
+    targets = sorted(t.fire_at for t in timers)
+    lateness = sorted(fired - target for (fired, _), target in zip(tts.spoken, targets))
+    p99 = lateness[int(len(lateness) * 0.99)]
+    print(f"Firing lateness: median {lateness[len(lateness) // 2] * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms")
+    assert lateness[0] >= -0.001
+    assert p99 < 0.05
+
+def test_cancel_list_snooze():
+    tts = MockTTS()
+    manager = TimerManager(tts)
+    manager.set_timer("5", "minuten")
+    manager.set_timer("10", "minuten")
+    assert "noch 4 Minuten" in manager.list_timers()
+    manager.set_alarm(7, 30)
+    # "Lösche alle Timer" keeps the wake-up alarm
+    assert manager.cancel_timers() == "Alle 2 Timer gelöscht."
+    assert [t.kind for t in manager.pending()] == ["alarm"]
+    assert manager.cancel_alarms() == "Wecker gelöscht."
+    assert manager.list_timers() == "Es läuft kein Timer."
+
+    manager.add(0.05, "kurz")
+    time.sleep(0.2)
+    assert tts.spoken[-1][1] == "Der Timer ist abgelaufen!"
+    assert manager.snooze(1).startswith("Okay")
+    assert len(manager.pending()) == 1
+
+def test_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "timers.json")
+        manager = TimerManager(MockTTS(), store_path=store)
+        manager.set_timer("3", "minuten")
+        time.sleep(0.2)
+
+        restored = TimerManager(MockTTS(), store_path=store)
+        timers = restored.pending()
+        assert len(timers) == 1
+        assert timers[0].label == "3 minuten"
+
+if __name__ == "__main__":
+    test_many_timers()
+    test_cancel_list_snooze()
+    test_persistence()
@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from tracing import Tracer, tracer
+from pipeline import Pipeline
+
+def test_spans_and_quantiles():
+    t = Tracer()
+    t.begin_turn(1)
+    with t.turn(1):
+        for ms in range(1, 101):
+            t.record("stt", 0, ms / 1000)
+    snapshot = t.snapshot()["stt"]
+    assert snapshot["count"] == 100
+    assert 49 <= snapshot["p50_ms"] <= 51 and 94 <= snapshot["p95_ms"] <= 96 and snapshot["p99_ms"] >= 99
+    assert len(t.trace(1)) == 100
+
+    text = t.render_prometheus()
+    assert 'pixel_stage_seconds_bucket{stage="stt",le="0.05"} 50' in text
+    assert 'pixel_stage_seconds_bucket{stage="stt",le="+Inf"} 100' in text
+    assert 'pixel_stage_seconds_count{stage="stt"} 100' in text
+
+def test_pipeline_turn_trace():
+    spoken = []
+    pipeline = Pipeline(lambda audio: audio, lambda turn: pipeline.answer(turn, turn.text),
+                        lambda query: query.upper(), lambda turn: spoken.append(turn.response))
+    pipeline.submit_audio("hallo")
+    end = time.time() + 2
+    while not spoken and time.time() < end:
+        time.sleep(0.01)
+    turn = max(tracer.turns)
+    assert [stage for stage, _, _ in tracer.trace(turn)] == ["stt"]
+
+def test_recording_overhead():
+    t = Tracer()
+    runs = 20000
+    start = time.perf_counter()
+    for _ in range(runs):
+        with t.span("route"):
+            pass
+    per_span_us = (time.perf_counter() - start) / runs * 1e6
+    print(f"Span overhead without listener: {per_span_us:.2f} us")
+    assert per_span_us < 50
+
+def test_metrics_route_and_push():
+    import server
+    client = server.app.test_client()
+    tracer.record("skill", 0, 0.2)
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'pixel_stage_seconds_count{stage="skill"}' in body
+
+    watcher = server.socketio.test_client(server.app)
+    bystander = server.socketio.test_client(server.app)
+    watcher.emit("subscribe_metrics")
+    tracer.record("llm", 0, 0.3)
+    assert any(e["name"] == "trace" for e in watcher.get_received())
+    assert not any(e["name"] == "trace" for e in bystander.get_received())
+    watcher.disconnect()
+    bystander.disconnect()
+    assert tracer.listener is None
+
+if __name__ == "__main__":
+    test_spans_and_quantiles()
+    test_pipeline_turn_trace()
+    test_recording_overhead()
+    test_metrics_route_and_push()
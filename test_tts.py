@@ -0,0 +1,91 @@
+import sys
+import os
+import queue
+import threading
+import time
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from tts import TextToSpeech
+
+class ScriptedSpeech(TextToSpeech):
+    """Scheduler with fake synthesis and playback: texts in `hold` play until released or stopped"""
+    def __init__(self, hold=()):
+        self.hold = {text: threading.Event() for text in hold}
+        self.rendered = queue.Queue()
+        self.started = queue.Queue()
+        self.played = []  # (text, "done" / "stopped")
+        super().__init__()
+
+    def _render(self, text):
+        self.rendered.put(text)
+        return text.encode("utf-8")
+
+    def _play_audio(self, audio):
+        text = audio.decode("utf-8")
+        self.started.put(text)
+        release = self.hold.get(text)
+        while release is not None and not release.is_set() and not self.playback_done.is_set():
+            release.wait(0.01)
+        self.played.append((text, "stopped" if self.playback_done.is_set() else "done"))
+
+    def next_started(self):
+        return self.started.get(timeout=2)
+
+    def wait_idle(self):
+        for _ in range(400):
+            if not self.busy():
+                return
+            time.sleep(0.005)
+        raise AssertionError("speech queue did not drain")
+
+def test_order_and_prefetch():
+    tts = ScriptedSpeech(hold=["Eins"])
+    tts.speak("Eins")
+    assert tts.next_started() == "Eins"
+    tts.speak("Zwei")
+    tts.speak("Drei")
+
+    # While "Eins" plays, exactly the next item is rendered ahead
+    assert [tts.rendered.get(timeout=2) for _ in range(2)] == ["Eins", "Zwei"]
+    assert tts.rendered.empty()
+
+    tts.hold["Eins"].set()
+    tts.wait_idle()
+    assert tts.played == [("Eins", "done"), ("Zwei", "done"), ("Drei", "done")]
+
+def test_alarm_preempts_and_answer_is_repeated():
+    tts = ScriptedSpeech(hold=["Antwort"])
+    tts.speak("Antwort")
+    assert tts.next_started() == "Antwort"
+    tts.speak("Später")
+    tts.speak("Wecker!", alarm=True)
+
+    # The alarm cuts in, then the answer is said again from the start, then the rest
+    assert tts.next_started() == "Wecker!"
+    tts.hold["Antwort"].set()
+    tts.wait_idle()
+    print(f"Played: {tts.played}")
+    assert tts.played == [("Antwort", "stopped"), ("Wecker!", "done"), ("Antwort", "done"), ("Später", "done")]
+
+def test_interrupt_drops_answers_keeps_alarms():
+    tts = ScriptedSpeech(hold=["Alt 1"])
+    tts.speak("Alt 1")
+    assert tts.next_started() == "Alt 1"
+    old = tts.generation
+    tts.speak("Alt 2")
+
+    # Barge-in: the running answer is cut off for good, queued ones are dropped
+    tts.interrupt()
+    tts.speak("Alt 3", generation=old)  # late sentence of the interrupted answer
+    tts.speak("Wecker!", alarm=True, generation=old)  # alarms are never stale
+    tts.speak("Neu")
+    tts.wait_idle()
+    print(f"Played: {tts.played}")
+    assert tts.played == [("Alt 1", "stopped"), ("Wecker!", "done"), ("Neu", "done")]
+
+if __name__ == "__main__":
+    test_order_and_prefetch()
+    test_alarm_preempts_and_answer_is_repeated()
+    test_interrupt_drops_answers_keeps_alarms()
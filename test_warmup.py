@@ -0,0 +1,35 @@
+import sys
+import os
+import time
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from warmup import WarmUp
+
+def test_tasks_wait_for_idle_and_respect_budget():
+    busy_until = time.perf_counter() + 0.2
+    order = []
+
+    def fail():
+        raise IOError("offline")
+
+    warm = WarmUp(budget=0.5, busy=lambda: time.perf_counter() < busy_until)
+    warm.add("first", lambda: order.append(("first", time.perf_counter())))
+    warm.add("broken", fail)
+    warm.add("slow", lambda: time.sleep(0.4))
+    warm.add("late", lambda: order.append(("late", time.perf_counter())))
+    warm.start()
+    assert warm.done.wait(2.0)
+    print(warm.report())
+
+    # Nothing started while Pixel was busy
+    assert order[0][0] == "first" and order[0][1] >= busy_until
+    status = {name: s for name, _, s in warm.results}
+    assert status["broken"] == "failed: offline"
+    assert status["slow"] == "ok"
+    # Budget used up: the last task is skipped instead of competing with real turns
+    assert status["late"] == "skipped" and len(order) == 1
+
+if __name__ == "__main__":
+    test_tasks_wait_for_idle_and_respect_budget()
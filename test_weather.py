@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import time
+import threading
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from fixture_server import FixtureHandler, start_server
+from skills.weather import WeatherService
+
+def _body(temp):
+    return json.dumps({"main": {"temp": temp}, "weather": [{"description": "leicht bewölkt"}]}).encode("utf-8")
+
+class WeatherHandler(FixtureHandler):
+    """OpenWeather look-alike; status and delay are set per test"""
+    delay = 0.0
+    status = 200
+    temp = 12.4
+
+    def do_GET(self):
+        self.count()
+        if WeatherHandler.delay:
+            time.sleep(WeatherHandler.delay)
+        status = WeatherHandler.status
+        body = _body(WeatherHandler.temp) if status == 200 else b'{"cod": "503", "message": "down"}'
+        if "q=Atlantis" in self.path:
+            status, body = 404, b'{"cod": "404", "message": "city not found"}'
+        self.send_body(status, "application/json", body)
+
+def _start_server():
+    WeatherHandler.requests_served = 0
+    WeatherHandler.delay = 0.0
+    WeatherHandler.status = 200
+    return start_server(WeatherHandler, "/data/2.5/weather")
+
+def test_concurrent_lookups_share_one_request():
+    server, url = _start_server()
+    WeatherHandler.delay = 0.3  # every caller arrives while the first request runs
+    weather = WeatherService("key", "Berlin", url, refresh_ahead=False)
+    barrier = threading.Barrier(20)
+    reports = []
+
+    def ask():
+        barrier.wait()
+        reports.append(weather.report("Hamburg"))
+
+    try:
+        threads = [threading.Thread(target=ask) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"20 concurrent lookups -> {WeatherHandler.requests_served} upstream request(s)")
+        assert WeatherHandler.requests_served == 1
+        assert reports == ["Das Wetter in Hamburg: leicht bewölkt bei 12 Grad Celsius."] * 20
+
+        # Cache hits, any spelling of the city, never reach upstream
+        start = time.perf_counter()
+        for city in ["Hamburg", "hamburg", "HAMBURG"] * 100:
+            weather.get(city)
+        hit = (time.perf_counter() - start) / 300
+        print(f"Cached lookup {hit * 1e6:.1f} us (upstream {WeatherHandler.delay * 1000:.0f} ms)")
+        assert WeatherHandler.requests_served == 1
+        assert hit < WeatherHandler.delay / 10
+    finally:
+        server.shutdown()
+
+def test_stale_value_when_upstream_fails():
+    server, url = _start_server()
+    weather = WeatherService("key", "Berlin", url, timeout=0.2, refresh_ahead=False)
+    try:
+        assert weather.report("Köln") == "Das Wetter in Köln: leicht bewölkt bei 12 Grad Celsius."
+
+        # Entry expired and the API answers 503: last good value
+        weather.cache.clear()
+        WeatherHandler.status = 503
+        assert weather.report("Köln") == "Das Wetter in Köln: leicht bewölkt bei 12 Grad Celsius."
+        assert WeatherHandler.requests_served == 2
+
+        # Entry expired and the API hangs: last good value after the timeout
+        weather.cache.clear()
+        WeatherHandler.status = 200
+        WeatherHandler.delay = 2.0
+        start = time.perf_counter()
+        assert weather.get("Köln")["main"]["temp"] == 12.4
+        elapsed = time.perf_counter() - start
+        print(f"Upstream stalled: stale value after {elapsed * 1000:.0f} ms")
+        assert elapsed < WeatherHandler.delay
+
+        # Without an older value the failure is reported
+        WeatherHandler.delay = 0.0
+        WeatherHandler.status = 503
+        assert weather.report("Bonn") == "Es gab einen Fehler beim Abrufen des Wetters."
+        # An unknown city is not an outage
+        assert weather.report("Atlantis") == "Ich konnte das Wetter für Atlantis nicht abrufen."
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_concurrent_lookups_share_one_request()
+    test_stale_value_when_upstream_fails()
@@ -0,0 +1,150 @@
+import time
+import bisect
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Histogram bucket bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Bucket counts plus a bounded sample window for quantiles"""
+    def __init__(self, window=1000):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def quantile(self, q):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Tracer:
+    """
+    Per-turn spans (capture, stt, route, skill/llm, tts_synthesis,
+    playback, first_audio) aggregated into one histogram per stage.
+    Recording is a lock and a few additions; quantiles and the text
+    format are only computed when /metrics is scraped. Spans are pushed
+    live only while a listener is set.
+    """
+    def __init__(self, keep_turns=50):
+        self.lock = threading.Lock()
+        self.histograms = OrderedDict()   # stage -> Histogram
+        self.turns = OrderedDict()        # turn id -> {"start", "spans", "first_audio"}
+        self.keep_turns = keep_turns
+        self.listener = None
+        self.local = threading.local()
+
+    # --- Turn context ---
+
+    def begin_turn(self, turn, start=None):
+        with self.lock:
+            self.turns[turn] = {"start": start or time.time(), "spans": [], "first_audio": False}
+            while len(self.turns) > self.keep_turns:
+                self.turns.popitem(last=False)
+
+    @contextmanager
+    def turn(self, turn):
+        """Attribute spans recorded on this thread to turn"""
+        previous = getattr(self.local, "turn", None)
+        self.local.turn = turn
+        try:
+            yield
+        finally:
+            self.local.turn = previous
+
+    def current(self):
+        return getattr(self.local, "turn", None)
+
+    # --- Recording ---
+
+    @contextmanager
+    def span(self, stage, turn=None):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.time(), turn)
+
+    def record(self, stage, start, end, turn=None):
+        if turn is None:
+            turn = self.current()
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(end - start)
+            trace = self.turns.get(turn)
+            if trace is not None:
+                trace["spans"].append((stage, start, end))
+            listener = self.listener
+        if listener:
+            offset = start - trace["start"] if trace else 0.0
+            listener({"turn": turn, "stage": stage, "offset_ms": round(offset * 1000), "duration_ms": round((end - start) * 1000)})
+
+    def first_audio(self, turn, at=None):
+        """Time from end of capture to the first sound of the answer (once per turn)"""
+        with self.lock:
+            trace = self.turns.get(turn)
+            if trace is None or trace["first_audio"]:
+                return
+            trace["first_audio"] = True
+            start = trace["start"]
+        self.record("first_audio", start, at or time.time(), turn)
+
+    # --- Reading ---
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "p50_ms": round(h.quantile(0.5) * 1000),
+                    "p95_ms": round(h.quantile(0.95) * 1000),
+                    "p99_ms": round(h.quantile(0.99) * 1000),
+                }
+                for stage, h in self.histograms.items()
+            }
+
+    def trace(self, turn):
+        with self.lock:
+            trace = self.turns.get(turn)
+            return list(trace["spans"]) if trace else []
+
+    def render_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP pixel_stage_seconds Time spent per turn stage",
+            "# TYPE pixel_stage_seconds histogram",
+        ]
+        quantiles = []
+        with self.lock:
+            for stage, h in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), h.counts):
+                    cumulative += count
+                    lines.append(f'pixel_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'pixel_stage_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'pixel_stage_seconds_count{{stage="{stage}"}} {h.count}')
+                for q in QUANTILES:
+                    quantiles.append(f'pixel_stage_quantile_seconds{{stage="{stage}",quantile="{q}"}} {h.quantile(q):.6f}')
+        lines += [
+            "# HELP pixel_stage_quantile_seconds Quantiles over the last 1000 spans per stage",
+            "# TYPE pixel_stage_quantile_seconds gauge",
+        ] + quantiles
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide tracer
+tracer = Tracer()
@@ -1,76 +1,292 @@
-import edge_tts
-import pygame
 import asyncio
 import threading
-import os
+import io
 import time
+import heapq
+import itertools
+from collections import deque
 import server # Web Interface
+from tts_cache import SpeechCache
+from tracing import tracer
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_MB, TTS_CACHE_MAX_CHARS, TTS_QUEUE_SIZE, TTS_MAX_DELAY
+
+# Lower value = spoken first
+PRIORITY_ALARM = 0
+PRIORITY_ANSWER = 1
+
+class SpeechItem:
+    def __init__(self, text, priority, seq, generation, t0=None, mode="full"):
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.generation = generation
+        self.t0 = t0
+        self.mode = mode
+        self.expires = time.time() + TTS_MAX_DELAY
+        self.audio = None
+        self.preempted = False  # cut off by an alarm, said again afterwards
+        self.turn = tracer.current()  # pipeline turn that asked for this, for tracing
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
 
 class TextToSpeech:
+    """
+    Speech scheduler: one synthesis worker and one playback worker serve
+    a bounded priority queue, so the thread count is constant no matter
+    how often speak() is called. The synthesis worker renders the next
+    item while the current one plays. An alarm cuts off a running answer,
+    which is then said again from the start; a barge-in drops it.
+    """
     def __init__(self):
         self.voice = "de-DE-ConradNeural"  # High quality German male voice
         # Alternative: "de-DE-KatjaNeural" (Female)
+        self.rate = "+0%"
+        self.pitch = "+0Hz"
         
-        # Initialize pygame mixer for audio playback
-        try:
-            pygame.mixer.init()
-        except:
-            print("Warning: Pygame mixer failed to initialize")
+        # pygame and edge_tts are imported on first use (see preload)
+        self.mixer = None
+        self.mixer_lock = threading.Lock()
         
-        self.lock = threading.Lock()
-        self.temp_file = "temp_speech.mp3"
+        self.playback_done = threading.Event()
+        self.channel = None
+
+        # One long-lived event loop for all edge_tts synthesis
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+        try:
+            self.cache = SpeechCache(TTS_CACHE_DIR, int(TTS_CACHE_MAX_MB * 1024 * 1024))
+        except OSError as e:
+            print(f"Warning: Speech cache disabled ({e})")
+            self.cache = None
+
+        # Time from turn start (t0) to first sound, per mode ("full" / "stream")
+        self.first_audio_ms = {"full": deque(maxlen=50), "stream": deque(maxlen=50)}
+
+        # Scheduler state, all guarded by cv
+        self.cv = threading.Condition()
+        self.pending = []   # heap of items waiting for synthesis
+        self.ready = []     # heap of synthesized items waiting for playback
+        self.rendering = None
+        self.current = None
+        self.generation = 0  # bumped on barge-in, older answers become stale
+        self.seq = itertools.count()
+
+        threading.Thread(target=self._synthesis_worker, daemon=True).start()
+        threading.Thread(target=self._playback_worker, daemon=True).start()
+
+    def speak(self, text, t0=None, alarm=False, mode="full", generation=None):
+        """Queue text for speaking (never blocks)"""
+        priority = PRIORITY_ALARM if alarm else PRIORITY_ANSWER
+        with self.cv:
+            if generation is None:
+                generation = self.generation
+            item = SpeechItem(text, priority, next(self.seq), generation, t0, mode)
+
+            if len(self.pending) >= TTS_QUEUE_SIZE:
+                worst = max(self.pending)
+                if item < worst:
+                    self.pending.remove(worst)
+                    heapq.heapify(self.pending)
+                else:
+                    print(f"TTS queue full, dropping: {text}")
+                    return
+            heapq.heappush(self.pending, item)
+            self.cv.notify_all()
+
+            # Alarms preempt a running answer; it is repeated after the alarm
+            preempt = self.current is not None and item.priority < self.current.priority
+            if preempt:
+                self.current.preempted = True
+        if preempt:
+            self.stop()
+
+    def speak_stream(self, sentences, t0=None):
+        """Queue sentences as they arrive; gives up if the turn is interrupted"""
+        generation = self.generation
+        first = True
+        for sentence in sentences:
+            if generation != self.generation:
+                break
+            self.speak(sentence, t0=t0 if first else None, mode="stream", generation=generation)
+            first = False
+
+    def interrupt(self):
+        """Barge-in: stop playback and drop queued answers (alarms are kept)"""
+        with self.cv:
+            self.generation += 1
+            self.pending = [i for i in self.pending if i.priority == PRIORITY_ALARM]
+            self.ready = [i for i in self.ready if i.priority == PRIORITY_ALARM]
+            heapq.heapify(self.pending)
+            heapq.heapify(self.ready)
+        self.stop()
+
+    def _is_stale(self, item):
+        if item.priority == PRIORITY_ALARM:
+            return False
+        return item.generation != self.generation or time.time() > item.expires
+
+    def _more_urgent_in_synthesis(self):
+        # Hold back a prefetched answer while an alarm is still being rendered
+        head = self.ready[0]
+        if self.rendering is not None and self.rendering < head:
+            return True
+        return bool(self.pending) and self.pending[0] < head
+
+    def _synthesis_worker(self):
+        while True:
+            with self.cv:
+                # Stay one item ahead of playback, unless something more urgent arrives
+                while not self.pending or (self.ready and not self.pending[0] < self.ready[0]):
+                    self.cv.wait()
+                item = heapq.heappop(self.pending)
+                self.rendering = item
 
-    def speak(self, text):
-        """Speak text in a separate thread to avoid blocking"""
-        thread = threading.Thread(target=self._speak_thread, args=(text,))
-        thread.start()
+            if not self._is_stale(item):
+                try:
+                    with tracer.span("tts_synthesis", turn=item.turn):
+                        item.audio = self._render(item.text)
+                except Exception as e:
+                    print(f"TTS Error: {e}")
+
+            with self.cv:
+                self.rendering = None
+                if item.audio and not self._is_stale(item):
+                    heapq.heappush(self.ready, item)
+                self.cv.notify_all()
+
+    def _playback_worker(self):
+        while True:
+            with self.cv:
+                while not self.ready or self._more_urgent_in_synthesis():
+                    self.cv.wait()
+                item = heapq.heappop(self.ready)
+                self.cv.notify_all()  # let synthesis prefetch the next item
+                if self._is_stale(item):
+                    continue
+                self.current = item
+                self.playback_done.clear()
 
-    def _speak_thread(self, text):
-        with self.lock:
             try:
-                # Notify Web Interface
-                server.emit_status('speaking', text)
-                
-                # generate audio using async loop
-                asyncio.run(self._generate_audio(text))
-                
-                # play audio
-                self._play_audio()
-                
-                # Back to idle
-                server.emit_status('idle')
+                server.emit_status('speaking', item.text)
+                self._report_first_audio(item.t0, item.mode)
+                start = time.time()
+                if item.turn is not None:
+                    tracer.first_audio(item.turn, start)
+                self._play_audio(item.audio)
+                tracer.record("playback", start, time.time(), item.turn)
             except Exception as e:
                 print(f"TTS Error: {e}")
-                server.emit_status('idle')  # Ensure idle on error
+
+            with self.cv:
+                self.current = None
+                if item.preempted and not self._is_stale(item):
+                    # Already rendered: back into the queue, behind the alarm that cut it off
+                    item.preempted = False
+                    item.t0 = None
+                    item.expires = time.time() + TTS_MAX_DELAY
+                    heapq.heappush(self.ready, item)
+                    self.cv.notify_all()
+                idle = not self.ready and not self.pending and self.rendering is None
+            if idle:
+                server.emit_status('idle')
+
+    def _render(self, text):
+        """Return MP3 bytes for text, from the cache when possible"""
+        cacheable = self.cache is not None and len(text) <= TTS_CACHE_MAX_CHARS
+        if cacheable:
+            key = SpeechCache.key(self.voice, text, self.rate, self.pitch)
+            audio = self.cache.get(key)
+            if audio:
+                return audio
+
+        future = asyncio.run_coroutine_threadsafe(self._generate_audio(text), self.loop)
+        audio = future.result()
+
+        if cacheable and audio:
+            try:
+                self.cache.put(key, audio)
+            except OSError as e:
+                print(f"Speech cache write failed: {e}")
+        return audio
+
+    def _report_first_audio(self, t0, mode):
+        if t0 is None:
+            return
+        ms = (time.time() - t0) * 1000
+        samples = self.first_audio_ms[mode]
+        samples.append(ms)
+        print(f"[TTS] Time to first audio: {int(ms)} ms ({mode}, avg {int(sum(samples) / len(samples))} ms over {len(samples)})")
+
+    def preload(self):
+        """Import and initialize the audio stack ahead of the first utterance"""
+        import edge_tts
+        self._get_mixer()
+
+    def busy(self):
+        """Something is being synthesized, waiting or playing"""
+        with self.cv:
+            return bool(self.current or self.pending or self.ready or self.rendering)
+
+    def prerender(self, texts):
+        """Render fixed phrases into the speech cache, so their first use plays at once"""
+        rendered = 0
+        for text in texts:
+            if self.cache is None or len(text) > TTS_CACHE_MAX_CHARS:
+                continue
+            if SpeechCache.key(self.voice, text, self.rate, self.pitch) not in self.cache:
+                self._render(text)
+                rendered += 1
+        return rendered
+
+    def _get_mixer(self):
+        with self.mixer_lock:
+            if self.mixer is None:
+                import pygame
+                # Initialize pygame mixer for audio playback
+                try:
+                    pygame.mixer.init()
+                except:
+                    print("Warning: Pygame mixer failed to initialize")
+                self.mixer = pygame.mixer
+            return self.mixer
 
     async def _generate_audio(self, text):
-        communicate = edge_tts.Communicate(text, self.voice)
-        await communicate.save(self.temp_file)
+        import edge_tts
+        communicate = edge_tts.Communicate(text, self.voice, rate=self.rate, pitch=self.pitch)
+        buffer = io.BytesIO()
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                buffer.write(chunk["data"])
+        return buffer.getvalue()
 
-    def _play_audio(self):
-        if not os.path.exists(self.temp_file):
+    def _play_audio(self, audio):
+        if not audio:
             return
 
         try:
-            pygame.mixer.music.load(self.temp_file)
-            pygame.mixer.music.play()
+            sound = self._get_mixer().Sound(file=io.BytesIO(audio))
+            if self.playback_done.is_set():
+                return  # stopped before it started
+            self.channel = sound.play()
             
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-                
-            # Unload to release file
-            pygame.mixer.music.unload()
+            # Sleep until the clip ends or stop() is called - no polling
+            self.playback_done.wait(sound.get_length())
+            if self.playback_done.is_set():
+                self.channel.stop()
             
         except Exception as e:
             print(f"Playback Error: {e}")
-        
-        # Cleanup
-        try:
-            if os.path.exists(self.temp_file):
-                os.remove(self.temp_file)
-        except:
-            pass
+        finally:
+            self.channel = None
+
+    def stop(self):
+        """Cut off the current playback"""
+        channel = self.channel
+        if channel:
+            channel.stop()
+        self.playback_done.set()
 
 if __name__ == "__main__":
     tts = TextToSpeech()
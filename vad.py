@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """
+    Frame-level energy / zero-crossing voice activity detector.
+    Finds the speech span of a captured phrase so leading and trailing
+    silence can be trimmed, and rejects phrases without enough voiced
+    speech (coughs, clicks, hiss) before they are uploaded.
+    """
+    def __init__(self, frame_ms=20, energy_ratio=3.0, min_energy=200, voiced_zcr=0.25,
+                 min_voiced_ms=200, padding_ms=150):
+        self.frame_ms = frame_ms
+        self.energy_ratio = energy_ratio    # speech must be this much louder than the noise floor
+        self.min_energy = min_energy        # absolute RMS floor (16 bit scale)
+        self.voiced_zcr = voiced_zcr        # voiced speech crosses zero rarely, hiss/noise often
+        self.min_voiced_ms = min_voiced_ms
+        self.padding_ms = padding_ms
+
+        # Counters
+        self.segments = 0
+        self.dropped = 0
+        self.seconds_in = 0.0
+        self.seconds_out = 0.0
+
+    def speech_span(self, pcm, sample_rate, sample_width=2):
+        """
+        Return (start, end) byte offsets of the speech in raw PCM, or None
+        if the segment should be dropped.
+        """
+        samples = self._to_int16(pcm, sample_width)
+        duration = len(samples) / sample_rate
+        self.segments += 1
+        self.seconds_in += duration
+
+        frame_len = max(1, int(sample_rate * self.frame_ms / 1000))
+        count = len(samples) // frame_len
+        if count == 0:
+            self.dropped += 1
+            return None
+
+        frames = samples[:count * frame_len].reshape(count, frame_len).astype(np.float32)
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        # Noise floor from the quietest frames of this phrase
+        noise_floor = np.percentile(energy, 10)
+        threshold = max(self.min_energy, noise_floor * self.energy_ratio)
+        active = energy > threshold
+        voiced = active & (zcr < self.voiced_zcr)
+
+        if voiced.sum() * self.frame_ms < self.min_voiced_ms:
+            self.dropped += 1
+            return None
+
+        active_idx = np.flatnonzero(active)
+        pad = int(self.padding_ms / self.frame_ms)
+        first = max(0, active_idx[0] - pad)
+        last = min(count, active_idx[-1] + 1 + pad)
+
+        start = int(first) * frame_len * sample_width
+        end = len(pcm) if last == count else int(last) * frame_len * sample_width
+        self.seconds_out += (end - start) / sample_width / sample_rate
+        return start, end
+
+    @staticmethod
+    def _to_int16(pcm, sample_width):
+        if sample_width == 2:
+            return np.frombuffer(pcm, dtype="<i2")
+        if sample_width == 1:
+            # 8 bit WAV is unsigned
+            return (np.frombuffer(pcm, dtype=np.uint8).astype(np.int16) - 128) << 8
+        if sample_width == 4:
+            return (np.frombuffer(pcm, dtype="<i4") >> 16).astype(np.int16)
+        raw = np.frombuffer(pcm, dtype=np.uint8).reshape(-1, sample_width)
+        return raw[:, -2:].copy().view("<i2").ravel()
+
+    def stats(self):
+        return {
+            "segments": self.segments,
+            "dropped": self.dropped,
+            "seconds_captured": round(self.seconds_in, 2),
+            "seconds_uploaded": round(self.seconds_out, 2),
+        }
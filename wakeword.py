@@ -0,0 +1,170 @@
+import os
+import sys
+import glob
+import wave
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+# --- Features ---
+
+def _mel_filterbank(n_filters=26, n_fft=512, rate=SAMPLE_RATE):
+    mel = lambda f: 2595 * np.log10(1 + f / 700)
+    hz = lambda m: 700 * (10 ** (m / 2595) - 1)
+    points = hz(np.linspace(mel(0), mel(rate / 2), n_filters + 2))
+    bins = np.floor((n_fft + 1) * points / rate).astype(int)
+    bank = np.zeros((n_filters, n_fft // 2 + 1))
+    for i in range(1, n_filters + 1):
+        left, center, right = bins[i - 1], bins[i], bins[i + 1]
+        if center > left:
+            bank[i - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[i - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+_FILTERBANK = _mel_filterbank()
+_DCT = np.cos(np.pi / 26 * (np.arange(26) + 0.5)[None, :] * np.arange(1, 13)[:, None])  # c1..c12
+_WINDOW = np.hamming(400)
+
+def mfcc(samples):
+    """12 MFCCs per 10 ms hop (25 ms window), cepstral-mean normalized"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < 400:
+        return np.zeros((0, 12), dtype=np.float32)
+    emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])
+    count = 1 + (len(emphasized) - 400) // 160
+    idx = np.arange(400)[None, :] + 160 * np.arange(count)[:, None]
+    frames = emphasized[idx] * _WINDOW
+    power = np.abs(np.fft.rfft(frames, 512)) ** 2 / 512
+    energies = np.log(np.maximum(power @ _FILTERBANK.T, 1e-10))
+    coeffs = energies @ _DCT.T
+    return (coeffs - coeffs.mean(axis=0)).astype(np.float32)
+
+
+# --- Matching ---
+
+def subsequence_dtw(template, query):
+    """
+    Best match of template anywhere inside query.
+    Returns (distance per template frame, start frame, end frame).
+    Steps (1,1), (1,2), (2,1) only depend on earlier template rows, so
+    every row is computed in one vectorized step.
+    """
+    n, m = len(template), len(query)
+    if n < 2 or m < 2:
+        return np.inf, 0, 0
+    cost = np.sqrt(((template[:, None, :] - query[None, :, :]) ** 2).sum(axis=2))
+
+    inf = np.inf
+    D = np.full((n, m), inf)
+    S = np.zeros((n, m), dtype=int)  # start frame of the best path
+    D[0] = cost[0]
+    S[0] = np.arange(m)
+    for i in range(1, n):
+        diag = np.concatenate(([inf], D[i - 1, :-1]))
+        skip = np.concatenate(([inf, inf], D[i - 1, :-2]))
+        diag_s = np.concatenate(([0], S[i - 1, :-1]))
+        skip_s = np.concatenate(([0, 0], S[i - 1, :-2]))
+        if i >= 2:
+            stretch = np.concatenate(([inf], D[i - 2, :-1]))
+            stretch_s = np.concatenate(([0], S[i - 2, :-1]))
+        else:
+            stretch = np.full(m, inf)
+            stretch_s = np.zeros(m, dtype=int)
+        options = np.vstack((diag, skip, stretch))
+        best = options.argmin(axis=0)
+        D[i] = cost[i] + options[best, np.arange(m)]
+        S[i] = np.choose(best, (diag_s, skip_s, stretch_s))
+
+    end = int(np.argmin(D[-1]))
+    return D[-1, end] / n, int(S[-1, end]), end
+
+
+class Detection:
+    def __init__(self, distance, start, end):
+        self.distance = distance
+        self.start = start  # sample offsets into the analysed audio
+        self.end = end
+
+
+class WakeWordDetector:
+    """
+    Keyword spotter for "Pixel": MFCC templates from a few enrolled
+    recordings, matched against incoming audio with subsequence DTW.
+    Runs on CPU in a few milliseconds per phrase.
+    """
+    def __init__(self, templates, threshold=18.0, search_seconds=4.0):
+        self.templates = [t for t in templates if len(t) >= 2]
+        self.threshold = threshold
+        self.search_seconds = search_seconds  # only the start of a phrase is searched
+
+    @classmethod
+    def from_directory(cls, directory, **kwargs):
+        """Load templates from WAV recordings of the wake word"""
+        paths = sorted(glob.glob(os.path.join(directory, "*.wav")))
+        return cls([mfcc(load_wav(p)) for p in paths], **kwargs)
+
+    def best_match(self, samples):
+        """Return the closest Detection (even above threshold), or None"""
+        samples = samples[:int(self.search_seconds * SAMPLE_RATE)]
+        query = mfcc(samples)
+        best = None
+        for template in self.templates:
+            distance, start, end = subsequence_dtw(template, query)
+            if best is None or distance < best.distance:
+                best = Detection(distance, start * 160, end * 160 + 400)
+        return best
+
+    def detect(self, samples):
+        """Return a Detection if the wake word occurs in 16 kHz samples"""
+        match = self.best_match(samples)
+        if match and match.distance <= self.threshold:
+            return match
+        return None
+
+
+def load_wav(path):
+    """Read a WAV file as 16 kHz mono int16 samples"""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2 or f.getnchannels() != 1 or f.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path}: expected 16 kHz 16 bit mono")
+        return np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+
+def evaluate(detector, positives, negatives):
+    """False-accept / false-reject rates over lists of sample arrays"""
+    rejected = sum(1 for s in positives if detector.detect(s) is None)
+    accepted = sum(1 for s in negatives if detector.detect(s) is not None)
+    return {
+        "false_reject_rate": rejected / len(positives) if positives else 0.0,
+        "false_accept_rate": accepted / len(negatives) if negatives else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    # python wakeword.py enroll [dir]           - record a few "Pixel" templates
+    # python wakeword.py eval <positive> <negative> [dir]
+    from config import WAKEWORD_DIR, WAKEWORD_THRESHOLD
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "enroll":
+        import speech_recognition as sr
+        directory = sys.argv[2] if len(sys.argv) > 2 else WAKEWORD_DIR
+        os.makedirs(directory, exist_ok=True)
+        recognizer = sr.Recognizer()
+        with sr.Microphone(sample_rate=SAMPLE_RATE) as source:
+            recognizer.adjust_for_ambient_noise(source)
+            for i in range(5):
+                input(f"[{i + 1}/5] Press Enter, then say 'Pixel'...")
+                audio = recognizer.listen(source, phrase_time_limit=2)
+                path = os.path.join(directory, f"pixel_{i + 1}.wav")
+                with open(path, "wb") as f:
+                    f.write(audio.get_wav_data(convert_rate=SAMPLE_RATE, convert_width=2))
+                print(f"Saved {path}")
+    elif command == "eval" and len(sys.argv) > 3:
+        directory = sys.argv[4] if len(sys.argv) > 4 else WAKEWORD_DIR
+        detector = WakeWordDetector.from_directory(directory, threshold=WAKEWORD_THRESHOLD)
+        load_all = lambda d: [load_wav(p) for p in sorted(glob.glob(os.path.join(d, "*.wav")))]
+        print(evaluate(detector, load_all(sys.argv[2]), load_all(sys.argv[3])))
+    else:
+        print(__doc__ or "usage: python wakeword.py enroll [dir] | eval <positive_dir> <negative_dir> [dir]")
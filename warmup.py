@@ -0,0 +1,74 @@
+import time
+import threading
+
+
+class WarmUp:
+    """
+    Background warm-up after boot: named tasks run one after another on
+    their own thread. A task only starts while budget is left and nobody
+    is talking to Pixel (busy() is False), so warming never holds up a
+    real turn; whatever does not fit into the budget is skipped.
+    Tasks added with repeat=True (connections) are re-run every
+    keepalive seconds while idle, so pooled connections stay open.
+    """
+    def __init__(self, budget=30.0, busy=None, keepalive=0.0):
+        self.budget = budget
+        self.busy = busy or (lambda: False)
+        self.keepalive = keepalive
+        self.tasks = []     # (name, fn, repeat)
+        self.results = []   # (name, seconds, status)
+        self.done = threading.Event()
+        self.thread = None
+
+    def add(self, name, fn, repeat=False):
+        self.tasks.append((name, fn, repeat))
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="warm-up", daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        deadline = time.perf_counter() + self.budget
+        for name, fn, _ in self.tasks:
+            if not self._wait_idle(deadline):
+                self.results.append((name, 0.0, "skipped"))
+                continue
+            start = time.perf_counter()
+            try:
+                fn()
+                status = "ok"
+            except Exception as e:
+                status = f"failed: {e}"
+            self.results.append((name, time.perf_counter() - start, status))
+        self.done.set()
+        print(self.report())
+
+        if self.keepalive > 0 and any(repeat for _, _, repeat in self.tasks):
+            self._keep_alive()
+
+    def _wait_idle(self, deadline):
+        while time.perf_counter() < deadline:
+            if not self.busy():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def _keep_alive(self):
+        repeat = [(name, fn) for name, fn, again in self.tasks if again]
+        while True:
+            time.sleep(self.keepalive)
+            if self.busy():
+                continue
+            for name, fn in repeat:
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"Keep-alive {name} failed: {e}")
+
+    def report(self):
+        lines = ["Warm-up:"]
+        for name, seconds, status in self.results:
+            lines.append(f"  {name:<20} {seconds * 1000:8.1f} ms  {status}")
+        lines.append(f"  {'total':<20} {sum(s for _, s, _ in self.results) * 1000:8.1f} ms")
+        return "\n".join(lines)